@@ -0,0 +1,23 @@
+"""
+gunicorn 설정 (Dockerfile에서 -c gunicorn.conf.py로 사용)
+- WARMUP_MODE=preload: 마스터가 앱과 무거운 모듈을 미리 import한 뒤 fork (preload_app, 워커는 copy-on-write로 공유)
+- WARMUP_MODE 설정 시: 워커가 fork된 직후 백그라운드에서 서비스 초기화 시작 (끝나기 전까지 /api/ready는 503)
+  Chroma 클라이언트 / SQLite 연결은 fork 후에 공유하면 안전하지 않으므로 워커마다 fork 이후에 생성
+"""
+import sys
+from pathlib import Path
+
+# 설정 파일은 앱보다 먼저 로드되므로 프로젝트 루트를 sys.path에 추가
+project_root = Path(__file__).parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from src.config.config import WARMUP_MODE  # noqa: E402
+
+preload_app = WARMUP_MODE == "preload"
+
+
+def post_fork(server, worker):
+    if WARMUP_MODE:
+        from src.app import start_warmup
+        start_warmup()
@@ -1,10 +1,10 @@
-from flask import Flask, jsonify, render_template, request
+from flask import Flask, Response, g, jsonify, render_template, request, stream_with_context
 import json
 import os
 import sys
 import gc
+import threading
 from pathlib import Path
-from datetime import datetime, timedelta
 
 # 프로젝트 루트를 sys.path에 추가 (Render 배포 시 경로 문제 해결)
 project_root = Path(__file__).parent.parent
@@ -19,6 +19,12 @@ crawl_url_service = None
 download_pdf_service = None
 rag_service = None
 api_client = None
+job_queue = None
+calendar_index = None
+calendar_index_lock = threading.Lock()  # 캘린더 색인(백그라운드 갱신 스레드)이 중복 생성되지 않도록 보호
+job_queue_lock = threading.Lock()  # gunicorn --threads 환경에서 작업 큐가 중복 생성되지 않도록 보호
+rag_service_lock = threading.Lock()  # 예열 스레드와 요청 스레드가 RAGService를 중복 생성하지 않도록 보호
+warmup = None
 
 
 def get_crawl_url_service():
@@ -58,20 +64,21 @@ def get_download_pdf_service():
 def get_rag_service():
     """RAG 서비스 지연 초기화 (가장 무거운 부분이므로 실제로 필요할 때만 로드)"""
     global rag_service
-    if rag_service is None:
-        try:
-            print("🔄 RAGService 초기화 시작...")
-            from src.services.rag_service import RAGService
-            gc.collect()
-            project_root = Path(__file__).parent.parent
-            rag_service = RAGService(persist_directory=str(project_root / "data" / "chroma_db"))
-
-            gc.collect()
-            print("✅ RAGService 초기화 완료")
-        except Exception as e:
-            print(f"⚠️ RAGService 초기화 중 에러 발생: {e}")
-            rag_service = None
-            raise
+    with rag_service_lock:
+        if rag_service is None:
+            try:
+                print("🔄 RAGService 초기화 시작...")
+                from src.services.rag_service import RAGService
+                gc.collect()
+                project_root = Path(__file__).parent.parent
+                rag_service = RAGService(persist_directory=str(project_root / "data" / "chroma_db"))
+
+                gc.collect()
+                print("✅ RAGService 초기화 완료")
+            except Exception as e:
+                print(f"⚠️ RAGService 초기화 중 에러 발생: {e}")
+                rag_service = None
+                raise
     return rag_service
 
 
@@ -91,6 +98,52 @@ def get_api_client():
     return api_client
 
 
+def get_job_queue():
+    """공고 분석 작업 큐 지연 초기화"""
+    global job_queue
+    with job_queue_lock:
+        if job_queue is None:
+            from src.config.config import INGEST_MAX_WORKERS
+            from src.services.job_queue import IngestionJobQueue
+            # 512MB 환경에서는 분석 작업을 동시에 1개만 실행 (INGEST_MAX_WORKERS로 조정 가능)
+            max_workers = int(INGEST_MAX_WORKERS) if INGEST_MAX_WORKERS else 1
+            job_queue = IngestionJobQueue(max_workers=max_workers)
+            print(f"✅ IngestionJobQueue 초기화 완료 (workers: {max_workers})")
+    return job_queue
+
+
+def get_calendar_index():
+    """캘린더 공고 색인 지연 초기화 (첫 요청 시 백그라운드 갱신 스레드 시작)"""
+    global calendar_index
+    with calendar_index_lock:
+        if calendar_index is None:
+            from src.services.calendar_index import CalendarIndex
+            calendar_index = CalendarIndex(get_api_client())
+            calendar_index.start()
+            print("✅ CalendarIndex 초기화 완료")
+    return calendar_index
+
+
+def get_warmup():
+    """워커 예열 상태 (WARMUP_MODE 미설정 시에도 /api/ready 응답용으로 생성)"""
+    global warmup
+    if warmup is None:
+        from src.services.warmup import Warmup
+        warmup = Warmup()
+    return warmup
+
+
+def start_warmup():
+    """
+    백그라운드 스레드에서 서비스 초기화 시작 (gunicorn post_fork 훅 / 로컬 실행 시 호출)
+    Chroma 클라이언트 / SQLite 캐시 연결은 fork 이후에 만들어야 하므로 워커마다 실행합니다.
+    """
+    return get_warmup().start({
+        "rag_service": get_rag_service,
+        "crawl_url_service": get_crawl_url_service,
+        "download_pdf_service": get_download_pdf_service,
+    })
+
 
 # TODO 캘린더 UI 연결해서 데이터 로드   
 def load_apt_data():
@@ -103,70 +156,122 @@ def load_apt_data():
         return {"data": []}
 
 
+# 추적하지 않는 엔드포인트 (정적 파일, 모니터링 조회)
+UNTRACED_ENDPOINTS = {"static", "metrics", "traces", "ready"}
+
+
+@app.before_request
+def ensure_warmup_started():
+    """WARMUP_MODE 사용 시 post_fork 훅 없이 실행된 경우(gunicorn -c 미지정 등) 첫 요청에서 예열 시작"""
+    if WARMUP_MODE and (warmup is None or warmup.status in ("idle", "preloaded")):
+        start_warmup()
+
+
+@app.before_request
+def start_request_trace():
+    """요청마다 트레이스 시작 (RAG 서비스 등에서 기록한 스팬이 이 트레이스에 연결됨)"""
+    if request.endpoint in UNTRACED_ENDPOINTS:
+        return
+    from src.services.tracing import start_trace
+    rule = request.url_rule.rule if request.url_rule else request.path
+    g.trace = start_trace(f"{request.method} {rule}", path=request.path, request_bytes=request.content_length or 0)
+
+
+@app.after_request
+def finish_request_trace(response):
+    """응답 전송이 끝나면(스트리밍 응답 포함) 트레이스 종료"""
+    trace = g.pop("trace", None)
+    if trace is not None:
+        trace.root.set(status=response.status_code, response_bytes=response.content_length)
+        response.call_on_close(trace.finish)
+    return response
+
+
 @app.route('/')
 def index():
     return render_template('index.html')
 
 
-@app.route('/api/analyze', methods=['POST'])
-def analyze_apt():
-    """특정 공고 분석 요청 처리 (PDF 다룬로드 및 분석)"""
+def run_analyze_job(job, pblanc_url, house_manage_no, pblanc_no, house_secd):
+    """공고 분석 작업 (작업 큐의 워커 스레드에서 실행: 크롤링 -> PDF 다운로드 -> RAG 등록)"""
     # 서비스 지연 초기화
-    try:
-        crawl_service = get_crawl_url_service()
-        download_service = get_download_pdf_service()
-        rag = get_rag_service()
-    except Exception as e:
-        return jsonify({"status": "error", "message": f"서비스 초기화 중 오류가 발생했습니다: {e}"}), 500
+    crawl_service = get_crawl_url_service()
+    download_service = get_download_pdf_service()
+    rag = get_rag_service()
 
-    data = request.json 
-    pblanc_url = data.get('pblanc_url') # 모집공고 상세 URL
-    house_manage_no = data.get('house_manage_no') # 주택관리번호
-    pblanc_no = data.get('pblanc_no') # 공고번호
-    house_secd = data.get('house_secd') # 주택구분코드
+    # 크롤링한 URL / 다운로드한 PDF는 공고별로 저장해두고 재분석 시 재사용
+    from src.services.artifact_store import PdfArtifactStore
+    artifact_key = PdfArtifactStore.make_key(house_manage_no, pblanc_no, house_secd)
 
     # 1. 모집공고문 다운로드 URL 크롤링
-    download_url = crawl_service.crawl_url(pblanc_url=pblanc_url)
+    job.set_stage("crawl", "running")
+    download_url = crawl_service.crawl_url(pblanc_url=pblanc_url, artifact_key=artifact_key)
     if not download_url:
-        return jsonify({"status": "error", "message": "모집공고문 다운로드 URL 크롤링 실패"}), 500
+        raise RuntimeError("모집공고문 다운로드 URL 크롤링 실패")
+    job.set_stage("crawl", "done")
 
     # 2. 모집공고문 PDF 다운로드
-    pdf_path = download_service.download_pdf(download_url=download_url, file_name=f"{house_manage_no}_{pblanc_no}_{house_secd}.pdf")
+    job.set_stage("download", "running")
+    file_name = f"{house_manage_no}_{pblanc_no}_{house_secd}.pdf"
+    pdf_path = download_service.download_pdf(download_url=download_url, file_name=file_name, artifact_key=artifact_key)
     if not pdf_path:
-        return jsonify({"status": "error", "message": "모집공고문 PDF 다운로드 실패"}), 500
+        # 저장된 다운로드 URL이 만료되었을 수 있으므로 다시 크롤링 후 한 번 더 시도
+        refreshed_url = crawl_service.crawl_url(pblanc_url=pblanc_url, artifact_key=artifact_key, refresh=True)
+        if refreshed_url and refreshed_url != download_url:
+            pdf_path = download_service.download_pdf(download_url=refreshed_url, file_name=file_name, artifact_key=artifact_key)
+    if not pdf_path:
+        raise RuntimeError("모집공고문 PDF 다운로드 실패")
+    job.set_stage("download", "done")
 
     # 3. RAG 서비스에 PDF 등록 (ETF 구조)
     # house_manage_no를 문서 ID로 사용하여 메타데이터 저장
+    from src.config.config import RENDER
+    is_render = RENDER == "true" or RENDER == "1"
     try:
-        rag.process_for_rag(pdf_path=pdf_path, doc_id=str(house_manage_no))
-        
-        # 4. RAG 처리 완료 후 임시 PDF 파일 삭제 (Render 환경에서만)
+        rag.process_for_rag(pdf_path=pdf_path, doc_id=str(house_manage_no), progress_callback=job.set_stage)
+    finally:
+        # 4. RAG 처리 후(에러 발생 시 포함) 임시 PDF 파일 삭제 (Render 환경에서만)
         # 로컬 환경에서는 PDF를 tmp/pdfs/에 보관
-        from src.config.config import RENDER
-        is_render = RENDER == "true" or RENDER == "1"
-        
         if is_render:
-            # Render 환경: 임시 파일 삭제
             if os.path.exists(pdf_path):
-                os.remove(pdf_path)
-                print(f"🗑️ 임시 PDF 파일 삭제 완료: {pdf_path}")
+                try:
+                    os.remove(pdf_path)
+                    print(f"🗑️ 임시 PDF 파일 삭제 완료: {pdf_path}")
+                except OSError:
+                    pass
         else:
-            # 로컬 환경: PDF 보관 (이미 tmp/pdfs/에 저장되어 있음)
             print(f"💾 PDF 파일 보관: {pdf_path}")
-        
-        return jsonify({"status": "success", "message": "PDF 등록 완료"})
-    except Exception as e:
-        # 에러 발생 시에도 Render 환경에서만 임시 파일 삭제 시도
-        from src.config.config import RENDER
-        is_render = RENDER == "true" or RENDER == "1"
-        
-        if is_render and os.path.exists(pdf_path):
-            try:
-                os.remove(pdf_path)
-                print(f"🗑️ 에러 발생 후 임시 PDF 파일 삭제 완료: {pdf_path}")
-            except:
-                pass
-        raise e
+
+    return "PDF 등록 완료"
+
+
+@app.route('/api/analyze', methods=['POST'])
+def analyze_apt():
+    """특정 공고 분석 요청 처리 (작업 큐에 등록 후 job_id 즉시 반환, 진행 상황은 /api/jobs/<job_id>로 조회)"""
+    data = request.json 
+    pblanc_url = data.get('pblanc_url') # 모집공고 상세 URL
+    house_manage_no = data.get('house_manage_no') # 주택관리번호
+    pblanc_no = data.get('pblanc_no') # 공고번호
+    house_secd = data.get('house_secd') # 주택구분코드
+
+    if not pblanc_url or not house_manage_no:
+        return jsonify({"status": "error", "message": "pblanc_url, house_manage_no는 필수입니다."}), 400
+
+    # 같은 house_manage_no의 분석이 이미 진행 중이면 해당 작업으로 병합됨
+    job = get_job_queue().submit(
+        key=str(house_manage_no),
+        func=lambda job: run_analyze_job(job, pblanc_url, house_manage_no, pblanc_no, house_secd),
+    )
+    return jsonify({"status": "accepted", "job_id": job.job_id, "job": job.to_dict()}), 202
+
+
+@app.route('/api/jobs/<job_id>')
+def get_job(job_id):
+    """공고 분석 작업 진행 상황 조회 (crawl/download/extract/chunk/embed 단계별 상태)"""
+    job = get_job_queue().get(job_id)
+    if job is None:
+        return jsonify({"status": "error", "message": "작업을 찾을 수 없습니다."}), 404
+    return jsonify(job.to_dict())
 
 
 @app.route('/api/query', methods=['POST'])
@@ -202,6 +307,50 @@ def query():
         return jsonify({"answer": "죄송합니다. 답변을 생성하는 중에 오류가 발생했습니다."}), 500
 
 
+@app.route('/api/query/stream', methods=['POST'])
+def query_stream():
+    """챗봇 질의응답 (Server-Sent Events 스트리밍: 답변을 생성되는 대로 전송)"""
+    try:
+        rag = get_rag_service()
+    except Exception as e:
+        return jsonify({"answer": f"서비스 초기화 중 오류가 발생했습니다: {e}"}), 500
+
+    data = request.json
+    question = data.get('question', '')
+    house_manage_no = data.get('house_manage_no') # 프론트에서 전달받은 공고 ID
+    model = data.get('model', 'openai') # 사용할 모델 선택 (기본값: openai)
+    conversation_history = data.get('conversation_history', []) # 이전 대화 내용
+
+    if not question:
+        return jsonify({"answer": "질문을 입력해주세요."})
+
+    model_name = "GPT-4o-mini" if model == "openai" else "Gemini Pro"
+    print(f"🤖 사용자 LLM 선택 (스트리밍): {model_name} (house_manage_no: {house_manage_no})")
+    print(f"❓ 질문: {question}")
+
+    def sse(event, payload):
+        return f"event: {event}\ndata: {json.dumps(payload, ensure_ascii=False)}\n\n"
+
+    def generate():
+        try:
+            for piece in rag.answer_question_stream(question, doc_id=str(house_manage_no), model=model, conversation_history=conversation_history):
+                yield sse("delta", {"text": piece})
+            print(f"✅ 답변 스트리밍 완료 ({model_name})")
+            yield sse("done", {})
+        except Exception as e:
+            print(f"Error streaming answer: {e}")
+            yield sse("error", {"message": "죄송합니다. 답변을 생성하는 중에 오류가 발생했습니다."})
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no',  # 프록시 버퍼링 방지 (토큰을 바로 전달)
+        },
+    )
+
+
 @app.route('/api/reset', methods=['POST'])
 def reset_db():
     """벡터 DB 초기화"""
@@ -217,78 +366,79 @@ def reset_db():
         return jsonify({"status": "error", "message": str(e)}), 500
 
 
+@app.route('/api/cache-stats')
+def cache_stats():
+    """답변 캐시 / 임베딩 캐시 / 질문 임베딩 캐시 / 추출 캐시 적중률 조회"""
+    if rag_service is None:
+        # RAG 서비스가 아직 초기화되지 않았으면 캐시도 비어 있음 (조회를 위해 무거운 초기화를 하지 않음)
+        return jsonify({"answer_cache": None, "embedding_cache": None, "query_embedding_cache": None, "extraction_cache": None})
+    return jsonify(rag_service.get_cache_stats())
+
+
+@app.route('/api/http-stats')
+def http_stats():
+    """외부 호스트별 HTTP 요청 통계 (요청/실패/재시도 수, 진행 중인 요청 수, 응답 시간)"""
+    from src.client.http_transport import get_http_stats
+    return jsonify(get_http_stats())
+
+
+@app.route('/metrics')
+def metrics():
+    """Prometheus 형식 메트릭 (단계별 소요 시간, 토큰/재시도/429/캐시 적중 수, 메모리, 실행 중인 분석 작업 수)"""
+    from src.services.metrics import render_metrics
+    return Response(render_metrics(), content_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@app.route('/api/ready')
+def ready():
+    """준비 상태 확인 (WARMUP_MODE 사용 시 서비스 초기화가 끝나기 전에는 503 - 로드밸런서 헬스 체크용)"""
+    state = get_warmup().to_dict()
+    if not WARMUP_MODE or state["ready"]:
+        return jsonify(state)
+    return jsonify(state), 503
+
+
+@app.route('/api/traces')
+def traces():
+    """최근 요청/분석 작업 트레이스를 JSON Lines로 반환 (limit: 최대 개수(기본 50), min_ms: 이 시간 이상 걸린 것만)"""
+    from src.services.tracing import get_trace_recorder
+    limit = request.args.get('limit', 50, type=int)
+    min_ms = request.args.get('min_ms', 0, type=float)
+    lines = [json.dumps(data, ensure_ascii=False, default=str) for data in get_trace_recorder().recent(limit, min_ms)]
+    return Response("".join(f"{line}\n" for line in lines), mimetype="application/x-ndjson")
+
+
 @app.route('/api/calendar-data')
 def get_calendar_data():
-    """캘린더에 표시할 데이터 반환 (실시간 API 연동)"""
+    """캘린더에 표시할 데이터 반환 (백그라운드에서 갱신하는 공고 색인에서 조회, 요청 중에는 외부 API를 호출하지 않음)"""
     start_str = request.args.get('start') # 예: 2024-05-01
     end_str = request.args.get('end')     # 예: 2024-06-02
-    
-    # FullCalendar 날짜 포맷 (YYYY-MM-DD)을 API 날짜 포맷으로 변환 필요 시 처리
-    # 여기서는 그대로 사용 (API가 YYYY-MM-DD도 받을 수 있다고 가정)
-    
+
     print(f"📅 캘린더 데이터 요청: {start_str} ~ {end_str}")
 
-    # API 클라이언트 지연 초기화
+    # 캘린더 색인 지연 초기화
     try:
-        client = get_api_client()
+        index = get_calendar_index()
     except Exception as e:
-        print(f"❌ /api/calendar-data에서 API 클라이언트 초기화 실패: {e}")
+        print(f"❌ /api/calendar-data에서 캘린더 색인 초기화 실패: {e}")
         return jsonify([])
 
-    try:
-        # 민영(01) + 국민(03) 데이터를 모두 가져와야 함 (필요하다면)
-        # 일단 기본은 '01'(민영)만 가져오거나, 두 번 호출해서 합칠 수도 있음.
-        # 여기서는 '01'만 먼저 테스트
-        response_data = client.get_detail(
-            houseDtlSecd="01", 
-            start_date=start_str, 
-            end_date=end_str,
-            page=1
-        )
-
-        items = response_data.get('data', [])
-        
-        # 국민주택('03')도 필요하면 추가 호출해서 items에 extend
-        # response_data_03 = api_client.get_detail(houseDtlSecd="03", start_date=start_str, end_date=end_str)
-        # items.extend(response_data_03.get('data', []))
-
-        events = []
-        for apt in items:
-            # 접수 시작일을 이벤트 날짜로 사용
-            if apt.get('RCEPT_BGNDE'):
-                end_date = apt.get('RCEPT_ENDDE')
-                # FullCalendar는 end 날짜가 exclusive하므로 캘린더 표시용으로 하루를 더함
-                adjusted_end_date = end_date
-                if end_date:
-                    try:
-                        dt = datetime.strptime(end_date, '%Y-%m-%d')
-                        dt_plus_one = dt + timedelta(days=1)
-                        adjusted_end_date = dt_plus_one.strftime('%Y-%m-%d')
-                    except ValueError:
-                        pass  # 날짜 형식이 안맞으면 그대로 사용
-                
-                events.append({
-                    'title': apt.get('HOUSE_NM'),
-                    'start': apt.get('RCEPT_BGNDE'),
-                    'end': adjusted_end_date,  # 캘린더 표시용: 하루 더한 값 (12/18)
-                    'color': '#667eea',
-                    'extendedProps': {
-                        'pblanc_url': apt.get('PBLANC_URL'),
-                        'house_manage_no': apt.get('HOUSE_MANAGE_NO'),
-                        'pblanc_no': apt.get('PBLANC_NO'),
-                        'house_secd': apt.get('HOUSE_SECD'),
-                        'house_secd_nm': apt.get('HOUSE_SECD_NM'),
-                        'subscrpt_area_code_nm': apt.get('SUBSCRPT_AREA_CODE_NM'),
-                        'startDate': apt.get('RCEPT_BGNDE'),
-                        'endDate': end_date  # 헤더/팝업 표시용: 원래 날짜 (12/17)
-                    }
-                })
-        
-        return jsonify(events)
+    # 민영(01) + 국민(03) 공고 중 접수 기간이 요청 기간과 겹치는 것
+    events, etag = index.query(start_str, end_str)
+
+    response = jsonify(events)
+    response.set_etag(etag)
+    # 같은 달을 다시 볼 때는 브라우저 캐시 또는 304로 응답 (색인이 갱신되면 ETag가 바뀜)
+    response.cache_control.public = True
+    response.cache_control.max_age = 60
+    return response.make_conditional(request)
+
+# WARMUP_MODE=preload: 무거운 모듈을 import 시점에 미리 로드 (gunicorn --preload면 fork 전 마스터에서 한 번만 실행)
+from src.config.config import WARMUP_MODE  # noqa: E402
+
+if WARMUP_MODE == "preload":
+    get_warmup().preload()
 
-    except Exception as e:
-        print(f"❌ 캘린더 데이터 조회 실패: {e}")
-        return jsonify([])
 
 if __name__ == '__main__':
     # Windows에서 소켓 오류 방지를 위해 use_reloader=False 설정
@@ -298,6 +448,8 @@ if __name__ == '__main__':
     print(f"🚀 Flask 앱 시작 중... 포트: {port}, 호스트: 0.0.0.0")
     print(f"📁 작업 디렉토리: {os.getcwd()}")
     print(f"📁 프로젝트 루트: {project_root}")
+    if WARMUP_MODE:
+        start_warmup()
     try:
         app.run(host='0.0.0.0', port=port, debug=True, use_reloader=False)
     except Exception as e:
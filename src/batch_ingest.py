@@ -0,0 +1,232 @@
+"""
+공고문 일괄 분석 (벡터 DB 사전 적재용 CLI)
+기간 내 공고(민영 01 + 국민 03)를 모두 조회하여 크롤링 → PDF 다운로드 → RAG 등록을 미리 수행합니다.
+야간에 실행해 두면 사용자가 질문할 때 분석을 기다리지 않아도 됩니다.
+
+- 공고 목록은 ApplyhomeAPIClient.get_all_details_async로 모든 페이지를 동시에 조회
+- 단계별 동시 실행 수를 따로 제한 (크롤링/다운로드는 네트워크 대기 위주, RAG 등록은 메모리를 많이 쓰므로 기본 1)
+- 이미 벡터 DB에 있는 doc_id(house_manage_no)는 크롤링부터 생략 (완료 여부는 항상 벡터 DB 기준)
+- 공고별 결과(완료/건너뜀/실패 사유)를 체크포인트 파일에 기록 (중단 후 다시 실행하면 벡터 DB에 저장된 공고는 건너뛰고 나머지만 분석,
+  벡터 DB가 초기화되었으면 체크포인트에 완료로 기록된 공고도 다시 분석)
+
+사용법:
+    python -m src.batch_ingest --start 2025-12-01 --end 2025-12-31
+    python -m src.batch_ingest --start 2025-12-01 --end 2025-12-31 --secd 01 --crawl-workers 8 --download-workers 4
+    python -m src.batch_ingest --days 14 --checkpoint data/batch_ingest/nightly.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from src.config.config import INGEST_MAX_WORKERS, RENDER  # noqa: E402
+
+
+class IngestCheckpoint:
+    def __init__(self, path: str):
+        """
+        공고별 일괄 분석 결과 기록 (JSON 파일, 공고 1건이 끝날 때마다 임시 파일에 쓰고 교체)
+
+        Args:
+            path: 체크포인트 파일 경로
+        """
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self.notices = {}  # doc_id -> {"status": "done" / "skipped" / "error", "message", "updated_at"}
+        if self.path.exists():
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.notices = json.load(f).get("notices", {})
+
+    def is_done(self, doc_id: str) -> bool:
+        with self._lock:
+            entry = self.notices.get(doc_id)
+            return bool(entry and entry["status"] in ("done", "skipped"))
+
+    def record(self, doc_id: str, status: str, message: str = None):
+        with self._lock:
+            self.notices[doc_id] = {"status": status, "message": message, "updated_at": time.time()}
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = self.path.with_suffix(".tmp")
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump({"notices": self.notices}, f, ensure_ascii=False, indent=2)
+            temp_path.replace(self.path)
+
+
+class BatchIngestor:
+    def __init__(self, rag, crawl_service, download_service, checkpoint: IngestCheckpoint,
+                 crawl_workers: int = 4, download_workers: int = 2, ingest_workers: int = 1):
+        """
+        공고 목록을 단계별 동시 실행 수 제한 안에서 분석
+
+        Args:
+            rag: RAGService
+            crawl_service: CrawlUrlService
+            download_service: DownloadPdfService
+            checkpoint: 공고별 결과 기록
+            crawl_workers: 동시에 크롤링할 공고 수
+            download_workers: 동시에 다운로드할 PDF 수
+            ingest_workers: 동시에 RAG 등록(추출/청킹/임베딩)할 공고 수 (512MB 환경에서는 1 권장)
+        """
+        self.rag = rag
+        self.crawl_service = crawl_service
+        self.download_service = download_service
+        self.checkpoint = checkpoint
+        self.crawl_slots = threading.Semaphore(crawl_workers)
+        self.download_slots = threading.Semaphore(download_workers)
+        self.ingest_slots = threading.Semaphore(ingest_workers)
+        # 공고마다 스레드 1개가 단계 순서대로 진행하고, 각 단계에 들어갈 때 해당 단계의 슬롯을 기다림
+        self.max_workers = max(crawl_workers, download_workers) + ingest_workers
+        self.is_render = RENDER == "true" or RENDER == "1"
+
+    def run(self, notices: list) -> dict:
+        """
+        :param notices: 공고 상세 목록 (get_detail 응답의 data 항목)
+        :return: 결과별 공고 수 {"done", "skipped", "error"}
+        """
+        counts = {"done": 0, "skipped": 0, "error": 0}
+        counts_lock = threading.Lock()
+
+        def run_one(notice):
+            status = self._ingest_notice(notice)
+            with counts_lock:
+                counts[status] += 1
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="batch-ingest") as executor:
+            list(executor.map(run_one, notices))
+        return counts
+
+    def _ingest_notice(self, notice: dict) -> str:
+        from src.services.artifact_store import PdfArtifactStore
+
+        doc_id = str(notice["HOUSE_MANAGE_NO"])
+        # 완료 여부는 벡터 DB 기준 (/api/reset이나 임베딩 모델 변경으로 비워졌으면 체크포인트에 완료로 기록되어 있어도 다시 분석)
+        if self.rag.vector_store.has_document(doc_id):
+            print(f"⏩ 이미 벡터 DB에 저장된 공고: {doc_id}")
+            self.checkpoint.record(doc_id, "skipped", "이미 저장됨")
+            return "skipped"
+        if self.checkpoint.is_done(doc_id):
+            print(f"🔁 체크포인트에는 완료로 기록되어 있지만 벡터 DB에 없는 공고, 다시 분석: {doc_id}")
+
+        pblanc_url = notice.get("PBLANC_URL")
+        pblanc_no = notice.get("PBLANC_NO")
+        house_secd = notice.get("HOUSE_SECD")
+        artifact_key = PdfArtifactStore.make_key(doc_id, pblanc_no, house_secd)
+        pdf_path = None
+        try:
+            if not pblanc_url:
+                raise RuntimeError("PBLANC_URL 없음")
+
+            # 1. 모집공고문 다운로드 URL 크롤링
+            with self.crawl_slots:
+                download_url = self.crawl_service.crawl_url(pblanc_url=pblanc_url, artifact_key=artifact_key)
+            if not download_url:
+                raise RuntimeError("모집공고문 다운로드 URL 크롤링 실패")
+
+            # 2. 모집공고문 PDF 다운로드 (실패하면 저장된 URL이 만료되었을 수 있으므로 다시 크롤링 후 한 번 더 시도)
+            file_name = f"{doc_id}_{pblanc_no}_{house_secd}.pdf"
+            with self.download_slots:
+                pdf_path = self.download_service.download_pdf(download_url=download_url, file_name=file_name, artifact_key=artifact_key)
+            if not pdf_path:
+                with self.crawl_slots:
+                    refreshed_url = self.crawl_service.crawl_url(pblanc_url=pblanc_url, artifact_key=artifact_key, refresh=True)
+                if refreshed_url and refreshed_url != download_url:
+                    with self.download_slots:
+                        pdf_path = self.download_service.download_pdf(download_url=refreshed_url, file_name=file_name, artifact_key=artifact_key)
+            if not pdf_path:
+                raise RuntimeError("모집공고문 PDF 다운로드 실패")
+
+            # 3. RAG 등록
+            with self.ingest_slots:
+                self.rag.process_for_rag(pdf_path=pdf_path, doc_id=doc_id)
+        except Exception as e:
+            print(f"❌ 공고 분석 실패: {doc_id} ({notice.get('HOUSE_NM')}) - {e}")
+            self.checkpoint.record(doc_id, "error", str(e))
+            return "error"
+        finally:
+            # Render 환경에서는 임시 PDF 삭제 (PDF 저장소에는 남아 있음)
+            if pdf_path and self.is_render and os.path.exists(pdf_path):
+                try:
+                    os.remove(pdf_path)
+                except OSError:
+                    pass
+
+        print(f"✅ 공고 분석 완료: {doc_id} ({notice.get('HOUSE_NM')})")
+        self.checkpoint.record(doc_id, "done")
+        return "done"
+
+
+def fetch_notices(api_client, start_date: str, end_date: str, house_dtl_secds) -> list:
+    """
+    기간 내 공고 목록을 주택구분코드별로 모든 페이지 조회 (house_manage_no 기준 중복 제거, 조회 순서 유지)
+    주택구분코드와 페이지를 asyncio로 동시에 요청 (호스트별 동시 요청 수는 AsyncHttpClient가 제한)
+    """
+    async def fetch_all():
+        return await asyncio.gather(*(
+            api_client.get_all_details_async(houseDtlSecd=house_dtl_secd, start_date=start_date, end_date=end_date)
+            for house_dtl_secd in house_dtl_secds
+        ))
+
+    notices = {}
+    for house_dtl_secd, items in zip(house_dtl_secds, asyncio.run(fetch_all())):
+        print(f"📋 공고 조회: {house_dtl_secd} {start_date} ~ {end_date} - {len(items)}건")
+        for item in items:
+            if item.get("HOUSE_MANAGE_NO"):
+                notices.setdefault(str(item["HOUSE_MANAGE_NO"]), item)
+    return list(notices.values())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="기간 내 공고문 일괄 분석 (벡터 DB 사전 적재)")
+    parser.add_argument("--start", help="모집공고일 검색 시작일 (YYYY-MM-DD, 미지정 시 --days 전)")
+    parser.add_argument("--end", help="모집공고일 검색 종료일 (YYYY-MM-DD, 미지정 시 오늘)")
+    parser.add_argument("--days", type=int, default=30, help="--start 미지정 시 검색 기간 (일)")
+    parser.add_argument("--secd", nargs="+", default=["01", "03"], help="주택구분코드 (01: 민영, 03: 국민)")
+    parser.add_argument("--crawl-workers", type=int, default=4, help="동시에 크롤링할 공고 수")
+    parser.add_argument("--download-workers", type=int, default=2, help="동시에 다운로드할 PDF 수")
+    parser.add_argument("--ingest-workers", type=int, default=None, help="동시에 RAG 등록할 공고 수 (기본 INGEST_MAX_WORKERS 또는 1)")
+    parser.add_argument("--checkpoint", default=str(project_root / "data" / "batch_ingest" / "checkpoint.json"), help="체크포인트 파일 경로")
+    args = parser.parse_args()
+
+    end_date = args.end or date.today().isoformat()
+    start_date = args.start or (date.fromisoformat(end_date) - timedelta(days=args.days)).isoformat()
+    ingest_workers = args.ingest_workers or (int(INGEST_MAX_WORKERS) if INGEST_MAX_WORKERS else 1)
+
+    from src.client.api_client import ApplyhomeAPIClient
+    notices = fetch_notices(ApplyhomeAPIClient(), start_date, end_date, args.secd)
+    if not notices:
+        print("공고가 없습니다.")
+        return
+
+    from src.services.crawl_url import CrawlUrlService
+    from src.services.download_pdf import DownloadPdfService
+    from src.services.rag_service import RAGService
+    rag = RAGService(persist_directory=str(project_root / "data" / "chroma_db"))
+
+    checkpoint = IngestCheckpoint(args.checkpoint)
+    ingestor = BatchIngestor(
+        rag, CrawlUrlService(), DownloadPdfService(), checkpoint,
+        crawl_workers=args.crawl_workers, download_workers=args.download_workers, ingest_workers=ingest_workers,
+    )
+    print(f"🚀 일괄 분석 시작: {len(notices)}건 (크롤링 {args.crawl_workers}, 다운로드 {args.download_workers}, RAG 등록 {ingest_workers})")
+    started = time.perf_counter()
+    counts = ingestor.run(notices)
+    print(
+        f"🏁 일괄 분석 종료 ({time.perf_counter() - started:.1f}초): "
+        f"완료 {counts['done']}건, 건너뜀 {counts['skipped']}건, 실패 {counts['error']}건 (체크포인트: {checkpoint.path})"
+    )
+    if counts["error"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,404 @@
+"""
+오프라인 RAG 벤치마크 (외부 API 호출 없음)
+process_for_rag / answer_question 경로를 가짜 임베딩 · 가짜 LLM으로 실행하여
+단계별 소요 시간, 최대 메모리(RSS), 청크 수, 초당 질문 처리 수(qps)를 측정하고 JSON으로 저장합니다.
+
+입력: 저장소의 extracted_view.html + 합성 공고문 (--pages로 페이지 수 지정)
+
+사용법:
+    python -m src.benchmark
+    python -m src.benchmark --pages 10 80 --repeat 3 --output before.json
+    python -m src.benchmark --output after.json --compare before.json   # 이전 결과와 비교
+"""
+import argparse
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+import zlib
+from contextlib import contextmanager, redirect_stdout
+from datetime import datetime
+from pathlib import Path
+from types import SimpleNamespace
+
+# config는 import 시점에 환경 변수를 읽으므로 src 모듈 import 전에 설정
+# - 임베딩 캐시를 끄고(매번 같은 조건), 가짜 제공자의 한도를 사실상 무제한으로
+# - RENDER=true: data/md에 마크다운 파일을 남기지 않음
+os.environ["EMBEDDING_CACHE_PATH"] = "off"
+os.environ["EXTRACTION_CACHE_PATH"] = "off"
+os.environ["RENDER"] = "true"
+os.environ["RATE_LIMITS"] = ";".join([
+    "fake-embedding=rpm:1000000,tpm:1000000000,batch:2048,batch_tokens:1000000",
+    "openai-llm=rpm:1000000,tpm:1000000000",
+    "gemini-llm=rpm:1000000,tpm:1000000000",
+])
+
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from src.services.rag.rate_limiter import estimate_tokens  # noqa: E402
+from src.services.reports import git_commit, delta, save_report, load_report  # noqa: E402
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+BENCHMARK_QUESTIONS = [
+    "특별공급 신청자격은 무엇인가요?",
+    "84A 주택형의 분양가는 얼마인가요?",
+    "청약 접수 일정은 언제인가요?",
+    "무주택 세대구성원의 기준을 알려주세요.",
+    "계약금과 중도금 납부 일정은 어떻게 되나요?",
+    "발코니 확장 비용은 얼마인가요?",
+    "재당첨 제한 기간은 몇 년인가요?",
+    "입주 예정일은 언제인가요?",
+    "거주지역 요건이 있나요?",
+    "유의사항 중 부적격 당첨자 처리 기준은?",
+]
+
+
+class FakeEmbeddings:
+    def __init__(self, dim: int = 384, latency: float = 0.0):
+        """
+        문자 2-gram 해시로 만든 결정적 임베딩 (같은 텍스트 → 같은 벡터, 겹치는 글자가 많을수록 유사)
+
+        Args:
+            dim: 벡터 차원
+            latency: 요청 1회당 대기 시간 (초, 네트워크 지연 흉내)
+        """
+        self.dim = dim
+        self.latency = latency
+        self.model = f"fake-hash-{dim}"
+        self.requests = 0
+
+    def _embed(self, text: str):
+        vector = [0.0] * self.dim
+        compact = " ".join(text.split())
+        for i in range(len(compact) - 1):
+            h = zlib.crc32(compact[i:i + 2].encode("utf-8"))
+            vector[h % self.dim] += 1.0 if h & 1 else -1.0
+        norm = sum(x * x for x in vector) ** 0.5 or 1.0
+        return [x / norm for x in vector]
+
+    def embed_documents(self, texts):
+        self.requests += 1
+        if self.latency:
+            time.sleep(self.latency)
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text):
+        self.requests += 1
+        if self.latency:
+            time.sleep(self.latency)
+        return self._embed(text)
+
+
+class FakeLLM:
+    def __init__(self, latency: float = 0.0):
+        """
+        OpenAI(chat.completions.create) / google-genai(models.generate_content[_stream]) 인터페이스만 흉내 내는 가짜 LLM
+        프롬프트의 [공고문 내용] 첫 줄을 그대로 답변으로 돌려주고, 입력 토큰 수를 기록합니다.
+
+        Args:
+            latency: 요청 1회당 대기 시간 (초)
+        """
+        self.latency = latency
+        self.prompt_tokens = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._chat_create))
+        self.models = SimpleNamespace(
+            generate_content=self._generate_content,
+            generate_content_stream=self._generate_content_stream,
+        )
+
+    def _answer(self, prompt: str) -> str:
+        self.prompt_tokens.append(estimate_tokens(prompt))
+        if self.latency:
+            time.sleep(self.latency)
+        context = prompt.split("[공고문 내용]", 1)[-1].strip()
+        first_line = next((line for line in context.splitlines() if line.strip()), "")
+        return f"공고문에 따르면 {first_line[:200]}"
+
+    @staticmethod
+    def _pieces(answer: str, size: int = 20):
+        return [answer[i:i + size] for i in range(0, len(answer), size)]
+
+    def _chat_create(self, model, messages, stream=False, **kwargs):
+        answer = self._answer("\n".join(message["content"] for message in messages))
+        if stream:
+            return iter([
+                SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=piece))])
+                for piece in self._pieces(answer)
+            ])
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=answer))])
+
+    def _generate_content(self, model, contents, config=None):
+        return SimpleNamespace(text=self._answer(contents), candidates=[])
+
+    def _generate_content_stream(self, model, contents, config=None):
+        return iter([SimpleNamespace(text=piece) for piece in self._pieces(self._answer(contents))])
+
+
+def make_synthetic_notice(pages: int, seed: int = 0) -> str:
+    """
+    Upstage document-parse 결과와 같은 형태(최상위 h1/p/table/footer 나열)의 합성 공고문 HTML 생성
+    페이지마다 제목 1개, 문단 3~6개, rowspan/colspan이 섞인 표 1개
+    """
+    rng = random.Random(seed)
+    titles = ["공급내역 및 공급금액", "특별공급 신청자격", "일반공급 신청자격", "청약 접수 일정",
+              "계약 체결 및 유의사항", "발코니 확장 및 추가 선택품목", "부적격 당첨자 처리", "입주 예정일 안내"]
+    words = ["무주택", "세대구성원", "청약통장", "가입기간", "거주지역", "당첨자", "재당첨", "제한", "계약금",
+             "중도금", "잔금", "전용면적", "주택형", "특별공급", "일반공급", "소득기준", "자산기준", "입주자",
+             "공급금액", "분양가", "신청", "접수", "서류", "제출", "기간", "해당", "경우", "적용", "합니다"]
+    house_types = ["59", "84A", "84B", "84C", "84D", "122"]
+
+    parts = []
+    element_id = 0
+    for page in range(1, pages + 1):
+        parts.append(f"<h1 id='{element_id}' style='font-size:20px'>{page}. {rng.choice(titles)}</h1>")
+        element_id += 1
+        for _ in range(rng.randint(3, 6)):
+            sentence = " ".join(rng.choice(words) for _ in range(rng.randint(15, 40)))
+            parts.append(f"<p id='{element_id}' data-category='paragraph' style='font-size:14px'>■ {sentence}.</p>")
+            element_id += 1
+
+        columns = rng.sample(house_types, rng.randint(3, len(house_types)))
+        rows = [
+            "<tr><th rowspan='2'>구분</th><th rowspan='2'>항목</th>"
+            f"<th colspan='{len(columns)}'>주택형별 공급금액 (원)</th></tr>",
+            "<tr>" + "".join(f"<th>{column}</th>" for column in columns) + "</tr>",
+        ]
+        for group in range(rng.randint(2, 5)):
+            span = rng.randint(1, 3)
+            for index in range(span):
+                cells = f"<td rowspan='{span}'>{rng.choice(words)} {group + 1}</td>" if index == 0 else ""
+                cells += f"<td>{rng.choice(words)}</td>"
+                cells += "".join(f"<td>{rng.randint(1, 999) * 100000:,}</td>" for _ in columns)
+                rows.append(f"<tr>{cells}</tr>")
+        parts.append(f"<table id='{element_id}' style='font-size:12px'>{''.join(rows)}</table>")
+        element_id += 1
+        parts.append(f"<footer id='{element_id}' style='font-size:10px'>- {page} -</footer>")
+        element_id += 1
+    return "\n".join(parts)
+
+
+def peak_rss_mb() -> float:
+    """프로세스 시작 이후 최대 RSS (MB, 측정 불가 시 None)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux는 KB, macOS는 바이트 단위
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+@contextmanager
+def timed(stages: dict, name: str):
+    started = time.perf_counter()
+    yield
+    stages[name] = round(time.perf_counter() - started, 4)
+
+
+def latency_summary(latencies: list) -> dict:
+    total = sum(latencies)
+    ordered = sorted(latencies)
+    return {
+        "count": len(latencies),
+        "total_seconds": round(total, 4),
+        "qps": round(len(latencies) / total, 2) if total else None,
+        "p50_ms": round(statistics.median(ordered) * 1000, 2) if ordered else None,
+        "p95_ms": round(ordered[round((len(ordered) - 1) * 0.95)] * 1000, 2) if ordered else None,
+    }
+
+
+def benchmark_document(rag, name: str, html: str, repeat: int) -> dict:
+    """문서 1개의 단계별 시간(분리 측정, repeat회 중 최소값) + process_for_rag 전체 시간"""
+    doc_id = f"bench-{name}"
+    result = {"name": name, "doc_id": doc_id, "html_bytes": len(html.encode("utf-8")), "stages": {}}
+
+    runs = []
+    for attempt in range(repeat):
+        stages = {}
+        with timed(stages, "html_to_markdown"):
+            pieces = list(rag.pdf_extractor.iter_markdown(html))
+        with timed(stages, "chunk"):
+            chunks = list(rag.text_chunker.iter_chunks(pieces))
+        for chunk in chunks:
+            chunk.metadata["doc_id"] = f"{doc_id}-stages-{attempt}"
+        with timed(stages, "embed_store"):
+            rag.vector_store.add_documents(chunks, skip_existing=False)
+        # 단계 측정용 문서가 남아 있으면 이후 검색 측정의 컬렉션/어휘 색인이 커지므로 바로 삭제
+        rag.vector_store.delete_document(f"{doc_id}-stages-{attempt}")
+
+        # 실제 경로: 추출/청킹과 임베딩/저장이 동시에 진행되는 process_for_rag
+        rag.vector_store.delete_document(doc_id)
+        with timed(stages, "process_for_rag"):
+            rag.process_for_rag(f"{name}.pdf", doc_id, html_content=html)
+        runs.append(stages)
+
+    result["stages"] = {stage: min(run[stage] for run in runs) for stage in runs[0]}
+    result["markdown_chars"] = sum(len(piece) for piece in pieces)
+    result["chunks"] = len(chunks)
+    result["avg_chunk_chars"] = round(sum(len(chunk.page_content) for chunk in chunks) / len(chunks), 1) if chunks else 0
+    result["peak_rss_mb"] = peak_rss_mb()
+    return result
+
+
+def benchmark_queries(rag, llm: FakeLLM, doc_ids: list, questions: list, model: str) -> dict:
+    """
+    각 경로의 지연 시간과 qps
+    - search / search_batch: 질문 임베딩 + 벡터 검색을 질문 1개씩(search_by_vector) / 한꺼번에(search_many, 질문당 시간) 실행 (같은 k, 같은 필터)
+    - retrieve: 질문 임베딩 + 답변 생성에서 쓰는 검색(하이브리드 검색 + 재정렬)
+    - answer / answer_cached: 답변 생성 (캐시 미적중 / 캐시 적중)
+    (캐시 미적중 측정은 질문 임베딩 캐시를 비운 뒤 실행, 캐시 적중 측정은 답변 캐시와 질문 임베딩 캐시를 모두 사용)
+    """
+    search, search_batch, retrieve, cold, warm = [], [], [], [], []
+    # retrieve의 하이브리드 검색이 벡터 검색에서 가져오는 후보 수(fetch_k=20)와 같은 k 사용
+    search_k = 20
+    query_cache = rag.vector_store.query_cache
+    llm.prompt_tokens.clear()
+    rag.answer_cache.clear()
+    for doc_id in doc_ids:
+        for question in questions:
+            if query_cache:
+                query_cache.clear()
+            started = time.perf_counter()
+            vector = rag.vector_store.embed_query(question)
+            rag.vector_store.search_by_vector(vector, k=search_k, filter={"doc_id": doc_id})
+            search.append(time.perf_counter() - started)
+
+            if query_cache:
+                query_cache.clear()
+            started = time.perf_counter()
+            vector = rag.vector_store.embed_query(question)
+            rag.retrieve(question, vector, doc_id)
+            retrieve.append(time.perf_counter() - started)
+
+            if query_cache:
+                query_cache.clear()
+            started = time.perf_counter()
+            rag.answer_question(question, doc_id=doc_id, model=model)
+            cold.append(time.perf_counter() - started)
+
+        if query_cache:
+            query_cache.clear()
+        started = time.perf_counter()
+        rag.vector_store.search_many(questions, k=search_k, filter={"doc_id": doc_id})
+        search_batch.extend([(time.perf_counter() - started) / len(questions)] * len(questions))
+
+    for doc_id in doc_ids:
+        for question in questions:
+            started = time.perf_counter()
+            rag.answer_question(question, doc_id=doc_id, model=model)
+            warm.append(time.perf_counter() - started)
+
+    return {
+        "search": latency_summary(search),
+        "search_batch": latency_summary(search_batch),
+        "retrieve": latency_summary(retrieve),
+        "answer": latency_summary(cold),
+        "answer_cached": latency_summary(warm),
+        "avg_prompt_tokens": round(statistics.mean(llm.prompt_tokens), 1) if llm.prompt_tokens else None,
+        "answer_cache": rag.answer_cache.stats(),
+    }
+
+
+def run_benchmark(pages: list, repeat: int = 1, model: str = "openai", embed_latency: float = 0.0,
+                  llm_latency: float = 0.0, questions: list = None, verbose: bool = False) -> dict:
+    """
+    벤치마크 실행 후 결과(dict) 반환
+
+    Args:
+        pages: 합성 공고문 페이지 수 목록 (예: [10, 40])
+        repeat: 문서별 단계 측정 반복 횟수 (최소값 기록)
+        model: 답변 생성 경로 ("openai" 또는 "gemini")
+        embed_latency / llm_latency: 가짜 제공자의 요청 1회당 지연 시간 (초)
+        questions: 질문 목록 (기본 BENCHMARK_QUESTIONS)
+        verbose: 서비스 로그 출력 여부
+    """
+    inputs = [("extracted_view", (project_root / "extracted_view.html").read_text(encoding="utf-8"))]
+    inputs += [(f"synthetic_{count}p", make_synthetic_notice(count, seed=count)) for count in pages]
+    questions = questions or BENCHMARK_QUESTIONS
+
+    embeddings = FakeEmbeddings(latency=embed_latency)
+    llm = FakeLLM(latency=llm_latency)
+    result = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "git_commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "config": {
+                "pages": pages, "repeat": repeat, "model": model,
+                "embed_latency": embed_latency, "llm_latency": llm_latency, "questions": len(questions),
+            },
+        },
+    }
+
+    with open(os.devnull, "w") as devnull, redirect_stdout(sys.stdout if verbose else devnull):
+        from src.services.rag_service import RAGService
+
+        stages = {}
+        with timed(stages, "service_init"):
+            rag = RAGService(None, embedding_model="fake", embeddings=embeddings, openai_client=llm, genai_client=llm)
+            rag.clear_database()
+        result["startup"] = stages
+
+        result["documents"] = [benchmark_document(rag, name, html, repeat) for name, html in inputs]
+        result["queries"] = benchmark_queries(rag, llm, [doc["doc_id"] for doc in result["documents"]], questions, model)
+        rag.clear_database()
+
+    result["embedding_requests"] = embeddings.requests
+    result["peak_rss_mb"] = peak_rss_mb()
+    return result
+
+
+def print_summary(result: dict, baseline: dict = None):
+    """결과 요약 출력 (baseline이 있으면 변화율 함께 출력)"""
+    base_docs = {doc["name"]: doc for doc in (baseline or {}).get("documents", [])}
+    print(f"📊 벤치마크 결과 (commit {result['meta']['git_commit']}, peak RSS {result['peak_rss_mb']}MB)")
+    for doc in result["documents"]:
+        base = base_docs.get(doc["name"], {})
+        print(f"  📄 {doc['name']}: 청크 {doc['chunks']}개, 마크다운 {doc['markdown_chars']:,}자")
+        for stage, seconds in doc["stages"].items():
+            print(f"     - {stage:<17} {seconds * 1000:9.1f}ms{delta(seconds, base.get('stages', {}).get(stage))}")
+
+    base_queries = (baseline or {}).get("queries", {})
+    for name in ("search", "search_batch", "retrieve", "answer", "answer_cached"):
+        summary = result["queries"].get(name)
+        if summary is None:
+            continue
+        base = base_queries.get(name, {})
+        print(f"  ❓ {name:<14} {summary['qps']} qps{delta(summary['qps'], base.get('qps'))}, "
+              f"p50 {summary['p50_ms']}ms, p95 {summary['p95_ms']}ms")
+    print(f"  📝 평균 프롬프트 토큰: {result['queries']['avg_prompt_tokens']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="오프라인 RAG 벤치마크 (가짜 임베딩/LLM 사용)")
+    parser.add_argument("--pages", type=int, nargs="*", default=[10, 40], help="합성 공고문 페이지 수 목록")
+    parser.add_argument("--repeat", type=int, default=1, help="문서별 단계 측정 반복 횟수 (최소값 기록)")
+    parser.add_argument("--model", choices=["openai", "gemini"], default="openai")
+    parser.add_argument("--embed-latency", type=float, default=0.0, help="가짜 임베딩 요청 1회당 지연 (초)")
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="가짜 LLM 요청 1회당 지연 (초)")
+    parser.add_argument("--output", help="결과 JSON 경로 (기본: data/benchmark/<시각>_<commit>.json)")
+    parser.add_argument("--compare", help="비교할 이전 결과 JSON 경로")
+    parser.add_argument("--verbose", action="store_true", help="서비스 로그 출력")
+    args = parser.parse_args()
+
+    result = run_benchmark(
+        args.pages, repeat=args.repeat, model=args.model,
+        embed_latency=args.embed_latency, llm_latency=args.llm_latency, verbose=args.verbose,
+    )
+
+    output = save_report(result, "benchmark", args.output)
+    baseline = load_report(args.compare)
+    print_summary(result, baseline)
+    print(f"✅ 결과 저장: {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
-import requests
+import asyncio
+from src.client.http_transport import AsyncHttpClient, get_http_session
 from src.config.config import API_BASE_URL, API_KEY
 
 class ApplyhomeAPIClient:
@@ -12,9 +13,11 @@ class ApplyhomeAPIClient:
         """
         self.base_url = base_url or API_BASE_URL
         self.api_key = api_key or API_KEY
-        self.session = requests.Session()
+        # 공유 연결 풀 사용 (keep-alive, 기본 타임아웃, 5xx/연결 오류 재시도)
+        self.session = get_http_session()
+        self.async_client = AsyncHttpClient(self.session)
 
-    def get_detail(self, houseDtlSecd="01", start_date=None, end_date=None, page=1):
+    def get_detail(self, houseDtlSecd="01", start_date=None, end_date=None, page=1, per_page=100):
         """
         공고 상세 정보 조회
         
@@ -23,7 +26,25 @@ class ApplyhomeAPIClient:
             start_date: 검색 시작일 (YYYY-MM-DD)
             end_date: 검색 종료일 (YYYY-MM-DD)
             page: 페이지 번호
+            per_page: 페이지당 건수
         """
+        endpoint, params = self._detail_request(houseDtlSecd, start_date, end_date, page, per_page)
+
+        response = self.session.get(endpoint, params=params)
+
+        print(f"응답 코드: {response.status_code}")
+
+        return response.json()
+
+    async def get_detail_async(self, houseDtlSecd="01", start_date=None, end_date=None, page=1, per_page=100):
+        """get_detail의 asyncio 버전 (여러 페이지/공고를 asyncio.gather로 동시에 조회할 때 사용)"""
+        endpoint, params = self._detail_request(houseDtlSecd, start_date, end_date, page, per_page)
+        response = await self.async_client.get(endpoint, params=params)
+        print(f"응답 코드: {response.status_code} (page {page})")
+        return response.json()
+
+    def _detail_request(self, houseDtlSecd, start_date, end_date, page, per_page):
+        """공고 상세 조회 요청 URL과 파라미터"""
         endpoint = f"{self.base_url}/ApplyhomeInfoDetailSvc/v1/getAPTLttotPblancDetail"
 
         params = {
@@ -32,7 +53,7 @@ class ApplyhomeAPIClient:
             # "pblancNo": pblancNo,
             "cond[HOUSE_DTL_SECD::EQ]": houseDtlSecd,
             "page": page,
-            "perPage": 100
+            "perPage": per_page
         }
 
         # 날짜 필터 추가 (모집공고일 기준)
@@ -49,10 +70,46 @@ class ApplyhomeAPIClient:
         print(f"Params: {params}")
         print("="*50 + "\n")
 
-        response = self.session.get(endpoint, params=params)
+        return endpoint, params
 
-        print(f"응답 코드: {response.status_code}")
+    def get_all_details(self, houseDtlSecd="01", start_date=None, end_date=None, per_page=100):
+        """
+        기간 내 공고 상세 정보를 모든 페이지에서 조회하여 목록으로 반환 (matchCount 기준으로 다음 페이지 요청)
+        오류 응답을 받으면 RuntimeError (일부 페이지만 반영되지 않도록)
 
-        return response.json()
+        Args:
+            houseDtlSecd: 주택구분코드 (01: 민영, 03: 국민)
+            start_date: 검색 시작일 (YYYY-MM-DD)
+            end_date: 검색 종료일 (YYYY-MM-DD)
+            per_page: 페이지당 건수
+        """
+        items = []
+        page = 1
+        while True:
+            response_data = self.get_detail(houseDtlSecd=houseDtlSecd, start_date=start_date, end_date=end_date, page=page, per_page=per_page)
+            data = self._page_data(response_data)
+            items.extend(data)
+            match_count = response_data.get("matchCount") or 0
+            if not data or page * per_page >= match_count:
+                return items
+            page += 1
+
+    async def get_all_details_async(self, houseDtlSecd="01", start_date=None, end_date=None, per_page=100):
+        """get_all_details의 asyncio 버전 (첫 페이지의 matchCount로 전체 페이지 수를 구한 뒤 나머지 페이지를 동시에 조회)"""
+        first = await self.get_detail_async(houseDtlSecd=houseDtlSecd, start_date=start_date, end_date=end_date, page=1, per_page=per_page)
+        items = list(self._page_data(first))
+        page_count = -(-(first.get("matchCount") or 0) // per_page)
+        rest = await asyncio.gather(*(
+            self.get_detail_async(houseDtlSecd=houseDtlSecd, start_date=start_date, end_date=end_date, page=page, per_page=per_page)
+            for page in range(2, page_count + 1)
+        ))
+        for response_data in rest:
+            items.extend(self._page_data(response_data))
+        return items
 
-    
\ No newline at end of file
+    @staticmethod
+    def _page_data(response_data: dict) -> list:
+        if "data" not in response_data:
+            # 인증키 오류/트래픽 초과 등은 data 없이 code/msg만 응답함 (빈 결과와 구분)
+            raise RuntimeError(f"공고 조회 실패: {response_data}")
+        return response_data["data"] or []
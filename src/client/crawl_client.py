@@ -1,5 +1,5 @@
-import requests # HTTP 요청 라이브러리
 from bs4 import BeautifulSoup # HTML 및 XML 문서 파싱 라이브러리
+from src.client.http_transport import get_http_session
 from src.config.config import PDF_BASE_URL
 
 class ApplyhomeCrawlClient:
@@ -11,7 +11,8 @@ class ApplyhomeCrawlClient:
             base_url
         """
         self.base_url = base_url or PDF_BASE_URL
-        self.sessiont = requests.Session()
+        # 공유 연결 풀 사용 (keep-alive, 기본 타임아웃, 5xx/연결 오류 재시도)
+        self.session = get_http_session()
         # applyhome.co.kr이 일반적인 requests.get() 방식의 크롤링을 차단하고 있음
         # applyhome.co.kr은 서버 측에서 특정 조건(예: 브라우저에서 보낸 요청인지, 봇인지)을 확인하여 응답을 다르게 보냄
         # 브라우저 접속 시: 정상적인 HTML 페이지가 로드됨
@@ -30,7 +31,7 @@ class ApplyhomeCrawlClient:
         Args:
             pblanc_url: 모집공고문 URL
         """
-        response = self.sessiont.get(pblanc_url, headers=self.headers)
+        response = self.session.get(pblanc_url, headers=self.headers)
 
         if response.status_code == 200:
             soup = BeautifulSoup(response.text, 'html.parser')
@@ -68,7 +69,7 @@ class ApplyhomeCrawlClient:
     #         "gvPgmId": "AIB01M01"
     #     }
 
-    #     response = self.sessiont.get(endpoint, params=params, headers=self.headers)
+    #     response = self.session.get(endpoint, params=params, headers=self.headers)
 
     #     if response.status_code == 200:
     #         soup = BeautifulSoup(response.text, 'html.parser')
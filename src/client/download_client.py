@@ -1,19 +1,147 @@
+import hashlib
+import os
 import requests
+from src.client.http_transport import get_http_session
+from src.config.config import PDF_DOWNLOAD_MAX_MB, PDF_DOWNLOAD_CONNECT_TIMEOUT, PDF_DOWNLOAD_READ_TIMEOUT
 
 class ApplyhomeDownloadClient:
-    def __init__(self):
+    def __init__(self, max_bytes=None, timeout=None, chunk_size=64 * 1024, max_attempts=3):
         """
         초기화
+
+        Args:
+            max_bytes: 다운로드 허용 최대 크기 (기본 100MB, 초과 시 중단)
+            timeout: (연결 타임아웃, 읽기 타임아웃) 초
+            chunk_size: 스트리밍 다운로드 시 한 번에 읽을 크기
+            max_attempts: 연결 끊김 시 이어받기(Range) 포함 최대 시도 횟수
         """
-    
-    def get_pdf(self, downloadUrl):
+        self.max_bytes = max_bytes or int(PDF_DOWNLOAD_MAX_MB or 100) * 1024 * 1024
+        self.timeout = timeout or (float(PDF_DOWNLOAD_CONNECT_TIMEOUT or 5), float(PDF_DOWNLOAD_READ_TIMEOUT or 60))
+        self.chunk_size = chunk_size
+        self.max_attempts = max_attempts
+        # 공유 연결 풀 사용 (keep-alive, 5xx/연결 오류 재시도 - 전송 중 끊김은 아래 이어받기로 처리)
+        self.session = get_http_session()
+
+    def download_to_file(self, downloadUrl, dest_path, etag=None, last_modified=None):
         """
+        PDF를 메모리에 올리지 않고 청크 단위로 파일에 스트리밍 저장
+        - dest_path + ".part"에 쓰고 완료 후 rename (중간에 실패해도 깨진 파일이 남지 않음)
+        - 연결이 끊기면 이번 호출에서 받은 부분부터 Range 요청으로 이어받기
+          (If-Range에 첫 응답의 ETag 또는 Last-Modified를 보내 파일이 바뀌었으면 전체를 다시 받음, 둘 다 없으면 처음부터 다시 받음)
+        - 이전 호출(프로세스 종료 등)에서 남은 .part는 어떤 버전인지 알 수 없으므로 사용하지 않음
+        - SHA-256은 받으면서 계산
 
         Args:
-            downloadUrl: 다운로드 URL   (ApplyhomeCrawlClient.get_pdf_url_by_pblanc_url() return value)
+            downloadUrl: 다운로드 URL
+            dest_path: 저장할 파일 경로
+            etag: 이전에 받은 ETag (조건부 요청 If-None-Match)
+            last_modified: 이전에 받은 Last-Modified (조건부 요청 If-Modified-Since)
+
+        Returns:
+            {"status": 200 또는 304, "path", "sha256", "size", "etag", "last_modified"}
+            실패 시 None
         """
-        response = requests.get(downloadUrl)
-        if response.status_code == 200:
-            return response.content
-        else:
-            return None
\ No newline at end of file
+        part_path = f"{dest_path}.part"
+        self._remove(part_path)
+        resume_validator = None  # 이번 호출의 첫 응답에서 받은 If-Range 값 (강한 ETag 또는 Last-Modified)
+
+        for attempt in range(self.max_attempts):
+            # 이번 호출에서 받은 부분이 있고 If-Range로 같은 파일인지 확인할 수 있으면 이어받기
+            offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+            if offset and not resume_validator:
+                self._remove(part_path)
+                offset = 0
+            headers = {}
+            if offset:
+                headers["Range"] = f"bytes={offset}-"
+                headers["If-Range"] = resume_validator  # 파일이 바뀌었으면 서버가 전체(200)를 다시 보냄
+            else:
+                if etag:
+                    headers["If-None-Match"] = etag
+                if last_modified:
+                    headers["If-Modified-Since"] = last_modified
+
+            try:
+                with self.session.get(downloadUrl, headers=headers, stream=True, timeout=self.timeout) as response:
+                    if response.status_code == 304 and not offset:
+                        return {"status": 304, "path": None, "sha256": None, "size": 0, "etag": etag, "last_modified": last_modified}
+                    if response.status_code not in (200, 206):
+                        self._remove(part_path)
+                        if offset:
+                            # 이어받기 실패 (416 등) - 받은 부분을 버리고 처음부터 다시 받음
+                            print(f"⚠️ PDF 이어받기 실패 (HTTP {response.status_code}), 처음부터 다시 받음: {downloadUrl}")
+                            continue
+                        print(f"PDF 다운로드 실패 (HTTP {response.status_code}): {downloadUrl}")
+                        return None
+
+                    if response.status_code == 200:
+                        offset = 0  # Range를 무시하고 전체를 보낸 경우 처음부터 다시 받음
+                    elif not offset or not response.headers.get("Content-Range", "").startswith(f"bytes {offset}-"):
+                        # 요청하지 않은 위치부터 보낸 부분 응답은 이어 붙일 수 없음
+                        print(f"⚠️ PDF 부분 응답 위치 불일치 ({response.headers.get('Content-Range')}), 처음부터 다시 받음: {downloadUrl}")
+                        self._remove(part_path)
+                        continue
+
+                    content_length = response.headers.get("Content-Length")
+                    if content_length and offset + int(content_length) > self.max_bytes:
+                        print(f"PDF 크기 초과 ({(offset + int(content_length)) / 1024 / 1024:.1f}MB): {downloadUrl}")
+                        self._remove(part_path)
+                        return None
+
+                    etag = response.headers.get("ETag") or etag
+                    last_modified = response.headers.get("Last-Modified") or last_modified
+                    if not offset:
+                        # If-Range에는 강한 ETag만 사용 가능 (약한 ETag(W/)면 Last-Modified 사용)
+                        response_etag = response.headers.get("ETag")
+                        resume_validator = (
+                            response_etag if response_etag and not response_etag.startswith("W/")
+                            else response.headers.get("Last-Modified")
+                        )
+                    sha256 = self._hash_existing(part_path, offset)
+                    size = offset
+
+                    with open(part_path, "ab" if offset else "wb") as f:
+                        for chunk in response.iter_content(chunk_size=self.chunk_size):
+                            if not chunk:
+                                continue
+                            size += len(chunk)
+                            if size > self.max_bytes:
+                                print(f"PDF 크기 초과 ({self.max_bytes / 1024 / 1024:.0f}MB 이상): {downloadUrl}")
+                                f.close()
+                                self._remove(part_path)
+                                return None
+                            f.write(chunk)
+                            sha256.update(chunk)
+
+                os.replace(part_path, dest_path)
+                return {
+                    "status": 200,
+                    "path": str(dest_path),
+                    "sha256": sha256.hexdigest(),
+                    "size": size,
+                    "etag": etag,
+                    "last_modified": last_modified,
+                }
+            except (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError) as e:
+                # 받은 부분(.part)은 남겨두고 다음 시도에서 이어받기
+                print(f"⚠️ PDF 다운로드 중 연결 오류, 이어받기 재시도... ({attempt + 1}/{self.max_attempts}): {e}")
+
+        self._remove(part_path)
+        print(f"PDF 다운로드 실패 (재시도 초과): {downloadUrl}")
+        return None
+
+    def _hash_existing(self, part_path, offset):
+        """이어받기 시 이미 받은 부분의 해시를 먼저 계산 (청크 단위로 읽어 메모리 사용 제한)"""
+        sha256 = hashlib.sha256()
+        if offset:
+            with open(part_path, "rb") as f:
+                for chunk in iter(lambda: f.read(self.chunk_size), b""):
+                    sha256.update(chunk)
+        return sha256
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,194 @@
+import asyncio
+import threading
+import time
+import weakref
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from src.config.config import HTTP_POOL_MAXSIZE, HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT, HTTP_MAX_RETRIES
+from src.services.metrics import HTTP_REQUEST_SECONDS, UPSTREAM_RETRIES
+
+
+class HostStats:
+    def __init__(self, window: int = 200):
+        """
+        호스트별 요청 통계 (요청 수, 실패 수, 재시도 수, 진행 중인 요청 수, 응답 시간)
+
+        Args:
+            window: 백분위 응답 시간 계산에 사용할 최근 요청 수
+        """
+        self.requests = 0
+        self.errors = 0
+        self.retries = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.total_seconds = 0.0
+        self.latencies = deque(maxlen=window)
+
+    def to_dict(self) -> dict:
+        latencies = sorted(self.latencies)
+
+        def percentile(p):
+            return round(latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000, 1) if latencies else None
+
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "retries": self.retries,
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "avg_ms": round(self.total_seconds / self.requests * 1000, 1) if self.requests else None,
+            "p50_ms": percentile(0.5),
+            "p95_ms": percentile(0.95),
+        }
+
+
+class _HostMetrics:
+    def __init__(self):
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    def _get(self, host: str) -> HostStats:
+        stats = self._hosts.get(host)
+        if stats is None:
+            stats = self._hosts[host] = HostStats()
+        return stats
+
+    def start(self, host: str):
+        with self._lock:
+            stats = self._get(host)
+            stats.in_flight += 1
+            stats.max_in_flight = max(stats.max_in_flight, stats.in_flight)
+
+    def finish(self, host: str, seconds: float, error: bool):
+        HTTP_REQUEST_SECONDS.labels(host=host).observe(seconds)
+        with self._lock:
+            stats = self._get(host)
+            stats.in_flight -= 1
+            stats.requests += 1
+            stats.errors += int(error)
+            stats.total_seconds += seconds
+            stats.latencies.append(seconds)
+
+    def retry(self, host: str):
+        UPSTREAM_RETRIES.labels(provider=host).inc()
+        with self._lock:
+            self._get(host).retries += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {host: stats.to_dict() for host, stats in sorted(self._hosts.items())}
+
+
+http_metrics = _HostMetrics()
+
+
+class _CountingRetry(Retry):
+    """재시도할 때마다 호스트별 재시도 수를 기록하는 urllib3 Retry"""
+
+    def increment(self, method=None, url=None, response=None, error=None, _pool=None, _stacktrace=None):
+        if _pool is not None:
+            http_metrics.retry(_pool.host)
+        return super().increment(method, url, response, error, _pool, _stacktrace)
+
+
+class PooledSession(requests.Session):
+    def __init__(self, timeout=None, pool_maxsize: int = None, max_retries: int = None, backoff_factor: float = 0.5):
+        """
+        호스트별 연결 풀(keep-alive)을 공유하는 requests.Session
+        - timeout을 지정하지 않은 요청에도 기본 (연결, 읽기) 타임아웃 적용
+        - 연결 오류와 5xx(500/502/503/504)는 exponential backoff로 재시도 (GET 등 멱등 요청만, Retry-After 헤더 존중)
+        - 호스트별 응답 시간 / 진행 중인 요청 수를 http_metrics에 기록
+
+        Args:
+            timeout: 기본 (연결 타임아웃, 읽기 타임아웃) 초 (None이면 HTTP_CONNECT_TIMEOUT / HTTP_READ_TIMEOUT, 기본 5 / 30)
+            pool_maxsize: 호스트당 유지할 연결 수 (None이면 HTTP_POOL_MAXSIZE, 기본 10)
+            max_retries: 재시도 횟수 (None이면 HTTP_MAX_RETRIES, 기본 3)
+            backoff_factor: 재시도 대기 시간 계수 (0.5 → 0.5초, 1초, 2초 ...)
+        """
+        super().__init__()
+        self.timeout = timeout or (float(HTTP_CONNECT_TIMEOUT or 5), float(HTTP_READ_TIMEOUT or 30))
+        if pool_maxsize is None:
+            pool_maxsize = int(HTTP_POOL_MAXSIZE) if HTTP_POOL_MAXSIZE else 10
+        if max_retries is None:
+            max_retries = int(HTTP_MAX_RETRIES) if HTTP_MAX_RETRIES else 3
+
+        retry = _CountingRetry(
+            total=max_retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=(500, 502, 503, 504),
+            raise_on_status=False,  # 재시도 후에도 5xx면 예외 대신 마지막 응답을 반환 (호출하는 쪽에서 status_code 확인)
+        )
+        # pool_connections: 연결 풀을 유지할 호스트 수, pool_maxsize: 호스트당 연결 수
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=pool_maxsize, max_retries=retry)
+        self.mount("https://", adapter)
+        self.mount("http://", adapter)
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        host = urlsplit(url).hostname or ""
+        http_metrics.start(host)
+        started = time.perf_counter()
+        error = True
+        try:
+            response = super().request(method, url, **kwargs)
+            error = response.status_code >= 500
+            return response
+        finally:
+            # stream=True 요청은 응답 헤더를 받을 때까지의 시간
+            http_metrics.finish(host, time.perf_counter() - started, error)
+
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_http_session() -> PooledSession:
+    """프로세스 전체에서 공유하는 PooledSession (Applyhome API / 크롤링 / PDF 다운로드 / Upstage 요청이 연결 풀을 함께 사용)"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = PooledSession()
+        return _session
+
+
+def get_http_stats() -> dict:
+    """호스트별 요청 통계"""
+    return http_metrics.snapshot()
+
+
+class AsyncHttpClient:
+    def __init__(self, session: PooledSession = None, max_concurrency_per_host: int = 8):
+        """
+        asyncio용 HTTP 클라이언트 (공유 PooledSession을 스레드에서 실행 - 연결 풀/재시도/통계를 그대로 사용)
+        여러 공고를 asyncio.gather로 동시에 조회할 때 호스트별 동시 요청 수를 제한합니다.
+
+        Args:
+            session: 사용할 세션 (None이면 get_http_session())
+            max_concurrency_per_host: 호스트별 최대 동시 요청 수
+        """
+        self.session = session or get_http_session()
+        self.max_concurrency_per_host = max_concurrency_per_host
+        self._semaphores = weakref.WeakKeyDictionary()  # 이벤트 루프 -> {호스트: asyncio.Semaphore} (asyncio.run마다 새 루프)
+        # asyncio 기본 스레드 풀은 CPU 수에 비례해 작으므로 (1 vCPU면 5개) 요청 대기용 스레드 풀을 따로 사용
+        self._executor = ThreadPoolExecutor(max_workers=32, thread_name_prefix="http-async")
+
+    def _semaphore(self, host: str) -> asyncio.Semaphore:
+        semaphores = self._semaphores.setdefault(asyncio.get_running_loop(), {})
+        if host not in semaphores:
+            semaphores[host] = asyncio.Semaphore(self.max_concurrency_per_host)
+        return semaphores[host]
+
+    async def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        async with self._semaphore(urlsplit(url).hostname or ""):
+            return await asyncio.get_running_loop().run_in_executor(
+                self._executor, lambda: self.session.request(method, url, **kwargs)
+            )
+
+    async def get(self, url: str, **kwargs) -> requests.Response:
+        return await self.request("GET", url, **kwargs)
@@ -14,8 +14,97 @@ GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
 LLAMA_CLOUD_API_KEY = os.getenv("LLAMA_CLOUD_API_KEY")
 
 CHUNK_BATCH_SIZE = os.getenv("CHUNK_BATCH_SIZE")
+# 청크 1개의 최대 토큰 수 (기본 800, 넘는 섹션/표는 나누어 저장)
+CHUNK_MAX_TOKENS = os.getenv("CHUNK_MAX_TOKENS")
 
 RENDER = os.getenv("RENDER")
 
 UPSTAGE_API_KEY = os.getenv("UPSTAGE_API_KEY")
-UPSTAGE_BASE_URL = os.getenv("UPSTAGE_BASE_URL")
\ No newline at end of file
+UPSTAGE_BASE_URL = os.getenv("UPSTAGE_BASE_URL")
+# Upstage document-parse 분할 요청 (요청 1회당 페이지 수(기본 10), 동시 요청 수(기본 4), 요청 타임아웃(초, 기본 120), 재시도 횟수(기본 3))
+# 테스트 시 UPSTAGE_BASE_URL을 로컬 스텁 서버(python -m src.services.rag.upstage_stub)로 지정
+UPSTAGE_PAGES_PER_REQUEST = os.getenv("UPSTAGE_PAGES_PER_REQUEST")
+UPSTAGE_MAX_WORKERS = os.getenv("UPSTAGE_MAX_WORKERS")
+UPSTAGE_TIMEOUT = os.getenv("UPSTAGE_TIMEOUT")
+UPSTAGE_MAX_RETRIES = os.getenv("UPSTAGE_MAX_RETRIES")
+# (디버그용) true이면 Upstage 변환 결과 HTML을 data/upstage_html/<PDF 파일명>.html에 저장
+UPSTAGE_DEBUG_HTML = os.getenv("UPSTAGE_DEBUG_HTML")
+
+INGEST_MAX_WORKERS = os.getenv("INGEST_MAX_WORKERS")
+# 추출/청킹과 임베딩을 동시에 진행할 때 임베딩 요청 1회에 넣을 청크 수, 단계 사이 대기열 크기(배치 수)
+INGEST_BATCH_SIZE = os.getenv("INGEST_BATCH_SIZE")
+INGEST_QUEUE_SIZE = os.getenv("INGEST_QUEUE_SIZE")
+
+# 임베딩 캐시 (미설정 시 벡터 DB 폴더 옆 data/embedding_cache.sqlite3 사용, "off"면 비활성화)
+EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH")
+EMBEDDING_CACHE_MAX_MB = os.getenv("EMBEDDING_CACHE_MAX_MB")
+# 질문 임베딩 메모리 캐시 최대 개수 (기본 500, 0이면 비활성화)
+QUERY_EMBEDDING_CACHE_SIZE = os.getenv("QUERY_EMBEDDING_CACHE_SIZE")
+
+# PDF 추출 결과 캐시 (미설정 시 벡터 DB 폴더 옆 data/extraction_cache.sqlite3 사용, "off"면 비활성화)
+EXTRACTION_CACHE_PATH = os.getenv("EXTRACTION_CACHE_PATH")
+EXTRACTION_CACHE_MAX_MB = os.getenv("EXTRACTION_CACHE_MAX_MB")
+
+# 제공자별 레이트 리밋 (예: "gemini-embedding=rpm:100,tpm:30000;openai-llm=rpm:500")
+RATE_LIMITS = os.getenv("RATE_LIMITS")
+
+# 하이브리드 검색 (벡터 + BM25 어휘 검색, "off"면 벡터 검색만 사용), 어휘 색인 폴더 (미설정 시 벡터 DB 폴더 옆 data/lexical_index)
+HYBRID_SEARCH = os.getenv("HYBRID_SEARCH")
+LEXICAL_INDEX_DIR = os.getenv("LEXICAL_INDEX_DIR")
+# 질문 1회에 프롬프트에 넣을 검색 청크 수 (기본: 하이브리드 검색 6개, 벡터 검색만 사용 시 10개)
+RETRIEVAL_K = os.getenv("RETRIEVAL_K")
+# 프롬프트 컨텍스트 최대 토큰 수 (기본 4000) / 이보다 행이 많은 표는 질문과 관련된 행만 남김 (기본 12)
+CONTEXT_TOKEN_BUDGET = os.getenv("CONTEXT_TOKEN_BUDGET")
+CONTEXT_MAX_TABLE_ROWS = os.getenv("CONTEXT_MAX_TABLE_ROWS")
+
+# 답변 캐시 (유사도 임계값, 유효 시간(초), 공고문/모델별 최대 개수)
+ANSWER_CACHE_THRESHOLD = os.getenv("ANSWER_CACHE_THRESHOLD")
+ANSWER_CACHE_TTL = os.getenv("ANSWER_CACHE_TTL")
+ANSWER_CACHE_MAX_ENTRIES = os.getenv("ANSWER_CACHE_MAX_ENTRIES")
+
+# 공고문 PDF 저장소 (미설정 시 data/pdf_store, "off"면 비활성화)
+PDF_STORE_DIR = os.getenv("PDF_STORE_DIR")
+PDF_STORE_MAX_MB = os.getenv("PDF_STORE_MAX_MB")
+# 저장된 PDF를 조건부 요청 없이 그대로 사용할 시간 (초)
+PDF_STORE_REVALIDATE_SECONDS = os.getenv("PDF_STORE_REVALIDATE_SECONDS")
+
+# 공유 HTTP 연결 풀 (호스트당 연결 수(기본 10), 기본 연결/읽기 타임아웃(초, 기본 5/30), 연결 오류/5xx 재시도 횟수(기본 3))
+HTTP_POOL_MAXSIZE = os.getenv("HTTP_POOL_MAXSIZE")
+HTTP_CONNECT_TIMEOUT = os.getenv("HTTP_CONNECT_TIMEOUT")
+HTTP_READ_TIMEOUT = os.getenv("HTTP_READ_TIMEOUT")
+HTTP_MAX_RETRIES = os.getenv("HTTP_MAX_RETRIES")
+
+# PDF 다운로드 (최대 크기(MB), 연결/읽기 타임아웃(초))
+PDF_DOWNLOAD_MAX_MB = os.getenv("PDF_DOWNLOAD_MAX_MB")
+PDF_DOWNLOAD_CONNECT_TIMEOUT = os.getenv("PDF_DOWNLOAD_CONNECT_TIMEOUT")
+PDF_DOWNLOAD_READ_TIMEOUT = os.getenv("PDF_DOWNLOAD_READ_TIMEOUT")
+
+# pdfplumber 추출 프로세스 풀 크기 (미설정 또는 1이면 순차 처리)
+PDF_EXTRACT_WORKERS = os.getenv("PDF_EXTRACT_WORKERS")
+
+# PDF 추출기 선택 ("auto"(기본)면 사전 검사로 텍스트 PDF / 스캔 PDF를 구분, 그 외에는 upstage, pdfplumber, pymupdf, llama, marker, saved-html 중 하나로 고정)
+PDF_EXTRACTOR = os.getenv("PDF_EXTRACTOR")
+# auto 모드에서 텍스트 PDF에 사용할 추출기 (기본 pdfplumber) / 스캔 PDF에 사용할 추출기 (기본 upstage)
+PDF_EXTRACTOR_TEXT = os.getenv("PDF_EXTRACTOR_TEXT")
+PDF_EXTRACTOR_SCAN = os.getenv("PDF_EXTRACTOR_SCAN")
+# 사전 검사할 페이지 수 (기본 3) / 텍스트 PDF로 판단할 페이지당 평균 글자 수 (기본 100)
+PDF_PRESCAN_PAGES = os.getenv("PDF_PRESCAN_PAGES")
+PDF_TEXT_LAYER_MIN_CHARS = os.getenv("PDF_TEXT_LAYER_MIN_CHARS")
+
+# 캘린더 공고 색인 (백그라운드 갱신 주기(초, 기본 600), 오늘 기준 모집공고일 조회 범위 - 과거/미래 일수 (기본 365/60))
+CALENDAR_REFRESH_SECONDS = os.getenv("CALENDAR_REFRESH_SECONDS")
+CALENDAR_PAST_DAYS = os.getenv("CALENDAR_PAST_DAYS")
+CALENDAR_FUTURE_DAYS = os.getenv("CALENDAR_FUTURE_DAYS")
+
+# 요청 추적 (메모리에 보관할 최근 트레이스 수(기본 200), 트레이스를 JSON Lines로 추가 기록할 파일 경로(미설정 시 메모리에만 보관))
+TRACE_BUFFER_SIZE = os.getenv("TRACE_BUFFER_SIZE")
+TRACE_EXPORT_PATH = os.getenv("TRACE_EXPORT_PATH")
+# 느린 요청 프로파일링 (요청/분석 작업이 이 시간(ms, 기본 5000/180000)을 넘기면 샘플링 프로파일 저장, 0이면 끔)
+PROFILE_SLOW_REQUEST_MS = os.getenv("PROFILE_SLOW_REQUEST_MS")
+PROFILE_SLOW_JOB_MS = os.getenv("PROFILE_SLOW_JOB_MS")
+# 샘플링 간격(ms, 기본 10) / 프로파일(.folded) 저장 위치 (기본 data/profiles)
+PROFILE_INTERVAL_MS = os.getenv("PROFILE_INTERVAL_MS")
+PROFILE_DIR = os.getenv("PROFILE_DIR")
+
+# 워커 예열 ("preload"면 fork 전에 무거운 모듈을 미리 import하고(gunicorn --preload), 워커 시작 시 백그라운드에서 서비스 초기화 / 미설정 시 첫 요청에서 지연 초기화)
+WARMUP_MODE = os.getenv("WARMUP_MODE")
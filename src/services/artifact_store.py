@@ -0,0 +1,152 @@
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from src.config.config import PDF_STORE_DIR, PDF_STORE_MAX_MB
+
+
+class PdfArtifactStore:
+    def __init__(self, root_dir: str, max_bytes: int = 500 * 1024 * 1024):
+        """
+        공고문 PDF 로컬 저장소
+        (house_manage_no, pblanc_no, house_secd) 별로 크롤링한 다운로드 URL과 PDF 파일, ETag/Last-Modified/SHA-256을 보관하여
+        같은 공고를 다시 분석할 때 크롤링/다운로드를 생략하거나 조건부 요청(304)으로 대체합니다.
+
+        Args:
+            root_dir: 저장 폴더 (PDF 파일 + index.sqlite3)
+            max_bytes: PDF 파일 총 용량 한도 (초과 시 가장 오래 사용되지 않은 공고부터 삭제)
+        """
+        self.root_dir = Path(root_dir)
+        self.root_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+        self.conn = sqlite3.connect(str(self.root_dir / "index.sqlite3"), check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS artifacts (
+                artifact_key TEXT PRIMARY KEY,
+                download_url TEXT,
+                file_name TEXT,
+                etag TEXT,
+                last_modified TEXT,
+                sha256 TEXT,
+                size INTEGER NOT NULL DEFAULT 0,
+                fetched_at REAL,
+                last_access REAL NOT NULL
+            )
+            """
+        )
+        self.conn.commit()
+
+    @staticmethod
+    def make_key(house_manage_no, pblanc_no, house_secd) -> str:
+        return f"{house_manage_no}_{pblanc_no}_{house_secd}"
+
+    def get(self, artifact_key: str):
+        """저장된 공고 정보 (dict) 반환. PDF 파일이 없어졌으면 파일 관련 정보는 비워서 반환"""
+        with self._lock:
+            row = self.conn.execute("SELECT * FROM artifacts WHERE artifact_key = ?", (artifact_key,)).fetchone()
+            if row is None:
+                return None
+            self.conn.execute("UPDATE artifacts SET last_access = ? WHERE artifact_key = ?", (time.time(), artifact_key))
+            self.conn.commit()
+
+        artifact = dict(row)
+        if artifact["file_name"] and not (self.root_dir / artifact["file_name"]).exists():
+            artifact.update(file_name=None, etag=None, last_modified=None, sha256=None, size=0)
+        artifact["path"] = str(self.root_dir / artifact["file_name"]) if artifact["file_name"] else None
+        return artifact
+
+    def put_download_url(self, artifact_key: str, download_url: str):
+        """크롤링한 PDF 다운로드 URL 저장"""
+        with self._lock:
+            self.conn.execute(
+                """
+                INSERT INTO artifacts (artifact_key, download_url, last_access) VALUES (?, ?, ?)
+                ON CONFLICT(artifact_key) DO UPDATE SET download_url = excluded.download_url, last_access = excluded.last_access
+                """,
+                (artifact_key, download_url, time.time()),
+            )
+            self.conn.commit()
+
+    def pdf_path(self, artifact_key: str) -> Path:
+        """PDF를 저장할 경로 (다운로드 클라이언트가 이 경로로 직접 스트리밍 저장)"""
+        return self.root_dir / f"{artifact_key}.pdf"
+
+    def put_pdf(self, artifact_key: str, download_url: str, sha256: str, size: int, etag: str = None, last_modified: str = None):
+        """pdf_path(artifact_key)에 저장 완료된 PDF의 메타데이터 등록"""
+        self._save_pdf_meta(artifact_key, download_url, self.pdf_path(artifact_key).name, etag, last_modified, sha256, size)
+
+    def mark_revalidated(self, artifact_key: str):
+        """조건부 요청 결과 변경 없음(304) - 검증 시각만 갱신"""
+        with self._lock:
+            now = time.time()
+            self.conn.execute(
+                "UPDATE artifacts SET fetched_at = ?, last_access = ? WHERE artifact_key = ?",
+                (now, now, artifact_key),
+            )
+            self.conn.commit()
+
+    def _save_pdf_meta(self, artifact_key, download_url, file_name, etag, last_modified, sha256, size):
+        now = time.time()
+        with self._lock:
+            self.conn.execute(
+                """
+                INSERT INTO artifacts (artifact_key, download_url, file_name, etag, last_modified, sha256, size, fetched_at, last_access)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(artifact_key) DO UPDATE SET
+                    download_url = excluded.download_url, file_name = excluded.file_name, etag = excluded.etag,
+                    last_modified = excluded.last_modified, sha256 = excluded.sha256, size = excluded.size,
+                    fetched_at = excluded.fetched_at, last_access = excluded.last_access
+                """,
+                (artifact_key, download_url, file_name, etag, last_modified, sha256, size, now, now),
+            )
+            self._evict(keep=artifact_key)
+            self.conn.commit()
+
+    def _evict(self, keep: str = None):
+        """PDF 총 용량이 한도를 넘으면 가장 오래 사용되지 않은 공고의 PDF부터 삭제 (lock 안에서 호출)"""
+        total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM artifacts").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        rows = self.conn.execute(
+            "SELECT artifact_key, file_name, size FROM artifacts WHERE size > 0 ORDER BY last_access ASC"
+        ).fetchall()
+        for row in rows:
+            if total <= self.max_bytes:
+                break
+            if row["artifact_key"] == keep:
+                continue
+            try:
+                (self.root_dir / row["file_name"]).unlink()
+            except FileNotFoundError:
+                pass
+            # 다운로드 URL은 용량이 작으므로 남겨두고 PDF 관련 정보만 삭제
+            self.conn.execute(
+                "UPDATE artifacts SET file_name = NULL, etag = NULL, last_modified = NULL, sha256 = NULL, size = 0 WHERE artifact_key = ?",
+                (row["artifact_key"],),
+            )
+            total -= row["size"]
+            print(f"🧹 PDF 저장소 용량 초과로 삭제: {row['artifact_key']}")
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_pdf_artifact_store():
+    """프로세스 전체에서 공유하는 PdfArtifactStore (PDF_STORE_DIR="off"면 None)"""
+    global _store
+    if PDF_STORE_DIR and PDF_STORE_DIR.lower() == "off":
+        return None
+    with _store_lock:
+        if _store is None:
+            root_dir = PDF_STORE_DIR or str(Path(__file__).parent.parent.parent / "data" / "pdf_store")
+            max_mb = int(PDF_STORE_MAX_MB) if PDF_STORE_MAX_MB else 500
+            _store = PdfArtifactStore(root_dir, max_bytes=max_mb * 1024 * 1024)
+            print(f"✅ PDF 저장소 사용: {root_dir} (최대 {max_mb}MB)")
+        return _store
@@ -0,0 +1,220 @@
+import hashlib
+import json
+import threading
+import time
+from bisect import bisect_left
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from typing import List, Optional, Tuple
+
+from src.config.config import CALENDAR_REFRESH_SECONDS, CALENDAR_PAST_DAYS, CALENDAR_FUTURE_DAYS
+
+# 캘린더에 표시할 주택구분코드 (01: 민영, 03: 국민)
+CALENDAR_HOUSE_DTL_SECDS = ["01", "03"]
+# 모집공고일부터 접수 시작일까지 걸리는 최대 기간 (조회 범위 앞쪽 공고가 빠지지 않도록 여유를 둠)
+ANNOUNCE_LOOKBACK_DAYS = 31
+# 요청받아 추가로 조회할 모집공고일 범위의 한도 (오늘 기준 앞뒤 2년) / 마지막 요청 후 유지 시간 (초)
+EXTRA_RANGE_MAX_DAYS = 730
+EXTRA_RANGE_TTL_SECONDS = 3600
+
+
+def _parse_date(value) -> Optional[date]:
+    """YYYY-MM-DD (FullCalendar의 2025-12-01T00:00:00+09:00 형식 포함) -> date, 형식이 맞지 않으면 None"""
+    if not value:
+        return None
+    try:
+        return datetime.strptime(str(value)[:10], "%Y-%m-%d").date()
+    except ValueError:
+        return None
+
+
+def to_calendar_event(apt: dict) -> Optional[dict]:
+    """공고 상세 1건을 FullCalendar 이벤트로 변환 (접수 시작일이 없으면 None)"""
+    if not apt.get('RCEPT_BGNDE'):
+        return None
+    end_date = apt.get('RCEPT_ENDDE')
+    # FullCalendar는 end 날짜가 exclusive하므로 캘린더 표시용으로 하루를 더함
+    adjusted_end_date = end_date
+    parsed_end = _parse_date(end_date)
+    if parsed_end:
+        adjusted_end_date = (parsed_end + timedelta(days=1)).strftime('%Y-%m-%d')
+
+    return {
+        'title': apt.get('HOUSE_NM'),
+        'start': apt.get('RCEPT_BGNDE'),
+        'end': adjusted_end_date,  # 캘린더 표시용: 하루 더한 값 (12/18)
+        'color': '#667eea',
+        'extendedProps': {
+            'pblanc_url': apt.get('PBLANC_URL'),
+            'house_manage_no': apt.get('HOUSE_MANAGE_NO'),
+            'pblanc_no': apt.get('PBLANC_NO'),
+            'house_secd': apt.get('HOUSE_SECD'),
+            'house_secd_nm': apt.get('HOUSE_SECD_NM'),
+            'house_dtl_secd_nm': apt.get('HOUSE_DTL_SECD_NM'),
+            'subscrpt_area_code_nm': apt.get('SUBSCRPT_AREA_CODE_NM'),
+            'startDate': apt.get('RCEPT_BGNDE'),
+            'endDate': end_date  # 헤더/팝업 표시용: 원래 날짜 (12/17)
+        }
+    }
+
+
+class _IntervalIndex:
+    def __init__(self, intervals: List[Tuple[date, date, dict]]):
+        """
+        (시작일, 종료일, 값) 구간 목록의 겹침 조회용 색인
+        시작일 순으로 정렬해 두고, 가장 긴 구간 길이만큼 앞에서부터 이진 탐색하여 후보를 좁힘 (O(log n + 후보 수))
+        """
+        self.intervals = sorted(intervals, key=lambda interval: interval[0])
+        self.starts = [interval[0] for interval in self.intervals]
+        self.max_length = max((end - start for start, end, _ in self.intervals), default=timedelta(0))
+
+    def overlapping(self, start: date, end: date) -> List[dict]:
+        """[start, end) 기간과 겹치는 구간의 값 목록 (시작일 순)"""
+        lo = bisect_left(self.starts, start - self.max_length)
+        hi = bisect_left(self.starts, end)
+        return [value for interval_start, interval_end, value in self.intervals[lo:hi] if interval_end >= start]
+
+    def __len__(self):
+        return len(self.intervals)
+
+
+class CalendarIndex:
+    def __init__(self, api_client, refresh_seconds: float = None, past_days: int = None, future_days: int = None, initial_wait: float = 10.0):
+        """
+        캘린더 공고 색인 (메모리)
+        모집공고일 기준 오늘 전후 기간의 공고(민영 01 + 국민 03, 모든 페이지)를 백그라운드 스레드에서 주기적으로 조회하여
+        접수 기간 구간 색인으로 보관하고, /api/calendar-data 요청은 외부 API 호출 없이 메모리에서 응답합니다.
+
+        Args:
+            api_client: ApplyhomeAPIClient
+            refresh_seconds: 갱신 주기 (초, None이면 CALENDAR_REFRESH_SECONDS, 기본 600)
+            past_days / future_days: 오늘 기준 모집공고일 조회 범위 (None이면 CALENDAR_PAST_DAYS / CALENDAR_FUTURE_DAYS, 기본 365 / 60)
+            initial_wait: 첫 조회가 끝나지 않았을 때 요청 스레드가 기다릴 최대 시간 (초)
+        """
+        if refresh_seconds is None:
+            refresh_seconds = float(CALENDAR_REFRESH_SECONDS) if CALENDAR_REFRESH_SECONDS else 600
+        if past_days is None:
+            past_days = int(CALENDAR_PAST_DAYS) if CALENDAR_PAST_DAYS else 365
+        if future_days is None:
+            future_days = int(CALENDAR_FUTURE_DAYS) if CALENDAR_FUTURE_DAYS else 60
+        self.api_client = api_client
+        self.refresh_seconds = refresh_seconds
+        self.past_days = past_days
+        self.future_days = future_days
+        self.initial_wait = initial_wait
+
+        self._lock = threading.Lock()
+        self._index = _IntervalIndex([])
+        self._version = ""  # 색인 내용 해시 (ETag 계산용)
+        self._extra_range = None  # 조회 범위 밖의 달을 요청받아 추가로 조회할 모집공고일 범위 (start, end)
+        self._extra_requested_at = 0.0  # 추가 범위를 마지막으로 요청받은 시각 (time.monotonic, TTL이 지나면 추가 범위 해제)
+        self.refreshed_at = None
+        self._loaded = threading.Event()
+        self._wake = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """백그라운드 갱신 스레드 시작 (이미 실행 중이면 무시)"""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="calendar-index", daemon=True)
+                self._thread.start()
+
+    def query(self, start_str: str, end_str: str) -> Tuple[List[dict], str]:
+        """
+        [start, end) 기간과 접수 기간이 겹치는 공고 이벤트 목록과 ETag
+        조회 범위 밖의 기간이면 백그라운드 조회를 예약하고 지금 가진 데이터로 응답
+        """
+        self.start()
+        if not self._loaded.is_set():
+            self._loaded.wait(self.initial_wait)
+
+        start = _parse_date(start_str) or date.today().replace(day=1)
+        end = _parse_date(end_str) or start + timedelta(days=42)
+        self._ensure_covered(start - timedelta(days=ANNOUNCE_LOOKBACK_DAYS), end)
+
+        with self._lock:
+            index, version = self._index, self._version
+        events = index.overlapping(start, end)
+        etag = hashlib.sha1(f"{version}:{start}:{end}".encode()).hexdigest()[:20]
+        return events, etag
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "events": len(self._index),
+                "refreshed_at": self.refreshed_at,
+                "range": [str(day) for day in self._announce_range()],
+            }
+
+    def _announce_range(self) -> Tuple[date, date]:
+        """조회할 모집공고일 범위 (오늘 기준 범위 + 요청받은 추가 범위, lock 안에서 호출)"""
+        today = date.today()
+        start, end = today - timedelta(days=self.past_days), today + timedelta(days=self.future_days)
+        if self._extra_range and time.monotonic() - self._extra_requested_at > EXTRA_RANGE_TTL_SECONDS:
+            # 한동안 요청이 없으면 추가 범위를 해제하여 이후 갱신은 기본 범위만 조회
+            self._extra_range = None
+        if self._extra_range:
+            start, end = min(start, self._extra_range[0]), max(end, self._extra_range[1])
+        return start, end
+
+    def _ensure_covered(self, start: date, end: date):
+        # 클라이언트가 보낸 범위를 그대로 넓히면 이후 모든 갱신이 그 기간 전체를 조회하므로 오늘 기준 한도 안으로 제한
+        today = date.today()
+        start = max(start, today - timedelta(days=EXTRA_RANGE_MAX_DAYS))
+        end = min(end, today + timedelta(days=EXTRA_RANGE_MAX_DAYS))
+        if start > end:
+            return
+        with self._lock:
+            covered_start, covered_end = self._announce_range()
+            if covered_start <= start and end <= covered_end:
+                if start < today - timedelta(days=self.past_days) or today + timedelta(days=self.future_days) < end:
+                    self._extra_requested_at = time.monotonic()  # 추가 범위를 계속 사용 중이면 유지
+                return
+            extra = self._extra_range or (start, end)
+            self._extra_range = (min(extra[0], start), max(extra[1], end))
+            self._extra_requested_at = time.monotonic()
+        print(f"📅 캘린더 색인 범위 확장 예약: {start} ~ {end}")
+        self._wake.set()
+
+    def _run(self):
+        while True:
+            self._wake.clear()
+            try:
+                self.refresh()
+            except Exception as e:
+                # 실패 시 이전 색인을 그대로 사용하고 다음 주기에 다시 시도
+                print(f"⚠️ 캘린더 색인 갱신 실패: {e}")
+            self._loaded.set()
+            # 갱신 주기가 지나거나 조회 범위 확장 요청(_ensure_covered)이 오면 다시 갱신
+            self._wake.wait(self.refresh_seconds)
+
+    def refresh(self):
+        """모집공고일 범위의 공고를 주택구분코드별로 동시에 모든 페이지 조회하여 색인 교체"""
+        with self._lock:
+            start, end = self._announce_range()
+        started = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=len(CALENDAR_HOUSE_DTL_SECDS), thread_name_prefix="calendar-fetch") as executor:
+            results = list(executor.map(
+                lambda secd: self.api_client.get_all_details(houseDtlSecd=secd, start_date=str(start), end_date=str(end)),
+                CALENDAR_HOUSE_DTL_SECDS,
+            ))
+
+        intervals, seen = [], set()
+        for apt in (apt for items in results for apt in items):
+            key = apt.get('HOUSE_MANAGE_NO')
+            event = to_calendar_event(apt)
+            event_start = _parse_date(event['start']) if event else None
+            if event_start is None or key in seen:
+                continue
+            seen.add(key)
+            event_end = _parse_date(apt.get('RCEPT_ENDDE')) or event_start
+            intervals.append((event_start, max(event_start, event_end), event))
+
+        index = _IntervalIndex(intervals)
+        version = hashlib.sha1(json.dumps([event for _, _, event in index.intervals], ensure_ascii=False, sort_keys=True).encode()).hexdigest()
+        with self._lock:
+            self._index, self._version = index, version
+            self.refreshed_at = time.time()
+        print(f"📅 캘린더 색인 갱신 완료: {len(index)}건 (모집공고일 {start} ~ {end}, {time.perf_counter() - started:.1f}초)")
@@ -1,4 +1,7 @@
 from src.client.crawl_client import ApplyhomeCrawlClient
+from src.services.artifact_store import get_pdf_artifact_store
+from src.services.metrics import STAGE_SECONDS
+from src.services.tracing import traced
 
 # client = ApplyhomeCrawlClient()
 # # houseManageNo - 주택관리 번호호
@@ -12,15 +15,29 @@ class CrawlUrlService: # 모집공고문 URL 크롤링 서비스
     def __init__(self):
         self.crawl_client = ApplyhomeCrawlClient()
 
-    def crawl_url(self, pblanc_url: str) -> str:
+    @STAGE_SECONDS.time(stage="crawl")
+    @traced("crawl_url")
+    def crawl_url(self, pblanc_url: str, artifact_key: str = None, refresh: bool = False) -> str:
         """
         모집공고문 상세 URL에서 PDF 다운로드 URL 크롤링
 
         Args:
             pblanc_url: 모집공고문 상세 URL
+            artifact_key: PDF 저장소 키 (지정 시 이전에 크롤링한 URL을 재사용)
+            refresh: True면 저장된 URL을 무시하고 다시 크롤링
 
         Returns:
             모집공고문 PDF 다운로드 URL
         """
+        store = get_pdf_artifact_store() if artifact_key else None
+        if store and not refresh:
+            artifact = store.get(artifact_key)
+            if artifact and artifact["download_url"]:
+                print(f"💾 저장된 다운로드 URL 사용: {artifact_key}")
+                return artifact["download_url"]
+
         print(pblanc_url)
-        return self.crawl_client.get_pdf_url_by_pblanc_url(pblanc_url)
+        download_url = self.crawl_client.get_pdf_url_by_pblanc_url(pblanc_url)
+        if store and download_url:
+            store.put_download_url(artifact_key, download_url)
+        return download_url
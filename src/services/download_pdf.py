@@ -1,8 +1,15 @@
 from pathlib import Path
+import os
+import shutil
+import time
 import img2pdf
 from pypdf import PdfReader, PdfWriter
 import io
 from src.client.download_client import ApplyhomeDownloadClient
+from src.config.config import PDF_STORE_REVALIDATE_SECONDS
+from src.services.artifact_store import get_pdf_artifact_store
+from src.services.metrics import STAGE_SECONDS
+from src.services.tracing import traced
 
 class DownloadPdfService: # PDF 다운로드 서비스
     def __init__(self):
@@ -10,35 +17,94 @@ class DownloadPdfService: # PDF 다운로드 서비스
         # 프로젝트 내부 임시 폴더 사용 (서버 재시작 시 삭제됨)
         self.temp_dir = Path("./tmp/pdfs")
         self.temp_dir.mkdir(parents=True, exist_ok=True)
+        # 저장된 PDF를 재검증 없이 사용할 시간 (기본 1시간)
+        self.revalidate_seconds = float(PDF_STORE_REVALIDATE_SECONDS) if PDF_STORE_REVALIDATE_SECONDS else 3600
 
-    def download_pdf(self, download_url: str, file_name: str) -> str:
+    @STAGE_SECONDS.time(stage="download")
+    @traced("download_pdf")
+    def download_pdf(self, download_url: str, file_name: str, artifact_key: str = None) -> str:
         """
         URL에서 PDF를 다운로드하여 임시 파일로 저장 (메모리 기반, 서버 재시작 시 삭제)
 
         Args:
             download_url: PDF 다운로드 URL
             file_name: 임시 파일명 (ex: 2025000486_2025000486_01.pdf)
+            artifact_key: PDF 저장소 키 (지정 시 저장된 PDF를 재사용하고 조건부 요청으로만 변경 여부 확인)
 
         Returns:
             임시 PDF 파일 경로
         """
         # 1. 임시 파일 경로 생성
         file_path = self.temp_dir / file_name
+
+        store = get_pdf_artifact_store() if artifact_key else None
+        if store:
+            stored_path = self._download_with_store(store, artifact_key, download_url)
+            if not stored_path:
+                return None
+            # 저장소 파일을 임시 경로에 연결 (Render에서 임시 파일을 삭제해도 저장소 파일은 유지됨)
+            self._link_or_copy(stored_path, file_path)
+            print(f"PDF 임시 저장 완료: {file_path}")
+            return str(file_path.absolute())
         
-        # 2. PDF 다운로드
-        content = self.download_client.get_pdf(download_url)
+        # 2. PDF 다운로드 (메모리에 올리지 않고 임시 파일로 바로 스트리밍 저장)
+        result = self.download_client.download_to_file(download_url, file_path)
 
-        if not content:
+        if not result:
             print(f"PDF 다운로드 실패: {download_url}")
             return None
         
-        # 3. 임시 파일에 저장 (서버 재시작 시 자동 삭제됨)
-        with open(file_path, "wb") as f:
-            f.write(content)
-        
-        print(f"PDF 임시 저장 완료: {file_path}")
+        print(f"PDF 임시 저장 완료: {file_path} ({result['size'] / 1024 / 1024:.1f}MB)")
         return str(file_path.absolute())
 
+    def _download_with_store(self, store, artifact_key: str, download_url: str) -> str:
+        """
+        PDF 저장소를 거쳐 다운로드하고 저장소 내 PDF 경로를 반환
+        - 최근에 검증한 PDF: 요청 없이 그대로 사용
+        - 오래된 PDF: ETag/Last-Modified 조건부 요청 (304면 재사용)
+        - 없는 PDF: 새로 다운로드하여 저장
+        """
+        artifact = store.get(artifact_key)
+        cached = artifact if artifact and artifact["path"] and artifact["download_url"] == download_url else None
+
+        if cached and time.time() - (cached["fetched_at"] or 0) < self.revalidate_seconds:
+            print(f"💾 저장된 PDF 사용 (재검증 생략): {artifact_key}")
+            return cached["path"]
+
+        result = self.download_client.download_to_file(
+            download_url,
+            store.pdf_path(artifact_key),
+            etag=cached["etag"] if cached else None,
+            last_modified=cached["last_modified"] if cached else None,
+        )
+
+        if result is None:
+            if cached and Path(cached["path"]).exists():
+                # 원본 서버 오류 시 저장된 PDF로 대체
+                print(f"⚠️ PDF 재검증 실패, 저장된 PDF 사용: {artifact_key}")
+                return cached["path"]
+            print(f"PDF 다운로드 실패: {download_url}")
+            return None
+
+        if result["status"] == 304:
+            print(f"💾 PDF 변경 없음 (304), 저장된 PDF 사용: {artifact_key}")
+            store.mark_revalidated(artifact_key)
+            return cached["path"]
+
+        store.put_pdf(artifact_key, download_url, result["sha256"], result["size"], etag=result["etag"], last_modified=result["last_modified"])
+        print(f"💾 PDF 저장소에 저장: {artifact_key} ({result['size'] / 1024 / 1024:.1f}MB)")
+        return result["path"]
+
+    @staticmethod
+    def _link_or_copy(src_path: str, dest_path: Path):
+        """하드 링크로 연결 (다른 파일 시스템이라 실패하면 복사)"""
+        if dest_path.exists():
+            dest_path.unlink()
+        try:
+            os.link(src_path, dest_path)
+        except OSError:
+            shutil.copyfile(src_path, dest_path)
+
 #     def merge_files_to_pdf(self, file_paths: list[str], output_filename: str) -> str:
 #         """
 #         실행 : python src/services/download_pdf.py
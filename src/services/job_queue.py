@@ -0,0 +1,143 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from src.config.config import PROFILE_SLOW_JOB_MS
+from src.services.metrics import INGEST_JOBS_IN_FLIGHT
+from src.services.tracing import start_trace
+
+# 공고 분석(ingestion) 단계 - RAGService.process_for_rag의 진행 상황 보고 단위와 동일
+INGESTION_STAGES = ["crawl", "download", "extract", "chunk", "embed"]
+
+
+class IngestionJob:
+    def __init__(self, job_id: str, key: str):
+        """
+        공고 분석 작업 1건의 상태
+
+        Args:
+            job_id: 작업 ID (uuid)
+            key: 중복 병합 키 (house_manage_no)
+        """
+        self.job_id = job_id
+        self.key = key
+        self.status = "queued"  # queued -> running -> success / error
+        self.stages = {stage: "pending" for stage in INGESTION_STAGES}  # pending -> running -> done / error
+        self.message = None
+        self.created_at = time.time()
+        self.updated_at = self.created_at
+        self._lock = threading.Lock()
+
+    def set_stage(self, stage: str, state: str):
+        """단계별 진행 상황 업데이트 (process_for_rag의 progress_callback으로 사용)"""
+        with self._lock:
+            self.stages[stage] = state
+            self.updated_at = time.time()
+
+    def start(self):
+        with self._lock:
+            self.status = "running"
+            self.updated_at = time.time()
+
+    def finish(self, status: str, message: str = None):
+        with self._lock:
+            self.status = status
+            self.message = message
+            # 실패한 경우 진행 중이던 단계를 error로 표시
+            if status == "error":
+                for stage, state in self.stages.items():
+                    if state == "running":
+                        self.stages[stage] = "error"
+            self.updated_at = time.time()
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in ("success", "error")
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            return {
+                "job_id": self.job_id,
+                "house_manage_no": self.key,
+                "status": self.status,
+                "stages": dict(self.stages),
+                "message": self.message,
+                "created_at": self.created_at,
+                "updated_at": self.updated_at,
+            }
+
+
+class IngestionJobQueue:
+    def __init__(self, max_workers: int = 1, max_jobs: int = 200):
+        """
+        공고 분석 작업 큐 (로컬 스레드 풀)
+        /api/analyze 요청 스레드에서 분석을 직접 수행하지 않고 작업만 등록한 뒤 즉시 반환하기 위해 사용
+
+        Args:
+            max_workers: 동시에 실행할 분석 작업 수 (512MB 환경에서는 1 권장)
+            max_jobs: 메모리에 보관할 작업 상태 최대 개수 (오래된 완료 작업부터 삭제)
+        """
+        self.max_jobs = max_jobs
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ingest")
+        self.jobs = OrderedDict()  # job_id -> IngestionJob
+        self.active = {}  # key(house_manage_no) -> 실행 대기/진행 중인 IngestionJob
+        self._lock = threading.Lock()
+
+    def submit(self, key: str, func) -> IngestionJob:
+        """
+        분석 작업 등록. 같은 key의 작업이 이미 대기/진행 중이면 새로 등록하지 않고 기존 작업을 반환합니다.
+
+        Args:
+            key: 중복 병합 키 (house_manage_no)
+            func: 실제 작업 함수. func(job) 형태로 호출되며 job.set_stage()로 진행 상황을 보고함
+        """
+        with self._lock:
+            existing = self.active.get(key)
+            if existing is not None and not existing.is_finished:
+                print(f"🔁 이미 진행 중인 분석 작업에 병합: {key} (job_id: {existing.job_id})")
+                return existing
+
+            job = IngestionJob(job_id=uuid.uuid4().hex, key=key)
+            self.jobs[job.job_id] = job
+            self.active[key] = job
+            self._evict()
+
+        self.executor.submit(self._run, job, func)
+        print(f"📥 분석 작업 등록: {key} (job_id: {job.job_id})")
+        return job
+
+    def get(self, job_id: str) -> IngestionJob:
+        with self._lock:
+            return self.jobs.get(job_id)
+
+    def _run(self, job: IngestionJob, func):
+        job.start()
+        INGEST_JOBS_IN_FLIGHT.inc()
+        # 분석 작업은 요청과 별도 트레이스로 기록 (느린 작업 기준은 PROFILE_SLOW_JOB_MS, 기본 180000ms)
+        trace = start_trace("ingest_job", slow_ms=float(PROFILE_SLOW_JOB_MS) if PROFILE_SLOW_JOB_MS else 180000, job_id=job.job_id, key=job.key)
+        try:
+            message = func(job)
+            job.finish("success", message)
+            trace.finish(status="success")
+            print(f"✅ 분석 작업 완료: {job.key} (job_id: {job.job_id})")
+        except Exception as e:
+            job.finish("error", str(e))
+            trace.finish(error=str(e), status="error")
+            print(f"❌ 분석 작업 실패: {job.key} (job_id: {job.job_id}) - {e}")
+        finally:
+            INGEST_JOBS_IN_FLIGHT.dec()
+            with self._lock:
+                if self.active.get(job.key) is job:
+                    del self.active[job.key]
+
+    def _evict(self):
+        """보관 개수를 넘으면 오래된 완료 작업부터 삭제 (lock 안에서 호출)"""
+        if len(self.jobs) <= self.max_jobs:
+            return
+        for job_id in list(self.jobs.keys()):
+            if len(self.jobs) <= self.max_jobs:
+                break
+            if self.jobs[job_id].is_finished:
+                del self.jobs[job_id]
@@ -0,0 +1,325 @@
+"""
+프로세스 내 메트릭 레지스트리 (Prometheus 텍스트 형식으로 /metrics에 노출)
+외부 라이브러리 없이 Counter / Gauge / Histogram만 제공하며, 값 기록은 잠금 1번 + 덧셈 수준이라 요청 처리 경로에 두어도 부담이 없습니다.
+
+사용법:
+    from src.services.metrics import STAGE_SECONDS, CACHE_REQUESTS
+
+    # 컨텍스트 매니저
+    with STAGE_SECONDS.time(stage="extract"):
+        raw = extractor.extract_raw(pdf_path)
+
+    # 데코레이터
+    @STAGE_SECONDS.time(stage="crawl")
+    def crawl_url(...): ...
+
+    CACHE_REQUESTS.labels(cache="answer", result="hit").inc()
+
+- 라벨 값 조합마다 하위 메트릭(labels(...))을 만들어 재사용 (라벨 값 종류가 적은 곳에만 사용)
+- gunicorn 워커가 여러 개면 워커(프로세스)별 값이 따로 집계됨
+"""
+import functools
+import os
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Iterable, Iterator, Tuple
+
+# 기본 히스토그램 구간 (초) - 수 ms 걸리는 검색부터 수 분 걸리는 OCR/임베딩까지
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        """
+        Args:
+            name: 메트릭 이름 (예: rag_stage_seconds)
+            documentation: HELP 설명
+            labelnames: 라벨 이름 목록 (없으면 라벨 없는 메트릭 하나)
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children = {}  # 라벨 값 튜플 -> 하위 메트릭
+        self._lock = threading.Lock()
+
+    def labels(self, **labels):
+        """라벨 값 조합에 해당하는 하위 메트릭 (처음 사용할 때 생성)"""
+        key = tuple([labels[name] for name in self.labelnames])
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _default(self):
+        """라벨 없는 메트릭의 하위 메트릭"""
+        if self.labelnames:
+            raise ValueError(f"{self.name}: 라벨 {self.labelnames} 값을 지정해야 합니다.")
+        return self.labels()
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def collect(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} {self.type_name}"
+        for key, child in sorted(list(self._children.items())):
+            yield from child.samples(self.name, self.labelnames, key)
+
+
+class _CounterChild:
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1):
+        with self._lock:
+            self.value += amount
+
+    def samples(self, name, labelnames, key):
+        yield f"{name}{_format_labels(labelnames, key)} {_format_value(self.value)}"
+
+
+class Counter(_Metric):
+    """증가만 하는 값 (요청 수, 토큰 수, 재시도 수 등). 이름은 _total로 끝나게 지음"""
+    type_name = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1):
+        self._default().inc(amount)
+
+
+class _GaugeChild:
+    def __init__(self):
+        self.value = 0.0
+        self.function = None
+        self._lock = threading.Lock()
+
+    def set(self, value: float):
+        with self._lock:
+            self.value = value
+
+    def inc(self, amount: float = 1):
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1):
+        self.inc(-amount)
+
+    def set_function(self, function: Callable[[], float]):
+        """값을 저장하는 대신 /metrics 조회 시점에 function()을 호출 (메모리 사용량 등)"""
+        self.function = function
+
+    def samples(self, name, labelnames, key):
+        value = self.value
+        if self.function is not None:
+            try:
+                value = self.function()
+            except Exception:
+                return
+        yield f"{name}{_format_labels(labelnames, key)} {_format_value(value)}"
+
+
+class Gauge(_Metric):
+    """오르내리는 현재 값 (진행 중인 작업 수, 메모리 사용량 등)"""
+    type_name = "gauge"
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def set(self, value: float):
+        self._default().set(value)
+
+    def inc(self, amount: float = 1):
+        self._default().inc(amount)
+
+    def dec(self, amount: float = 1):
+        self._default().dec(amount)
+
+    def set_function(self, function: Callable[[], float]):
+        self._default().set_function(function)
+
+
+class _Timer:
+    def __init__(self, child):
+        """히스토그램에 걸린 시간을 기록하는 컨텍스트 매니저 겸 데코레이터"""
+        self.child = child
+        self.started = None
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.child.observe(time.perf_counter() - self.started)
+        return False
+
+    def __call__(self, func):
+        # 데코레이터로 쓰면 호출마다 시작 시각을 따로 잡음 (여러 스레드에서 동시에 호출해도 안전)
+        child = self.child
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                child.observe(time.perf_counter() - started)
+        return wrapper
+
+
+class _HistogramChild:
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # 구간별 개수 (누적 아님, 마지막은 +Inf)
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+
+    def time(self) -> _Timer:
+        return _Timer(self)
+
+    def samples(self, name, labelnames, key):
+        with self._lock:
+            counts, total = list(self.counts), self.sum
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float("inf"),), counts):
+            cumulative += count
+            le = 'le="' + _format_value(bound) + '"'
+            yield f"{name}_bucket{_format_labels(labelnames, key, le)} {cumulative}"
+        yield f"{name}_sum{_format_labels(labelnames, key)} {_format_value(total)}"
+        yield f"{name}_count{_format_labels(labelnames, key)} {cumulative}"
+
+
+class Histogram(_Metric):
+    """값의 분포 (단계별 소요 시간 등). 구간별 개수와 합계/개수를 기록"""
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (), buckets: Iterable[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float, **labels):
+        (self.labels(**labels) if labels else self._default()).observe(value)
+
+    def time(self, **labels) -> _Timer:
+        """걸린 시간을 기록하는 컨텍스트 매니저 겸 데코레이터 (with STAGE_SECONDS.time(stage="chunk"): ...)"""
+        return _Timer(self.labels(**labels) if labels else self._default())
+
+
+class MetricsRegistry:
+    def __init__(self):
+        """메트릭 목록 (같은 이름으로 다시 만들면 기존 메트릭 반환)"""
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name: str, *args, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"{name}은(는) 이미 {metric.type_name}로 등록되어 있습니다.")
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self._get_or_create(Counter, name, documentation, labelnames)
+
+    def gauge(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Gauge:
+        return self._get_or_create(Gauge, name, documentation, labelnames)
+
+    def histogram(self, name: str, documentation: str, labelnames: Iterable[str] = (), buckets: Iterable[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._get_or_create(Histogram, name, documentation, labelnames, buckets)
+
+    def render(self) -> str:
+        """Prometheus 텍스트 형식 (version 0.0.4)"""
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda metric: metric.name)
+        lines = [line for metric in metrics for line in metric.collect()]
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+
+class Stopwatch:
+    def __init__(self):
+        """
+        제너레이터 단계의 소요 시간 누적 (iterate로 감싼 이터레이터의 next()에 걸린 시간만 합산)
+        변환 → 청킹 → 임베딩처럼 단계가 번갈아 실행되는 파이프라인에서 단계별 시간을 나눠 잴 때 사용
+        """
+        self.elapsed = 0.0
+
+    def iterate(self, iterable: Iterable) -> Iterator:
+        iterator = iter(iterable)
+        while True:
+            started = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                self.elapsed += time.perf_counter() - started
+                return
+            self.elapsed += time.perf_counter() - started
+            yield item
+
+
+def resident_memory_bytes() -> float:
+    """현재 RSS (Linux는 /proc/self/statm, 그 외에는 최대 RSS로 대신함)"""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        import resource
+        import sys
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+# ===== 공통 메트릭 =====
+# 단계: crawl / download / extract / html_to_markdown / chunk / embed / embed_query / vector_search / llm_generate
+STAGE_SECONDS = REGISTRY.histogram("rag_stage_seconds", "RAG 파이프라인 단계별 소요 시간 (초)", ["stage"])
+LLM_TOKENS = REGISTRY.counter("llm_tokens_total", "LLM 프롬프트/답변 토큰 수", ["model", "kind"])
+EMBEDDING_TOKENS = REGISTRY.counter("embedding_tokens_total", "임베딩 API로 보낸 토큰 수 (추정, 캐시 적중분 제외)", ["provider"])
+UPSTREAM_RETRIES = REGISTRY.counter("upstream_retries_total", "외부 API 재시도 수 (429/5xx/연결 오류, provider: 레이트 리미터 이름 또는 호스트)", ["provider"])
+RATE_LIMITED = REGISTRY.counter("rate_limited_total", "외부 API 할당량 초과(429) 응답 수", ["provider"])
+CACHE_REQUESTS = REGISTRY.counter("cache_requests_total", "캐시 조회 수 (result: hit / miss)", ["cache", "result"])
+HTTP_REQUEST_SECONDS = REGISTRY.histogram("http_request_seconds", "외부 호스트별 HTTP 요청 소요 시간 (초, 재시도 포함)", ["host"])
+INGEST_JOBS_IN_FLIGHT = REGISTRY.gauge("ingest_jobs_in_flight", "실행 중인 공고 분석 작업 수")
+RESIDENT_MEMORY = REGISTRY.gauge("process_resident_memory_bytes", "프로세스 메모리 사용량 (RSS, 바이트)")
+RESIDENT_MEMORY.set_function(resident_memory_bytes)
+
+
+def render_metrics() -> str:
+    return REGISTRY.render()
@@ -0,0 +1,90 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Optional
+
+from src.services.metrics import CACHE_REQUESTS
+
+
+def _normalize(vector: List[float]) -> List[float]:
+    norm = math.sqrt(sum(x * x for x in vector))
+    if norm == 0:
+        return list(vector)
+    return [x / norm for x in vector]
+
+
+class AnswerCache:
+    def __init__(self, threshold: float = 0.95, ttl: float = 3600, max_entries: int = 100):
+        """
+        공고문(doc_id)별 의미 기반 답변 캐시
+        새 질문의 임베딩이 캐시된 질문과 코사인 유사도 threshold 이상이면 LLM 호출 없이 캐시된 답변을 재사용합니다.
+        (대화 히스토리가 없는 첫 질문에만 사용 - 히스토리가 있으면 같은 질문이어도 답이 달라질 수 있음)
+
+        Args:
+            threshold: 캐시 적중으로 판단할 최소 코사인 유사도
+            ttl: 캐시 유효 시간 (초)
+            max_entries: (doc_id, 모델)별 최대 보관 개수 (초과 시 가장 오래 사용되지 않은 답변부터 삭제)
+        """
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.entries = {}  # (doc_id, model) -> OrderedDict[question -> (정규화된 임베딩, 답변, 저장 시각)]
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def lookup(self, doc_id: str, model: str, question_vector: List[float]) -> Optional[str]:
+        """유사한 질문의 캐시된 답변 반환 (없으면 None)"""
+        query = _normalize(question_vector)
+        now = time.time()
+        with self._lock:
+            bucket = self.entries.get((doc_id, model))
+            best_question, best_score = None, self.threshold
+            if bucket:
+                for question, (vector, _, created_at) in list(bucket.items()):
+                    if now - created_at > self.ttl:
+                        del bucket[question]
+                        continue
+                    score = sum(a * b for a, b in zip(query, vector))
+                    if score >= best_score:
+                        best_question, best_score = question, score
+
+            if best_question is None:
+                self.misses += 1
+                CACHE_REQUESTS.labels(cache="answer", result="miss").inc()
+                return None
+
+            self.hits += 1
+            CACHE_REQUESTS.labels(cache="answer", result="hit").inc()
+            bucket.move_to_end(best_question)
+            print(f"🎯 답변 캐시 적중 (유사도 {best_score:.3f}): {best_question}")
+            return bucket[best_question][1]
+
+    def store(self, doc_id: str, model: str, question: str, question_vector: List[float], answer: str):
+        with self._lock:
+            bucket = self.entries.setdefault((doc_id, model), OrderedDict())
+            bucket[question] = (_normalize(question_vector), answer, time.time())
+            bucket.move_to_end(question)
+            while len(bucket) > self.max_entries:
+                bucket.popitem(last=False)
+
+    def invalidate(self, doc_id: str):
+        """공고문 재등록 시 해당 doc_id의 캐시 삭제"""
+        with self._lock:
+            for key in [key for key in self.entries if key[0] == doc_id]:
+                del self.entries[key]
+
+    def clear(self):
+        with self._lock:
+            self.entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": sum(len(bucket) for bucket in self.entries.values()),
+            }
@@ -0,0 +1,173 @@
+import re
+import threading
+from typing import List
+
+from src.services.rag.lexical_index import tokenize
+from src.services.rag.rate_limiter import estimate_tokens
+from src.services.rag.text_chunker import TABLE_SEPARATOR_PATTERN
+
+# 표 행의 셀 구분자 (셀 내용의 이스케이프된 '\|'는 제외)
+UNESCAPED_PIPE_PATTERN = re.compile(r"(?<!\\)\|")
+
+# 모델별 tiktoken 인코딩 (tiktoken이 없거나 해당 모델이 없으면 estimate_tokens로 추정)
+TOKEN_ENCODINGS = {
+    "openai": "o200k_base",  # gpt-4o-mini
+}
+
+_encoders = {}
+_encoders_lock = threading.Lock()
+
+
+def count_tokens(text: str, model: str = "openai") -> int:
+    """
+    모델별 토큰 수
+    - openai: tiktoken(o200k_base)이 설치되어 있으면 정확히 계산
+    - 그 외(gemini 등) 또는 tiktoken이 없으면 estimate_tokens로 넉넉하게 추정
+    """
+    encoding_name = TOKEN_ENCODINGS.get(model)
+    if encoding_name:
+        with _encoders_lock:
+            if encoding_name not in _encoders:
+                try:
+                    import tiktoken
+                    _encoders[encoding_name] = tiktoken.get_encoding(encoding_name)
+                except Exception:
+                    # tiktoken 미설치 또는 인코딩 파일 다운로드 실패
+                    _encoders[encoding_name] = None
+            encoder = _encoders[encoding_name]
+        if encoder is not None:
+            return len(encoder.encode(text, disallowed_special=()))
+    return estimate_tokens(text)
+
+
+class ContextBuilder:
+    def __init__(self, token_budget: int = 4000, max_table_rows: int = 12, max_table_columns: int = 8, duplicate_threshold: float = 0.85):
+        """
+        검색된 청크들로 프롬프트의 [공고문 내용]을 구성 (중복 제거 → 표 축소 → 토큰 한도 내에서 관련도 순으로 채우기)
+
+        Args:
+            token_budget: 컨텍스트 최대 토큰 수 (모델별 count_tokens 기준)
+            max_table_rows: 이보다 행이 많은 표는 질문과 관련된 행만 남김
+            max_table_columns: 이보다 열이 많은 표는 질문과 관련된 열(+첫 열)만 남김
+            duplicate_threshold: 토큰 집합 유사도(Jaccard / 포함 비율)가 이 이상이면 중복으로 보고 관련도가 낮은 쪽 제거
+        """
+        self.token_budget = token_budget
+        self.max_table_rows = max_table_rows
+        self.max_table_columns = max_table_columns
+        self.duplicate_threshold = duplicate_threshold
+
+    def build(self, question: str, docs: List, model: str = "openai"):
+        """
+        :param docs: 관련도 순으로 정렬된 청크(Document) 목록
+        :return: (컨텍스트 문자열, 통계 dict - retrieved / duplicates / used / context_tokens)
+        """
+        query_tokens = set(tokenize(question))
+        unique_docs = self._deduplicate(docs)
+
+        parts, used_tokens = [], 0
+        for doc in unique_docs:
+            text = self._trim_tables(doc.page_content, query_tokens)
+            tokens = count_tokens(text, model)
+            if used_tokens + tokens > self.token_budget:
+                if parts:
+                    # 들어가지 않는 청크는 건너뛰고 더 작은 다음 청크로 남은 한도를 채움
+                    continue
+                # 가장 관련도 높은 청크 하나가 한도보다 크면 앞부분만 사용
+                text = text[:max(1, len(text) * self.token_budget // tokens)]
+                tokens = count_tokens(text, model)
+            parts.append(text)
+            used_tokens += tokens
+
+        stats = {
+            "retrieved": len(docs),
+            "duplicates": len(docs) - len(unique_docs),
+            "used": len(parts),
+            "context_tokens": used_tokens,
+        }
+        return "\n\n".join(parts), stats
+
+    def _deduplicate(self, docs: List) -> List:
+        """내용이 같거나 거의 같은(한쪽이 다른 쪽에 거의 포함되는) 청크는 관련도가 높은 것 하나만 남김"""
+        kept, kept_token_sets, seen_contents = [], [], set()
+        for doc in docs:
+            content = " ".join(doc.page_content.split())
+            if content in seen_contents:
+                continue
+            token_set = set(tokenize(content))
+            if token_set and any(self._is_near_duplicate(token_set, other) for other in kept_token_sets):
+                continue
+            kept.append(doc)
+            kept_token_sets.append(token_set)
+            seen_contents.add(content)
+        return kept
+
+    def _is_near_duplicate(self, tokens: set, other: set) -> bool:
+        if not other:
+            return False
+        overlap = len(tokens & other)
+        jaccard = overlap / len(tokens | other)
+        containment = overlap / min(len(tokens), len(other))
+        return jaccard >= self.duplicate_threshold or containment >= max(self.duplicate_threshold, 0.95)
+
+    def _trim_tables(self, text: str, query_tokens: set) -> str:
+        """청크 안의 마크다운 표(| 로 시작하는 연속된 줄)를 질문과 관련된 행/열만 남기도록 축소"""
+        if "|" not in text:
+            return text
+        lines = text.split("\n")
+        result, table = [], []
+        for line in lines + [""]:
+            if line.lstrip().startswith("|"):
+                table.append(line)
+                continue
+            if table:
+                result.extend(self._trim_table(table, query_tokens))
+                table = []
+            result.append(line)
+        result.pop()  # 끝에 붙인 빈 줄
+        return "\n".join(result)
+
+    def _trim_table(self, rows: List[str], query_tokens: set) -> List[str]:
+        separator_index = next((i for i, row in enumerate(rows) if TABLE_SEPARATOR_PATTERN.match(row.strip())), None)
+        if separator_index is None:
+            header, separator, body = [], None, rows
+        else:
+            header, separator, body = rows[:separator_index], rows[separator_index], rows[separator_index + 1:]
+
+        # 1. 행 축소: 질문 토큰이 많이 들어 있는 행을 원래 순서대로 최대 max_table_rows개 (관련된 행이 없으면 앞에서부터)
+        omitted_rows = 0
+        if len(body) > self.max_table_rows:
+            scores = [len(query_tokens & set(tokenize(row))) for row in body]
+            ranked = sorted((i for i in range(len(body)) if scores[i] > 0), key=lambda i: scores[i], reverse=True)
+            keep = sorted(ranked[:self.max_table_rows]) if ranked else list(range(self.max_table_rows))
+            omitted_rows = len(body) - len(keep)
+            body = [body[i] for i in keep]
+
+        # 2. 열 축소: 제목 행의 칸 중 질문과 관련된 열 + 첫 열 (관련된 열이 없으면 유지)
+        if header:
+            header_cells = self._cells(header[-1])
+            if len(header_cells) > self.max_table_columns:
+                matched = [i for i, cell in enumerate(header_cells) if query_tokens & set(tokenize(cell))]
+                if matched:
+                    columns = sorted({0, *matched})
+                    header = [self._join(self._cells(row), columns) for row in header]
+                    separator = "|" + "---|" * len(columns)
+                    body = [self._join(self._cells(row), columns) for row in body]
+
+        trimmed = header + ([separator] if separator else []) + body
+        if omitted_rows:
+            trimmed.append(f"(표의 나머지 {omitted_rows}행 생략)")
+        return trimmed
+
+    @staticmethod
+    def _cells(row: str) -> List[str]:
+        row = row.strip()
+        if row.startswith("|"):
+            row = row[1:]
+        if row.endswith("|") and not row.endswith("\\|"):
+            row = row[:-1]
+        # 셀 안의 '|'는 matrix_to_markdown에서 '\|'로 이스케이프되므로 이스케이프되지 않은 '|'로만 나눔
+        return [cell.strip() for cell in UNESCAPED_PIPE_PATTERN.split(row)]
+
+    @staticmethod
+    def _join(cells: List[str], columns: List[int]) -> str:
+        return "| " + " | ".join(cells[i] if i < len(cells) else "" for i in columns) + " |"
@@ -0,0 +1,264 @@
+import hashlib
+import sqlite3
+import threading
+import time
+import unicodedata
+from array import array
+from collections import OrderedDict
+from pathlib import Path
+from typing import List, Optional
+
+from src.services.metrics import CACHE_REQUESTS
+
+
+class EmbeddingCache:
+    def __init__(self, db_path: str, max_bytes: int = 200 * 1024 * 1024):
+        """
+        청크 임베딩 영구 캐시 (SQLite)
+        공통 유의사항 등 여러 공고문에 반복되는 청크는 한 번만 임베딩 API를 호출하도록 하기 위해 사용
+
+        - 키: (임베딩 모델명, 정규화된 청크 텍스트의 SHA-256)
+        - 값: float32 벡터 바이트
+        - 용량(max_bytes) 초과 시 가장 오래 사용되지 않은 벡터부터 삭제 (LRU)
+
+        Args:
+            db_path: SQLite 파일 경로
+            max_bytes: 캐시에 저장할 벡터의 최대 총 용량 (바이트)
+        """
+        self.db_path = db_path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        # gunicorn --threads 환경에서 여러 스레드가 같은 커넥션을 쓰므로 lock으로 보호
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS embeddings (
+                model TEXT NOT NULL,
+                text_hash TEXT NOT NULL,
+                vector BLOB NOT NULL,
+                last_access REAL NOT NULL,
+                PRIMARY KEY (model, text_hash)
+            )
+            """
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_last_access ON embeddings (last_access)")
+        self.conn.commit()
+        # 저장된 벡터 총 용량 (시작 시 한 번만 합산하고 이후에는 저장/삭제할 때 갱신 - 배치마다 테이블 전체를 합산하지 않도록)
+        self.total_bytes = self._sum_bytes()
+
+    def _sum_bytes(self) -> int:
+        return self.conn.execute("SELECT COALESCE(SUM(LENGTH(vector)), 0) FROM embeddings").fetchone()[0]
+
+    @staticmethod
+    def text_hash(text: str) -> str:
+        """공백/줄바꿈 차이는 같은 청크로 취급하도록 정규화 후 해시"""
+        normalized = " ".join(text.split())
+        return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+    def get_many(self, model: str, texts: List[str]) -> List[Optional[List[float]]]:
+        """텍스트 목록에 대한 캐시 조회. 없는 항목은 None"""
+        hashes = [self.text_hash(text) for text in texts]
+        found = {}
+        with self._lock:
+            # SQLite 변수 개수 제한(999)을 피하기 위해 나누어 조회
+            unique_hashes = list(set(hashes))
+            for i in range(0, len(unique_hashes), 500):
+                batch = unique_hashes[i:i + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = self.conn.execute(
+                    f"SELECT text_hash, vector FROM embeddings WHERE model = ? AND text_hash IN ({placeholders})",
+                    [model, *batch],
+                ).fetchall()
+                for text_hash, blob in rows:
+                    found[text_hash] = blob
+
+            if found:
+                now = time.time()
+                self.conn.executemany(
+                    "UPDATE embeddings SET last_access = ? WHERE model = ? AND text_hash = ?",
+                    [(now, model, text_hash) for text_hash in found],
+                )
+                self.conn.commit()
+
+            results = []
+            for text_hash in hashes:
+                blob = found.get(text_hash)
+                if blob is None:
+                    self.misses += 1
+                    results.append(None)
+                else:
+                    self.hits += 1
+                    results.append(array("f", blob).tolist())
+        hits = len(results) - results.count(None)
+        CACHE_REQUESTS.labels(cache="embedding", result="hit").inc(hits)
+        CACHE_REQUESTS.labels(cache="embedding", result="miss").inc(len(results) - hits)
+        return results
+
+    def put_many(self, model: str, texts: List[str], vectors: List[List[float]]):
+        """새로 계산한 임베딩 저장 후 용량 초과 시 LRU 삭제"""
+        now = time.time()
+        # 같은 텍스트가 여러 번 있으면 마지막 벡터만 저장 (INSERT OR REPLACE와 같은 결과)
+        blobs = {self.text_hash(text): array("f", vector).tobytes() for text, vector in zip(texts, vectors)}
+        rows = [(model, text_hash, blob, now) for text_hash, blob in blobs.items()]
+        with self._lock:
+            # 이미 있는 키는 교체되므로 기존 크기를 빼고 새 크기를 더함 (배치 크기만큼만 조회)
+            replaced = 0
+            hashes = list(blobs)
+            for i in range(0, len(hashes), 500):
+                batch = hashes[i:i + 500]
+                placeholders = ",".join("?" * len(batch))
+                replaced += self.conn.execute(
+                    f"SELECT COALESCE(SUM(LENGTH(vector)), 0) FROM embeddings WHERE model = ? AND text_hash IN ({placeholders})",
+                    [model, *batch],
+                ).fetchone()[0]
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, text_hash, vector, last_access) VALUES (?, ?, ?, ?)",
+                rows,
+            )
+            self.total_bytes += sum(len(blob) for blob in blobs.values()) - replaced
+            self._evict()
+            self.conn.commit()
+
+    def _evict(self):
+        """총 용량이 max_bytes를 넘으면 가장 오래 사용되지 않은 벡터부터 삭제 (lock 안에서 호출)"""
+        if self.total_bytes <= self.max_bytes:
+            return
+        # 같은 파일을 쓰는 다른 프로세스(gunicorn 워커)의 저장/삭제는 running total에 반영되지 않으므로 삭제 전에 한 번 다시 합산
+        self.total_bytes = self._sum_bytes()
+        if self.total_bytes <= self.max_bytes:
+            return
+
+        excess = self.total_bytes - self.max_bytes
+        removed = 0
+        delete_keys = []
+        for model, text_hash, size in self.conn.execute(
+            "SELECT model, text_hash, LENGTH(vector) FROM embeddings ORDER BY last_access ASC"
+        ):
+            delete_keys.append((model, text_hash))
+            removed += size
+            if removed >= excess:
+                break
+        self.conn.executemany("DELETE FROM embeddings WHERE model = ? AND text_hash = ?", delete_keys)
+        self.total_bytes -= removed
+        print(f"🧹 임베딩 캐시 용량 초과로 {len(delete_keys)}개 삭제 ({removed / 1024 / 1024:.1f}MB)")
+
+    def stats(self) -> dict:
+        """캐시 적중률 및 용량 정보"""
+        with self._lock:
+            count, total = self.conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(LENGTH(vector)), 0) FROM embeddings"
+            ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": count,
+            "bytes": total,
+            "max_bytes": self.max_bytes,
+        }
+
+
+class QueryEmbeddingCache:
+    def __init__(self, max_entries: int = 500):
+        """
+        질문 임베딩 메모리 캐시 (LRU)
+        같은 질문을 다시 하거나 재시도할 때 임베딩 API 왕복 없이 이전 벡터를 사용
+
+        - 키: (임베딩 모델명, 정규화된 질문 텍스트 - 유니코드 NFC + 공백/줄바꿈 정리)
+        - 값: float64 배열 (임베딩 API가 준 값 그대로, 1536차원 기준 항목당 약 12KB - 파이썬 리스트의 1/4 정도)
+
+        Args:
+            max_entries: 최대 보관 개수 (초과 시 가장 오래 사용되지 않은 질문부터 삭제)
+        """
+        self.max_entries = max_entries
+        self.entries = OrderedDict()  # (모델명, 정규화된 질문) -> array("d")
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        return " ".join(unicodedata.normalize("NFC", text).split())
+
+    def get(self, model: str, text: str) -> Optional[List[float]]:
+        """캐시된 질문 임베딩 (없으면 None)"""
+        key = (model, self.normalize(text))
+        with self._lock:
+            vector = self.entries.get(key)
+            if vector is None:
+                self.misses += 1
+                CACHE_REQUESTS.labels(cache="query_embedding", result="miss").inc()
+                return None
+            self.hits += 1
+            self.entries.move_to_end(key)
+        CACHE_REQUESTS.labels(cache="query_embedding", result="hit").inc()
+        return vector.tolist()
+
+    def put(self, model: str, text: str, vector: List[float]):
+        key = (model, self.normalize(text))
+        with self._lock:
+            self.entries[key] = array("d", vector)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self.entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": len(self.entries),
+                "max_entries": self.max_entries,
+            }
+
+
+class CachedEmbeddings:
+    def __init__(self, embeddings, cache: EmbeddingCache, model_name: str):
+        """
+        LangChain 임베딩 객체를 감싸서 EmbeddingCache를 먼저 조회하는 래퍼
+        Chroma의 embedding_function으로 그대로 전달해서 사용 (embed_documents / embed_query 인터페이스 동일)
+
+        Args:
+            embeddings: 실제 임베딩 객체 (OpenAIEmbeddings, GoogleGenerativeAIEmbeddings)
+            cache: EmbeddingCache
+            model_name: 캐시 키로 사용할 임베딩 모델명 (모델이 바뀌면 캐시도 분리됨)
+        """
+        self.embeddings = embeddings
+        self.cache = cache
+        self.model_name = model_name
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        vectors = self.cache.get_many(self.model_name, texts)
+        missing_indexes = [i for i, vector in enumerate(vectors) if vector is None]
+
+        if missing_indexes:
+            # 같은 배치 안에서 중복된 청크는 한 번만 임베딩
+            unique_texts = {}
+            for i in missing_indexes:
+                unique_texts.setdefault(EmbeddingCache.text_hash(texts[i]), texts[i])
+            missing_texts = list(unique_texts.values())
+            new_vectors = self.embeddings.embed_documents(missing_texts)
+            self.cache.put_many(self.model_name, missing_texts, new_vectors)
+
+            vector_by_hash = dict(zip(unique_texts.keys(), new_vectors))
+            for i in missing_indexes:
+                vectors[i] = vector_by_hash[EmbeddingCache.text_hash(texts[i])]
+
+        print(f"  🗃️ 임베딩 캐시: {len(texts) - len(missing_indexes)}/{len(texts)}개 적중")
+        return vectors
+
+    def embed_query(self, text: str) -> List[float]:
+        # 질문 임베딩은 영구 캐시에 저장하지 않음 (청크 임베딩과 용도가 다름 - VectorStoreService의 QueryEmbeddingCache가 메모리에 보관)
+        return self.embeddings.embed_query(text)
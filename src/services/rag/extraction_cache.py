@@ -0,0 +1,153 @@
+import hashlib
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Optional
+
+from src.services.metrics import CACHE_REQUESTS
+
+
+class ExtractionCache:
+    def __init__(self, db_path: str, max_bytes: int = 300 * 1024 * 1024):
+        """
+        PDF 추출 중간 결과 영구 캐시 (SQLite, zlib 압축)
+        같은 PDF를 다시 분석할 때(/api/reset 이후, 임베딩 모델 변경 후, 서버 재시작 후) 유료·저속인 OCR 추출과 변환/청킹을 생략하기 위해 사용
+
+        - 키: PDF 파일 내용의 SHA-256 + 추출기 이름/버전 (make_key)
+        - 종류(kind): "raw" (추출기 원본 결과, 예: Upstage HTML), "markdown" (정규화된 마크다운), "chunks:<청커 버전>" (청크 목록, JSON Lines)
+        - 용량(max_bytes, 압축 후 기준) 초과 시 가장 오래 사용되지 않은 항목부터 삭제 (LRU)
+
+        Args:
+            db_path: SQLite 파일 경로
+            max_bytes: 압축된 결과의 최대 총 용량 (바이트)
+        """
+        self.db_path = db_path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS extractions (
+                cache_key TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                data BLOB NOT NULL,
+                last_access REAL NOT NULL,
+                PRIMARY KEY (cache_key, kind)
+            )
+            """
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_extractions_last_access ON extractions (last_access)")
+        self.conn.commit()
+
+    @staticmethod
+    def file_sha256(path: str) -> Optional[str]:
+        """PDF 파일 내용의 SHA-256 (파일이 없으면 None)"""
+        try:
+            digest = hashlib.sha256()
+            with open(path, "rb") as f:
+                for block in iter(lambda: f.read(1024 * 1024), b""):
+                    digest.update(block)
+            return digest.hexdigest()
+        except OSError:
+            return None
+
+    @staticmethod
+    def make_key(pdf_sha256: str, extractor_name: str, extractor_version: str) -> str:
+        return f"{pdf_sha256}:{extractor_name}:{extractor_version}"
+
+    def get(self, cache_key: str, kind: str) -> Optional[str]:
+        """캐시된 결과(압축 해제된 문자열) 반환. 없으면 None"""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT data FROM extractions WHERE cache_key = ? AND kind = ?", (cache_key, kind)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                CACHE_REQUESTS.labels(cache="extraction", result="miss").inc()
+                return None
+            self.hits += 1
+            CACHE_REQUESTS.labels(cache="extraction", result="hit").inc()
+            self.conn.execute(
+                "UPDATE extractions SET last_access = ? WHERE cache_key = ? AND kind = ?",
+                (time.time(), cache_key, kind),
+            )
+            self.conn.commit()
+        return zlib.decompress(row[0]).decode("utf-8")
+
+    def put(self, cache_key: str, kind: str, text: str):
+        self._put_compressed(cache_key, kind, zlib.compress(text.encode("utf-8")))
+
+    def writer(self, cache_key: str, kind: str) -> "CacheWriter":
+        """조각 단위로 압축하며 기록하는 writer (전체 문자열을 메모리에 모으지 않음)"""
+        return CacheWriter(self, cache_key, kind)
+
+    def _put_compressed(self, cache_key: str, kind: str, data: bytes):
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO extractions (cache_key, kind, data, last_access) VALUES (?, ?, ?, ?)",
+                (cache_key, kind, data, time.time()),
+            )
+            self._evict()
+            self.conn.commit()
+
+    def _evict(self):
+        """총 용량이 max_bytes를 넘으면 가장 오래 사용되지 않은 항목부터 삭제 (lock 안에서 호출)"""
+        total = self.conn.execute("SELECT COALESCE(SUM(LENGTH(data)), 0) FROM extractions").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        excess = total - self.max_bytes
+        removed = 0
+        delete_keys = []
+        for cache_key, kind, size in self.conn.execute(
+            "SELECT cache_key, kind, LENGTH(data) FROM extractions ORDER BY last_access ASC"
+        ):
+            delete_keys.append((cache_key, kind))
+            removed += size
+            if removed >= excess:
+                break
+        self.conn.executemany("DELETE FROM extractions WHERE cache_key = ? AND kind = ?", delete_keys)
+        print(f"🧹 추출 캐시 용량 초과로 {len(delete_keys)}개 삭제 ({removed / 1024 / 1024:.1f}MB)")
+
+    def stats(self) -> dict:
+        """캐시 적중률 및 용량 정보"""
+        with self._lock:
+            count, total = self.conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(LENGTH(data)), 0) FROM extractions"
+            ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": count,
+            "bytes": total,
+            "max_bytes": self.max_bytes,
+        }
+
+
+class CacheWriter:
+    def __init__(self, cache: ExtractionCache, cache_key: str, kind: str):
+        """ExtractionCache.writer()로 생성. write()로 조각을 압축해 두었다가 commit() 시점에 저장 (중간에 실패하면 저장하지 않음)"""
+        self.cache = cache
+        self.cache_key = cache_key
+        self.kind = kind
+        self._compressor = zlib.compressobj()
+        self._parts = []
+
+    def write(self, text: str):
+        compressed = self._compressor.compress(text.encode("utf-8"))
+        if compressed:
+            self._parts.append(compressed)
+
+    def commit(self):
+        self._parts.append(self._compressor.flush())
+        self.cache._put_compressed(self.cache_key, self.kind, b"".join(self._parts))
+        self._parts = []
@@ -0,0 +1,214 @@
+import gc
+import threading
+from typing import Iterator
+
+from src.config.config import PDF_EXTRACTOR, PDF_EXTRACTOR_TEXT, PDF_EXTRACTOR_SCAN, PDF_TEXT_LAYER_MIN_CHARS, PDF_PRESCAN_PAGES
+from src.services.rag.text_chunker import page_marker
+
+
+class BaseExtractor:
+    """
+    PDF 추출기 공통 인터페이스
+    - extract_raw(pdf_path): PDF에서 원본 결과(문자열)를 추출 (Upstage HTML, 로컬 추출기는 마크다운)
+    - iter_raw(pdf_path): 원본 결과를 페이지(범위) 단위 조각으로 yield (이어 붙이면 extract_raw 결과와 같음)
+      추출과 임베딩이 동시에 진행되고 문서 전체를 메모리에 올리지 않도록 수집 파이프라인에서는 이것을 사용
+      (기본 구현은 extract_raw 결과 전체를 한 조각으로 반환)
+    - iter_markdown(raw): 원본 결과(조각)를 마크다운 조각으로 변환해 yield (페이지 표시 <!-- page: N -->를 넣으면 청크 metadata의 page로 기록)
+    - name / version: 추출 캐시 키와 청크 metadata("extractor")에 기록 (결과가 달라지는 수정을 하면 version을 올림)
+    - cache_raw: 원본 결과를 추출 캐시에 따로 보관할지 여부 (원본 == 마크다운이면 False)
+    """
+    name = ""
+    version = "1"
+    cache_raw = False
+
+    def extract_raw(self, pdf_path: str) -> str:
+        raise NotImplementedError
+
+    def iter_raw(self, pdf_path: str) -> Iterator[str]:
+        yield self.extract_raw(pdf_path)
+
+    def iter_markdown(self, raw: str) -> Iterator[str]:
+        yield raw
+
+
+_EXTRACTORS = {}  # 등록 이름 -> 추출기 클래스
+_instances = {}
+_instances_lock = threading.Lock()
+
+
+def register_extractor(key: str):
+    """추출기 클래스를 등록하는 데코레이터 (PDF_EXTRACTOR / PDF_EXTRACTOR_TEXT / PDF_EXTRACTOR_SCAN 값으로 선택)"""
+    def decorator(cls):
+        _EXTRACTORS[key] = cls
+        return cls
+    return decorator
+
+
+def available_extractors():
+    return sorted(_EXTRACTORS)
+
+
+def get_extractor(key: str) -> BaseExtractor:
+    """등록된 추출기 인스턴스 (처음 사용할 때 생성하여 재사용, 무거운 라이브러리는 이때 로드)"""
+    if key not in _EXTRACTORS:
+        raise ValueError(f"알 수 없는 PDF 추출기: {key} (사용 가능: {', '.join(available_extractors())})")
+    with _instances_lock:
+        if key not in _instances:
+            _instances[key] = _EXTRACTORS[key]()
+            gc.collect()
+        return _instances[key]
+
+
+def has_text_layer(pdf_path: str, sample_pages: int = None, min_chars: int = None) -> bool:
+    """
+    사전 검사: PDF 앞쪽 몇 페이지의 글자 수로 텍스트 레이어 유무를 판단 (표/레이아웃 분석 없이 글자만 셈)
+    페이지당 평균 글자 수가 min_chars 이상이면 텍스트 PDF, 아니면 이미지(스캔) PDF로 판단
+
+    Args:
+        pdf_path: PDF 파일 경로
+        sample_pages: 검사할 페이지 수 (None이면 PDF_PRESCAN_PAGES, 기본 3)
+        min_chars: 페이지당 최소 평균 글자 수 (None이면 PDF_TEXT_LAYER_MIN_CHARS, 기본 100)
+    """
+    import pdfplumber
+
+    if sample_pages is None:
+        sample_pages = int(PDF_PRESCAN_PAGES) if PDF_PRESCAN_PAGES else 3
+    if min_chars is None:
+        min_chars = int(PDF_TEXT_LAYER_MIN_CHARS) if PDF_TEXT_LAYER_MIN_CHARS else 100
+
+    try:
+        with pdfplumber.open(pdf_path) as pdf:
+            pages = pdf.pages[:sample_pages]
+            if not pages:
+                return False
+            char_count = 0
+            for page in pages:
+                char_count += sum(1 for char in page.chars if not char["text"].isspace())
+                page.close()
+            return char_count / len(pages) >= min_chars
+    except Exception as e:
+        # 열 수 없는 PDF는 OCR 쪽에서 처리하도록 넘김
+        print(f"⚠️ PDF 사전 검사 실패: {e}")
+        return False
+
+
+def select_extractor(pdf_path: str) -> BaseExtractor:
+    """
+    PDF마다 사용할 추출기 선택
+    - PDF_EXTRACTOR가 "auto"(기본)면 사전 검사 결과에 따라 텍스트 PDF는 PDF_EXTRACTOR_TEXT(기본 pdfplumber),
+      스캔 PDF는 PDF_EXTRACTOR_SCAN(기본 upstage)
+    - 그 외에는 지정한 추출기를 항상 사용
+    """
+    mode = (PDF_EXTRACTOR or "auto").lower()
+    if mode != "auto":
+        return get_extractor(mode)
+
+    if has_text_layer(pdf_path):
+        key, reason = (PDF_EXTRACTOR_TEXT or "pdfplumber").lower(), "텍스트 레이어 있음"
+    else:
+        key, reason = (PDF_EXTRACTOR_SCAN or "upstage").lower(), "텍스트 레이어 없음 (스캔)"
+    print(f"🔎 PDF 사전 검사: {reason} → {key}")
+    return get_extractor(key)
+
+
+@register_extractor("upstage")
+class UpstageExtractor(BaseExtractor):
+    """Upstage Document Parse(OCR) API로 HTML을 받아 표 정규화 후 마크다운 변환 (유료, 느림)"""
+    name = "upstage-document-parse"
+    version = "1"
+    cache_raw = True
+
+    def __init__(self):
+        from src.services.rag.pdf_extractor import PDFExtractor
+        self.pdf_extractor = PDFExtractor()
+
+    def extract_raw(self, pdf_path: str) -> str:
+        return self.pdf_extractor.extract_html_by_document_digitization(pdf_path)
+
+    def iter_raw(self, pdf_path: str) -> Iterator[str]:
+        # 분할 요청한 페이지 범위별 HTML (표는 범위를 넘지 않으므로 조각마다 따로 마크다운 변환 가능)
+        yield from self.pdf_extractor.iter_html_by_document_digitization(pdf_path)
+
+    def iter_markdown(self, raw: str) -> Iterator[str]:
+        yield from self.pdf_extractor.iter_markdown(raw)
+
+
+@register_extractor("saved-html")
+class SavedHtmlExtractor(UpstageExtractor):
+    """(개발용) API 사용 방지를 위해 저장해 둔 extracted_view.html(역삼센트럴자이)을 항상 사용"""
+    name = "saved-html"
+    cache_raw = False
+
+    def extract_raw(self, pdf_path: str) -> str:
+        with open("extracted_view.html", "r", encoding="utf-8") as f:
+            return f.read()
+
+    def iter_raw(self, pdf_path: str) -> Iterator[str]:
+        yield self.extract_raw(pdf_path)
+
+
+@register_extractor("pdfplumber")
+class PdfPlumberExtractor(BaseExtractor):
+    """pdfplumber로 텍스트/표를 추출하고 DataProcessor로 마크다운 변환 (텍스트 PDF용 로컬 경로)"""
+    name = "pdfplumber"
+    version = "2"
+
+    def __init__(self):
+        from src.services.rag.pdf_extractor import PDFExtractor
+        from src.services.rag.data_processor import DataProcessor
+        self.pdf_extractor = PDFExtractor()
+        self.data_processor = DataProcessor()
+
+    def extract_raw(self, pdf_path: str) -> str:
+        return "".join(self.iter_raw(pdf_path))
+
+    def iter_raw(self, pdf_path: str) -> Iterator[str]:
+        # 페이지마다 <!-- page: N --> 표시를 앞에 붙여 청크 metadata에 페이지 번호를 남김
+        for index, page_content in enumerate(self.pdf_extractor.iter_content(pdf_path)):
+            processed_docs = [page_marker(page_content[0]["page"])]
+            processed_docs.extend(self.data_processor.process_content(page_content))
+            yield ("\n\n" if index else "") + "\n\n".join(processed_docs)
+
+
+@register_extractor("pymupdf")
+class PyMuPDFExtractor(BaseExtractor):
+    """PyMuPDF4LLM으로 페이지별 마크다운 추출 (텍스트 PDF용 로컬 경로, pymupdf4llm 설치 필요)"""
+    name = "pymupdf4llm"
+    version = "2"
+
+    def __init__(self):
+        from src.services.rag.pdf_extractor_pymupdf import PDFExtractorPyMuPDF
+        self.extractor = PDFExtractorPyMuPDF()
+
+    def extract_raw(self, pdf_path: str) -> str:
+        return "\n\n".join(
+            f"{page_marker(item['page'])}\n\n{item['content']}" for item in self.extractor.extract_content(pdf_path)
+        )
+
+
+@register_extractor("llama")
+class LlamaParseExtractor(BaseExtractor):
+    """LlamaParse API로 마크다운 추출 (llama-parse 설치 및 LLAMA_CLOUD_API_KEY 필요)"""
+    name = "llama-parse"
+    version = "1"
+
+    def __init__(self):
+        from src.services.rag.pdf_extractor_llama import PDFExtractorLlama
+        self.extractor = PDFExtractorLlama()
+
+    def extract_raw(self, pdf_path: str) -> str:
+        return "\n\n".join(item["content"] for item in self.extractor.extract_content(pdf_path))
+
+
+@register_extractor("marker")
+class MarkerExtractor(BaseExtractor):
+    """Marker 모델로 마크다운 추출 (marker-pdf, PyTorch 설치 필요)"""
+    name = "marker"
+    version = "1"
+
+    def __init__(self):
+        from src.services.rag.pdf_extractor_marker import PDFExtractorMarker
+        self.extractor = PDFExtractorMarker()
+
+    def extract_raw(self, pdf_path: str) -> str:
+        return "\n\n".join(item["content"] for item in self.extractor.extract_content(pdf_path))
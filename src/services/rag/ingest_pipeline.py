@@ -0,0 +1,67 @@
+import contextvars
+import queue
+import threading
+from typing import Iterable, Iterator
+
+_DONE = object()
+
+
+class _StageError:
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+def run_in_background(items: Iterable, maxsize: int = 4, name: str = "stage") -> Iterator:
+    """
+    items(제너레이터)를 별도 스레드에서 미리 꺼내 크기 제한 큐(maxsize)에 담아두고, 호출한 쪽에서는 큐에서 순서대로 꺼내 사용
+    - 큐가 가득 차면 앞 단계가 멈추므로(backpressure) 메모리에는 최대 maxsize개만 올라감
+    - 앞 단계(추출/청킹)와 뒤 단계(임베딩/저장)가 동시에 진행됨
+    - 앞 단계에서 발생한 예외는 호출한 쪽에서 그대로 재발생
+    - 호출한 쪽의 컨텍스트(contextvars)를 복사해 실행하므로 앞 단계의 스팬도 같은 트레이스에 기록됨
+
+    Args:
+        items: 앞 단계 제너레이터
+        maxsize: 단계 사이 큐 크기
+        name: 스레드 이름 (로그용)
+    """
+    buffer = queue.Queue(maxsize=maxsize)
+    stop = threading.Event()
+
+    def put(item) -> bool:
+        # 소비하는 쪽이 중단되면(stop) 더 이상 기다리지 않고 종료
+        while not stop.is_set():
+            try:
+                buffer.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            for item in items:
+                if not put(item):
+                    return
+            put(_DONE)
+        except BaseException as e:
+            put(_StageError(e))
+        finally:
+            # 중단된 경우에도 앞 단계 제너레이터를 바로 닫아 추출기/캐시 기록/파일을 정리
+            close = getattr(items, "close", None)
+            if close:
+                close()
+
+    thread = threading.Thread(target=contextvars.copy_context().run, args=(produce,), name=f"ingest-{name}", daemon=True)
+    thread.start()
+
+    try:
+        while True:
+            item = buffer.get()
+            if item is _DONE:
+                return
+            if isinstance(item, _StageError):
+                raise item.error
+            yield item
+    finally:
+        stop.set()
+
@@ -0,0 +1,179 @@
+import gzip
+import json
+import math
+import re
+import threading
+from collections import Counter, OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# 한글은 연속된 글자를 2글자 단위(bigram)로, 영문/숫자는 단어 단위로 자름 (형태소 분석기 없이 조사/띄어쓰기 차이에 강함)
+# 숫자는 소수점/하이픈을 포함해 한 토큰으로 유지 (예: 84.9543, 2025-01-15, 084.9543A)
+_TOKEN_PATTERN = re.compile(r"[가-힣]+|[a-z0-9]+(?:[.\-][a-z0-9]+)*|㎡")
+
+
+def tokenize(text: str) -> List[str]:
+    """검색용 토큰 목록 (한글 글자 bigram + 영문/숫자 단어)"""
+    tokens = []
+    for word in _TOKEN_PATTERN.findall(text.lower()):
+        if "가" <= word[0] <= "힣" and len(word) > 1:
+            tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+        else:
+            tokens.append(word)
+    return tokens
+
+
+class _DocumentIndex:
+    def __init__(self, ids=None, lengths=None, postings=None):
+        """문서(doc_id) 1개의 BM25 역색인 (청크 번호 -> 벡터 DB id / 토큰 수, 토큰 -> [(청크 번호, 빈도)])"""
+        self.ids: List[str] = ids or []
+        self.lengths: List[int] = lengths or []
+        self.postings: Dict[str, List[Tuple[int, int]]] = postings or {}
+
+    def add(self, chunk_id: str, text: str):
+        index = len(self.ids)
+        counts = Counter(tokenize(text))
+        self.ids.append(chunk_id)
+        self.lengths.append(sum(counts.values()))
+        for token, count in counts.items():
+            self.postings.setdefault(token, []).append((index, count))
+
+    def search(self, query: str, k: int, k1: float = 1.2, b: float = 0.75) -> List[Tuple[str, float]]:
+        """BM25 점수 상위 k개 청크의 (벡터 DB id, 점수)"""
+        if not self.ids:
+            return []
+        chunk_count = len(self.ids)
+        average_length = sum(self.lengths) / chunk_count or 1.0
+        scores = {}
+        for token in set(tokenize(query)):
+            postings = self.postings.get(token)
+            if not postings:
+                continue
+            idf = math.log(1 + (chunk_count - len(postings) + 0.5) / (len(postings) + 0.5))
+            for index, count in postings:
+                norm = k1 * (1 - b + b * self.lengths[index] / average_length)
+                scores[index] = scores.get(index, 0.0) + idf * count * (k1 + 1) / (count + norm)
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+        return [(self.ids[index], score) for index, score in ranked]
+
+    def to_dict(self) -> dict:
+        return {"ids": self.ids, "lengths": self.lengths, "postings": self.postings}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "_DocumentIndex":
+        postings = {token: [tuple(entry) for entry in entries] for token, entries in data["postings"].items()}
+        return cls(data["ids"], data["lengths"], postings)
+
+
+class LexicalIndex:
+    def __init__(self, index_dir: Optional[str] = None, max_loaded: int = 32):
+        """
+        공고문(doc_id)별 BM25 어휘 색인
+        표가 많은 공고문에서 정확한 수치/코드/날짜(예: "84㎡ 분양가", 주택형 코드)를 찾는 질문은
+        벡터 검색만으로는 다른 표 청크가 검색되기 쉬우므로 어휘 검색 결과와 합쳐서(RRF) 사용합니다.
+        - 적재 시 청크를 추가하고(add) 문서 적재가 끝나면 저장(save) - 문서당 gzip JSON 파일 1개
+        - 검색 시 필요한 문서만 불러오고 최근 사용한 max_loaded개만 메모리에 유지
+
+        Args:
+            index_dir: 저장 폴더 (None이면 메모리에만 보관)
+            max_loaded: 메모리에 유지할 문서 색인 수
+        """
+        self.index_dir = Path(index_dir) if index_dir else None
+        if self.index_dir:
+            self.index_dir.mkdir(parents=True, exist_ok=True)
+        self.max_loaded = max_loaded
+        self._indexes: "OrderedDict[str, _DocumentIndex]" = OrderedDict()
+        self._pending = set()  # 아직 저장하지 않은 doc_id
+        self._lock = threading.Lock()
+
+    def _path(self, doc_id: str) -> Path:
+        return self.index_dir / (re.sub(r"[^\w.-]", "_", doc_id) + ".json.gz")
+
+    def add(self, doc_id: str, chunk_ids: List[str], texts: List[str]):
+        """청크 추가 (save 전까지는 메모리에만 반영)"""
+        doc_id = str(doc_id)
+        with self._lock:
+            index = self._indexes.get(doc_id)
+            if index is None:
+                index = self._indexes[doc_id] = _DocumentIndex()
+            for chunk_id, text in zip(chunk_ids, texts):
+                index.add(chunk_id, text)
+            self._pending.add(doc_id)
+
+    def save(self, doc_id: str):
+        """문서 색인을 파일로 저장 (메모리 모드에서는 저장 없이 유지)"""
+        doc_id = str(doc_id)
+        with self._lock:
+            index = self._indexes.get(doc_id)
+            if index is None:
+                return
+            if self.index_dir:
+                path = self._path(doc_id)
+                temp_path = path.with_suffix(".tmp")
+                with gzip.open(temp_path, "wt", encoding="utf-8") as f:
+                    json.dump(index.to_dict(), f, ensure_ascii=False)
+                temp_path.replace(path)
+            self._pending.discard(doc_id)
+            self._trim()
+
+    def has(self, doc_id: str) -> bool:
+        doc_id = str(doc_id)
+        with self._lock:
+            return doc_id in self._indexes or bool(self.index_dir and self._path(doc_id).exists())
+
+    def search(self, doc_id: str, query: str, k: int = 20) -> List[Tuple[str, float]]:
+        """doc_id 색인에서 BM25 상위 k개 (벡터 DB id, 점수). 색인이 없으면 빈 리스트"""
+        doc_id = str(doc_id)
+        with self._lock:
+            index = self._indexes.get(doc_id)
+            if index is None and self.index_dir and self._path(doc_id).exists():
+                with gzip.open(self._path(doc_id), "rt", encoding="utf-8") as f:
+                    index = _DocumentIndex.from_dict(json.load(f))
+                self._indexes[doc_id] = index
+                self._trim()
+            if index is None:
+                return []
+            self._indexes.move_to_end(doc_id)
+        return index.search(query, k)
+
+    def delete(self, doc_id: str):
+        doc_id = str(doc_id)
+        with self._lock:
+            self._indexes.pop(doc_id, None)
+            self._pending.discard(doc_id)
+            if self.index_dir:
+                self._path(doc_id).unlink(missing_ok=True)
+
+    def clear(self):
+        with self._lock:
+            self._indexes.clear()
+            self._pending.clear()
+            if self.index_dir:
+                for path in self.index_dir.glob("*.json.gz"):
+                    path.unlink(missing_ok=True)
+
+    def _trim(self):
+        """저장된 문서 색인은 최근 사용한 max_loaded개만 메모리에 유지 (lock 안에서 호출)"""
+        if not self.index_dir:
+            return
+        for doc_id in list(self._indexes):
+            if len(self._indexes) <= self.max_loaded:
+                break
+            if doc_id not in self._pending:
+                del self._indexes[doc_id]
+
+
+def reciprocal_rank_fusion(rankings: List[List[str]], k: int = 60) -> List[str]:
+    """
+    여러 검색 결과 순위를 RRF(Reciprocal Rank Fusion)로 합침: 점수 = Σ 1 / (k + 순위)
+    점수 크기가 다른 벡터 유사도와 BM25 점수를 정규화 없이 합칠 수 있음
+
+    Args:
+        rankings: 검색 방식별 결과 키 목록 (앞쪽일수록 상위)
+        k: 순위 완화 상수 (기본 60)
+    """
+    scores = {}
+    for ranking in rankings:
+        for rank, key in enumerate(ranking, start=1):
+            scores[key] = scores.get(key, 0.0) + 1.0 / (k + rank)
+    return sorted(scores, key=scores.get, reverse=True)
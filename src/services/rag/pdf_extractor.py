@@ -1,16 +1,170 @@
 # import pdfplumber
 import gc
+import io
+import random
+import time
 import requests
+import html
 import html2text
 # from openai import OpenAI
-from src.config.config import UPSTAGE_API_KEY, UPSTAGE_BASE_URL
-from typing import List, Dict, Any
-from bs4 import BeautifulSoup
+from src.config.config import UPSTAGE_API_KEY, UPSTAGE_BASE_URL, PDF_EXTRACT_WORKERS, UPSTAGE_PAGES_PER_REQUEST, UPSTAGE_MAX_WORKERS, UPSTAGE_TIMEOUT, UPSTAGE_MAX_RETRIES, UPSTAGE_DEBUG_HTML
+from src.services.rag.text_chunker import PAGE_MARKER_PATTERN, page_marker
+from src.services.metrics import UPSTREAM_RETRIES
+from typing import List, Dict, Any, Iterator
+
+# 닫는 태그가 없는 태그 (표 안의 열린 태그 추적에서 제외)
+VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"}
+
+
+def parse_span(value) -> int:
+    """rowspan / colspan 값 파싱 (없거나 잘못된 값은 1, 음수는 0 - 칸을 차지하지 않음)"""
+    try:
+        return max(int(value), 0)
+    except (TypeError, ValueError):
+        return 1
+
+
+class MarkdownConverter(html2text.HTML2Text):
+    def __init__(self, extractor):
+        """
+        HTML → 마크다운 단일 패스 변환기
+        html2text 파서가 태그를 읽는 순서 그대로 본문은 마크다운으로 쓰고, <table>은 행/칸을 직접 모아두었다가
+        표가 닫히는 시점에 정규화된 마크다운 표를 출력 버퍼에 바로 씁니다.
+        (BeautifulSoup 트리 생성, 문서 재직렬화, 표 개수만큼의 마커 치환이 없음)
+
+        Args:
+            extractor: 표 정규화/마크다운 변환에 사용할 PDFExtractor
+        """
+        super().__init__()
+        self.bypass_tables = True  # 표는 직접 처리
+        self.ignore_links = False
+        self.body_width = 0        # 자동 줄바꿈 방지
+        self.extractor = extractor
+        self.table_depth = 0       # 중첩된 표 깊이
+        self.table_rows = []       # 가장 바깥 표의 행 (중첩된 표의 행 포함 - 문서 순서)
+        self.table_stack = []      # 표 안에서 열려 있는 태그 [태그, 행 또는 칸]
+
+    def convert(self, html_string: str, chunk_chars: int = 16 * 1024):
+        """
+        HTML을 chunk_chars 글자씩 파서에 넣으면서 그때까지 완성된 마크다운 조각을 yield
+        """
+        self.start = True
+        start = 0
+        while start < len(html_string):
+            # 텍스트가 두 번에 나뉘어 들어가면 마크다운 이스케이프 결과가 달라질 수 있으므로 태그 시작(<) 직전에서 자름
+            end = html_string.find("<", start + chunk_chars)
+            if end == -1:
+                end = len(html_string)
+            self.feed(html_string[start:end])
+            start = end
+            # 마지막 조각은 html2text가 되돌려 쓸 수 있으므로(빈 링크의 "[") 남겨둠
+            if len(self.outtextlist) > 1:
+                text = "".join(self.outtextlist[:-1])
+                del self.outtextlist[:-1]
+                yield text.replace("&nbsp_place_holder;", " ")
+        text = self.finish()
+        if text:
+            yield text
+
+    def handle_tag(self, tag, attrs, start):
+        if tag == "table" or self.table_depth:
+            self._handle_table_tag(tag, attrs, start)
+        else:
+            super().handle_tag(tag, attrs, start)
+
+    def handle_comment(self, data):
+        # 페이지 구분 표시(<!-- page: N -->)는 마크다운에도 문단으로 남겨 청킹 시 페이지 metadata로 사용 (그 외 주석은 무시)
+        match = PAGE_MARKER_PATTERN.fullmatch(f"<!--{data}-->")
+        if match and not self.table_depth:
+            super().handle_tag("p", {}, True)
+            self.o(page_marker(int(match.group(1))), force=True)
+            super().handle_tag("p", None, False)
+
+    def handle_data(self, data, entity_char=False):
+        if not self.table_depth:
+            super().handle_data(data, entity_char)
+            return
+        # 표 안의 텍스트는 열려 있는 모든 칸에 추가 (중첩된 표의 텍스트는 바깥 칸에도 포함)
+        for tag, item in self.table_stack:
+            if tag in ("td", "th"):
+                item[1].append(data)
+
+    def handle_charref(self, c):
+        if self.table_depth:
+            self.handle_data(html.unescape(f"&#{c};"), True)
+        else:
+            super().handle_charref(c)
+
+    def handle_entityref(self, c):
+        if self.table_depth:
+            self.handle_data(html.unescape(f"&{c};"), True)
+        else:
+            super().handle_entityref(c)
+
+    def _close_until(self, tags, boundary):
+        """boundary를 넘지 않는 범위에서 가장 가까운 tags 중 하나까지 닫기 (닫는 태그가 생략된 td/tr 처리)"""
+        stack = self.table_stack
+        for i in range(len(stack) - 1, -1, -1):
+            if stack[i][0] in tags:
+                del stack[i:]
+                return True
+            if stack[i][0] in boundary:
+                return False
+        return False
+
+    def _handle_table_tag(self, tag, attrs, start):
+        stack = self.table_stack
+        if not start:
+            if tag == "table":
+                if self._close_until(("table",), ()):
+                    self.table_depth -= 1
+                    if self.table_depth == 0:
+                        self._write_table()
+            else:
+                self._close_until((tag,), ("table",))
+            return
+
+        if tag in VOID_TAGS:
+            return
+        if tag == "table":
+            self.table_depth += 1
+            stack.append(["table", None])
+        elif tag == "tr":
+            self._close_until(("tr",), ("table",))
+            row = []
+            self.table_rows.append(row)
+            stack.append(["tr", row])
+        elif tag in ("td", "th"):
+            self._close_until(("td", "th"), ("tr", "table"))
+            cell = [attrs, []]  # [속성, 텍스트 조각들]
+            # tr 바로 아래의 td, th만 칸으로 인정
+            if stack and stack[-1][0] == "tr":
+                stack[-1][1].append(cell)
+            stack.append([tag, cell])
+        else:
+            stack.append([tag, None])
+
+    def _write_table(self):
+        rows = [
+            [
+                (parse_span(attrs.get("rowspan", 1)), parse_span(attrs.get("colspan", 1)), " ".join("".join(texts).split()))
+                for attrs, texts in row
+            ]
+            for row in self.table_rows
+        ]
+        self.table_rows = []
+        self.table_stack = []
+        markdown_table = self.extractor.matrix_to_markdown(self.extractor.normalize_table_rows(rows))
+        # 표 하나를 문단처럼 앞뒤 빈 줄로 구분 (청킹 시 문단 경계)
+        super().handle_tag("p", {}, True)
+        self.o(markdown_table, force=True)
+        super().handle_tag("p", None, False)
+
 
 class PDFExtractor:
     def normalize_html_table(self, table_html, debug=False):
         """
-        rowspan, colspan이 포함된 HTML 표를 모든 칸이 채워진 2차원 리스트로 변환
+        rowspan, colspan이 포함된 HTML 표(BeautifulSoup 태그)를 모든 칸이 채워진 2차원 리스트로 변환
         """
         if not table_html:
             if debug: print("DEBUG: table_html is empty")
@@ -18,55 +172,72 @@ class PDFExtractor:
         
         if debug: print(f"\n--- DEBUG START: Table ID {table_html.get('id', 'unknown')} ---")
         
-        grid = {}
         # 표 내부의 모든 행(tr)을 찾습니다.
-        rows = table_html.find_all('tr')
+        rows = []
+        for row in table_html.find_all('tr'):
+            # 현재 행(tr) 바로 아래의 td, th만 찾습니다.
+            cells = [child for child in row.children if child.name in ('td', 'th')]
+            rows.append([
+                # (rowspan, colspan, 공백/줄바꿈을 정리한 셀 텍스트)
+                (parse_span(cell.get('rowspan', 1)), parse_span(cell.get('colspan', 1)), " ".join(cell.get_text().split()))
+                for cell in cells
+            ])
         if debug: print(f"DEBUG: Total rows found: {len(rows)}")
 
-        curr_row = 0
-        for row in rows:
+        table_matrix = self.normalize_table_rows(rows, debug=debug)
+        if debug: print("--- DEBUG END ---\n")
+        return table_matrix
+
+    def normalize_table_rows(self, rows, debug=False):
+        """
+        행별 칸 목록 [[(rowspan, colspan, 내용), ...], ...]을 병합이 풀린 2차원 리스트로 변환
+        - 행마다 칸 리스트를 늘려가며(빈 칸은 None) 채우므로 칸마다 (행, 열) 튜플/해시를 만들지 않음
+        - 행 안에서는 다음 빈 칸 위치(curr_col)가 앞으로만 이동하므로 전체 칸 수에 비례하는 시간에 처리
+        """
+        grid = []  # grid[r][c]: 칸 내용 (아직 채워지지 않은 칸은 None)
+        max_row = max_col = 0  # 내용이 채워진 범위
+
+        for curr_row, cells in enumerate(rows):
+            if curr_row >= len(grid):
+                grid.append([])
+            row_cells = grid[curr_row]
             curr_col = 0
-            # 현재 행(tr) 바로 아래의 td, th만 찾습니다.
-            cells = row.find_all(['td', 'th'], recursive=False)
             if debug: print(f"  DEBUG: Row {curr_row} - Cells found: {len(cells)}")
 
-            for cell in cells:
-                # 이미 점유된 칸 건너뛰기
-                while (curr_row, curr_col) in grid:
+            for rowspan, colspan, content in cells:
+                # 이미 점유된 칸(위 행의 rowspan) 건너뛰기
+                while curr_col < len(row_cells) and row_cells[curr_col] is not None:
                     curr_col += 1
-                
-                # 병합 정보 추출 (없으면 1)
-                rowspan = int(cell.get('rowspan', 1))
-                colspan = int(cell.get('colspan', 1))
-                
-                # 셀 텍스트 정리 (공백 및 줄바꿈 정리)
-                content = " ".join(cell.get_text().split())
                 if debug: print(f"    DEBUG: Cell at ({curr_row}, {curr_col}) -> content: '{content[:20]}...', rowspan: {rowspan}, colspan: {colspan}")
 
                 # 그리드의 해당 범위에 내용 채우기
-                for r in range(curr_row, curr_row + rowspan):
-                    for c in range(curr_col, curr_col + colspan):
-                        grid[(r, c)] = content
+                if rowspan > 0 and colspan > 0:
+                    end_col = curr_col + colspan
+                    while len(grid) < curr_row + rowspan:
+                        grid.append([])
+                    for r in range(curr_row, curr_row + rowspan):
+                        target = grid[r]
+                        if len(target) < end_col:
+                            target.extend([None] * (end_col - len(target)))
+                        target[curr_col:end_col] = [content] * colspan
+                    if curr_row + rowspan > max_row: max_row = curr_row + rowspan
+                    if end_col > max_col: max_col = end_col
                 
                 curr_col += colspan
-            curr_row += 1
         
-        if not grid:
+        if max_row == 0:
             if debug: print("DEBUG: Grid is empty after processing")
             return []
         
         # 그리드 크기 측정
-        max_row = max(r for r, c in grid.keys()) + 1
-        max_col = max(c for r, c in grid.keys()) + 1
         if debug: print(f"DEBUG: Grid normalized to {max_row}x{max_col} matrix")
 
-        # 2차원 리스트 생성
+        # 2차원 리스트 생성 (채워지지 않은 칸은 빈 문자열)
         table_matrix = []
-        for r in range(max_row):
-            row_data = [grid.get((r, c), "") for c in range(max_col)]
+        for row_cells in grid[:max_row]:
+            row_data = ["" if value is None else value for value in row_cells[:max_col]]
+            row_data.extend([""] * (max_col - len(row_data)))
             table_matrix.append(row_data)
-        
-        if debug: print("--- DEBUG END ---\n")
         return table_matrix
 
 
@@ -94,51 +265,114 @@ class PDFExtractor:
         """
         HTML 전체를 마크다운으로 변환하되, 표는 정규화 로직 적용
         """
-        soup = BeautifulSoup(html_string, 'html.parser')
-        tables = soup.find_all('table')
-
-        # 1. 테이블을 먼저 처리하여 마크다운으로 변환해둠
-        normalized_tables = []
-        for i, table in enumerate(tables):
-            # 4번째 테이블(인덱스 3)만 디버깅 로그 출력
-            matrix = self.normalize_html_table(table, debug=(i == 3))
-            md_table = self.matrix_to_markdown(matrix)
-            normalized_tables.append(md_table)
-
-            # 2. HTML에서 테이블을 아주 단순한 고유 마커로 치환
-            # html2text가 절대 건드리지 못할 형태의 텍스트 사용
-            placeholder = soup.new_tag("p")
-            placeholder.string = f"REPLACE_ME_TABLE_{i}"
-            table.replace_with(placeholder)
-        
-        # 3. 테이블이 제거된 나머지 본문을 마크다운으로 변환
-        h = html2text.HTML2Text()
-        h.bypass_tables = True  # 테이블 무시
-        h.ignore_links = False
-        h.body_width = 0        # 자동 줄바꿈 방지
-        markdown_result = h.handle(str(soup))
-        
-        # 4. 마커를 실제 정규화된 마크다운 표로 교체
-        for i, md_table in enumerate(normalized_tables):
-            # html2text 변환 결과에 따라 마커 앞뒤에 공백이 생길 수 있으므로 유연하게 처리
-            target = f"REPLACE_ME_TABLE_{i}"
-            markdown_result = markdown_result.replace(target, md_table)
-            
+        markdown_result = "".join(self.iter_markdown(html_string))
         gc.collect()
-        
-        # 결과 확인용 저장
-        with open("extracted_md.md", "w", encoding="utf-8") as f:
-            f.write(markdown_result)
-
         return markdown_result
-    
 
-    def extract_html_by_document_digitization(self, pdf_path: str): 
+    def iter_markdown(self, html_string: str, chunk_chars: int = 16 * 1024):
+        """
+        html_to_markdown의 스트리밍 버전. HTML을 앞에서부터 한 번만 읽으면서 완성된 마크다운 조각을 yield 합니다.
+        (문서 전체 마크다운 문자열을 만들지 않으므로 청킹/임베딩과 동시에 진행 가능)
+        :param chunk_chars: 파서에 한 번에 넣을 HTML 글자 수
+        """
+        yield from MarkdownConverter(self).convert(html_string, chunk_chars)
+
+
+    def extract_html_by_document_digitization(self, pdf_path: str, pages_per_request: int = None, workers: int = None):
         """
-        Upstage document-digitization API 사용하여 PDF -> HTML 변환
+        Upstage document-digitization API 사용하여 PDF -> HTML 변환 (iter_html_by_document_digitization 결과를 이어 붙인 전체 HTML)
+        :param pages_per_request: 요청 1회에 보낼 페이지 수 (None이면 UPSTAGE_PAGES_PER_REQUEST, 기본 10)
+        :param workers: 동시에 보낼 최대 요청 수 (None이면 UPSTAGE_MAX_WORKERS, 기본 4)
         """
+        html_string = "".join(self.iter_html_by_document_digitization(pdf_path, pages_per_request, workers))
+
+        # 작업 디렉토리의 extracted_view.html(saved-html 추출기 / 벤치마크 입력)을 덮어쓰지 않도록 디버그 설정일 때만 data/ 아래에 저장
+        if html_string and (UPSTAGE_DEBUG_HTML == "true" or UPSTAGE_DEBUG_HTML == "1"):
+            from pathlib import Path
+            output_path = Path("data/upstage_html") / f"{Path(pdf_path).stem}.html"
+            output_path.parent.mkdir(parents=True, exist_ok=True)
+            output_path.write_text(html_string, encoding="utf-8")
+            print(f"✅ HTML 파일 저장 완료: {output_path}")
+        return html_string
+
+    def iter_html_by_document_digitization(self, pdf_path: str, pages_per_request: int = None, workers: int = None):
+        """
+        Upstage document-digitization API 사용하여 PDF -> HTML 변환 (페이지 범위별 HTML 조각을 페이지 순서대로 yield)
+        페이지 수가 많으면 pages_per_request 페이지씩 나누어 동시에 요청하고, 앞선 범위의 결과가 오는 대로 바로 넘겨
+        뒤 단계(마크다운 변환/청킹/임베딩)가 나머지 범위를 기다리지 않고 진행됩니다.
+        :param pages_per_request: 요청 1회에 보낼 페이지 수 (None이면 UPSTAGE_PAGES_PER_REQUEST, 기본 10)
+        :param workers: 동시에 보낼 최대 요청 수 (None이면 UPSTAGE_MAX_WORKERS, 기본 4)
+        """
+        from pypdf import PdfReader, PdfWriter
+
+        if pages_per_request is None:
+            pages_per_request = int(UPSTAGE_PAGES_PER_REQUEST) if UPSTAGE_PAGES_PER_REQUEST else 10
+        if workers is None:
+            workers = int(UPSTAGE_MAX_WORKERS) if UPSTAGE_MAX_WORKERS else 4
+
+        reader = PdfReader(pdf_path)
+        page_count = len(reader.pages)
+
+        if page_count <= pages_per_request:
+            with open(pdf_path, "rb") as f:
+                html_string = self._request_document_parse(f.read(), 1, page_count)
+            if html_string:
+                yield html_string
+            return
+
+        def split(start, end):
+            # [start, end) 페이지만 담은 PDF 바이트
+            writer = PdfWriter()
+            for index in range(start, end):
+                writer.add_page(reader.pages[index])
+            buffer = io.BytesIO()
+            writer.write(buffer)
+            return buffer.getvalue()
+
+        # 페이지 범위별 요청을 동시에 보내되, 메모리 사용을 제한하기 위해 대기 중인 범위는 workers * 2개로 제한
+        from concurrent.futures import ThreadPoolExecutor
+        ranges = [(start, min(start + pages_per_request, page_count)) for start in range(0, page_count, pages_per_request)]
+        max_in_flight = workers * 2
+        print(f"📄 Upstage 분할 요청: {page_count}페이지, {len(ranges)}개 요청, 동시 {workers}개")
+
+        first = True
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="upstage") as executor:
+            pending = []  # 제출 순서(= 페이지 순서)대로 보관
+            next_range = 0
+            try:
+                while next_range < len(ranges) or pending:
+                    while next_range < len(ranges) and len(pending) < max_in_flight:
+                        start, end = ranges[next_range]
+                        pending.append(executor.submit(self._request_document_parse, split(start, end), start + 1, end))
+                        next_range += 1
+                    # 가장 앞선 범위의 결과부터 받아서 순서 유지
+                    fragment = pending.pop(0).result()
+                    if fragment:
+                        yield fragment if first else "\n" + fragment
+                        first = False
+            except BaseException:
+                # 한 범위라도 실패하거나 소비하는 쪽이 중단하면 아직 시작하지 않은 요청은 취소
+                for future in pending:
+                    future.cancel()
+                raise
+
+    def _request_document_parse(self, pdf_bytes: bytes, first_page: int, last_page: int, timeout: float = None, max_retries: int = None) -> str:
+        """
+        PDF(일부 페이지) 바이트를 Upstage document-parse에 보내고 HTML 반환
+        - 요청마다 타임아웃 적용, 타임아웃/연결 오류/5xx는 exponential backoff로 재시도
+        - 429는 공유 레이트 리미터("upstage-document-parse")에 알려 다른 요청도 함께 멈춤
+        :param first_page / last_page: 원본 PDF 기준 페이지 범위 (페이지 표시와 로그에 사용)
+        """
+        from src.services.rag.rate_limiter import get_rate_limiter
+
+        if timeout is None:
+            timeout = float(UPSTAGE_TIMEOUT) if UPSTAGE_TIMEOUT else 120
+        if max_retries is None:
+            max_retries = int(UPSTAGE_MAX_RETRIES) if UPSTAGE_MAX_RETRIES else 3
+        limiter = get_rate_limiter("upstage-document-parse")
+        page_label = f"{first_page}-{last_page}"
+
         headers = {"Authorization": f"Bearer {UPSTAGE_API_KEY}"}
-        files = {"document": open(pdf_path, "rb")}
         data = {
             "ocr": "force", # PDF가 종이를 스캔한 이미지PDF 이어도 어떤 형태든 상관없이 이미지를 분석해서 글자를 읽어냄. 그자가 그림으로 되어 있는 복잡한 표나 로고 근처의 글자도 놓치지 않고 꼼꼼하게 읽음
             "base64_encoding": ["table"], # 표(Table)은 이미지(Base64 문자열)로도 같이 전송. Upstage는 표를 HTML 텍스트로도 주지만, 원본 표 모양 그대로 그림 형태로 보관하고 싶을 때 사용.
@@ -146,23 +380,68 @@ class PDFExtractor:
             "output_formats": ["html"], # 명시적으로 출력 형식 요청 
             # "mode": "enhanced" # document-parse-nightly 모델에서 된다고 했는데, server error로 안됨. containing complex tables, images, charts, and other advanced visual elements.
         }
-        response = requests.post(UPSTAGE_BASE_URL, headers=headers, files=files, data=data)
-        result = response.json()
 
-        # --- HTML 파일 저장 ---
-        html_string = result.get('content', {}).get('html', '')
-        markdown_string = result.get('content', {}).get('markdown', '')
-        print("markdown_string:",markdown_string[:100])
+        # 공유 연결 풀 사용 (분할 요청끼리 연결 재사용, 재시도는 429 처리 때문에 아래에서 직접 수행 - POST는 연결 풀에서 재시도하지 않음)
+        from src.client.http_transport import get_http_session
+        session = get_http_session()
 
-        # return markdown_string
+        for attempt in range(max_retries + 1):
+            limiter.acquire()
+            try:
+                response = session.post(
+                    UPSTAGE_BASE_URL,
+                    headers=headers,
+                    files={"document": ("document.pdf", pdf_bytes, "application/pdf")},
+                    data=data,
+                    timeout=timeout,
+                )
+            except (requests.Timeout, requests.ConnectionError) as e:
+                error = type(e).__name__
+            else:
+                if response.status_code == 200:
+                    limiter.report_success()
+                    return self._html_with_page_markers(response.json(), first_page)
+                if response.status_code == 429:
+                    retry_after = response.headers.get("Retry-After")
+                    wait_time = limiter.report_rate_limited(float(retry_after) if retry_after and retry_after.isdigit() else None)
+                    if attempt == max_retries:
+                        raise RuntimeError(f"Upstage 요청 실패 (HTTP 429, {page_label}페이지, {max_retries}회 재시도)")
+                    print(f"⚠️ [upstage] {page_label}페이지 할당량 초과 (429). {wait_time:.1f}초 후 재시도... ({attempt + 1}/{max_retries})")
+                    UPSTREAM_RETRIES.labels(provider=limiter.name).inc()
+                    continue
+                if response.status_code < 500:
+                    # 잘못된 요청/인증 오류는 재시도해도 같은 결과
+                    raise RuntimeError(f"Upstage 요청 실패 (HTTP {response.status_code}, {page_label}페이지): {response.text[:200]}")
+                error = f"HTTP {response.status_code}"
 
-        if html_string:
-            with open("extracted_view.html", "w", encoding="utf-8") as f:
-                f.write(html_string)
-            print("✅ HTML 파일 저장 완료: extracted_view.html")
-        return html_string
+            if attempt == max_retries:
+                raise RuntimeError(f"Upstage 요청 실패 ({error}, {page_label}페이지, {max_retries}회 재시도)")
+            wait_time = min(30.0, 2 ** attempt) + random.uniform(0, 1)
+            print(f"⚠️ [upstage] {page_label}페이지 요청 실패 ({error}). {wait_time:.1f}초 후 재시도... ({attempt + 1}/{max_retries})")
+            UPSTREAM_RETRIES.labels(provider=limiter.name).inc()
+            time.sleep(wait_time)
 
 
+    @staticmethod
+    def _html_with_page_markers(result: dict, first_page: int) -> str:
+        """
+        document-parse 응답의 HTML에 페이지가 바뀌는 위치마다 <!-- page: N --> 표시 추가 (청크 metadata의 page로 사용)
+        elements에 페이지 정보가 없으면 전체 HTML 앞에 시작 페이지만 표시
+        """
+        elements = result.get('elements') or []
+        if elements and all('page' in element for element in elements):
+            parts, current_page = [], None
+            for element in elements:
+                page = first_page + int(element['page']) - 1  # 분할 요청의 페이지 번호는 1부터 시작
+                if page != current_page:
+                    parts.append(f"<!-- page: {page} -->")
+                    current_page = page
+                parts.append(element.get('content', {}).get('html', ''))
+            return "\n".join(parts)
+
+        html_string = result.get('content', {}).get('html', '')
+        return f"<!-- page: {first_page} -->\n{html_string}" if html_string else html_string
+
     # def encode_pdf_to_base64(self, pdf_path: str):
     #     """
     #     PDF 파일을 Base64 인코딩
@@ -251,92 +530,167 @@ class PDFExtractor:
     #     return result
 
 
-    def extract_content(self, pdf_path: str) -> List[Dict[str, Any]]:
+    def extract_content(self, pdf_path: str, workers: int = None, pages_per_task: int = 4) -> List[Dict[str, Any]]:
         """
         pdfplumber 사용   
-        PDF 파일에서 텍스트와 표 데이터를 추출하여 순서대로 반환합니다.
+        PDF 파일에서 텍스트와 표 데이터를 추출하여 순서대로 반환합니다. (iter_content 결과를 모은 리스트)
+        :param workers: 프로세스 풀 크기 (None이면 PDF_EXTRACT_WORKERS, 1 이하면 현재 프로세스에서 순차 처리)
+        :param pages_per_task: 워커 1개가 한 번에 처리할 페이지 수
+        """
+        all_content = []
+        for page_content in self.iter_content(pdf_path, workers, pages_per_task):
+            all_content.extend(page_content)
+        return all_content
+
+    def iter_content(self, pdf_path: str, workers: int = None, pages_per_task: int = 4) -> Iterator[List[Dict[str, Any]]]:
+        """
+        pdfplumber 사용
+        페이지마다 텍스트와 표 데이터를 추출하여 페이지 순서대로 yield (내용이 없는 페이지는 건너뜀, 한 번에 페이지 1장(병렬이면 범위 몇 개)만 메모리에 올림)
+        :param workers: 프로세스 풀 크기 (None이면 PDF_EXTRACT_WORKERS, 1 이하면 현재 프로세스에서 순차 처리)
+        :param pages_per_task: 워커 1개가 한 번에 처리할 페이지 수
         """
         import pdfplumber
         gc.collect()
-        all_content = []
+
+        if workers is None:
+            workers = int(PDF_EXTRACT_WORKERS) if PDF_EXTRACT_WORKERS else 1
+
+        if workers <= 1:
+            with pdfplumber.open(pdf_path) as pdf:
+                for page in pdf.pages:
+                    page_content = _extract_page(page)
+                    page.close()  # 페이지별 캐시(문자/선 객체) 해제
+                    if page_content:
+                        yield page_content
+            return
 
         with pdfplumber.open(pdf_path) as pdf:
-            for page in pdf.pages:
-                # 1. 표 추출 설정
-                table_settings = {
-                    "vertical_strategy": "lines", # 표의 세로 경계
-                    "horizontal_strategy": "lines", # 표의 가로 경계
-                    "snap_tolerance": 3, # 3포인트. 아주 가까운 위치에 있는 선들을 "같은 선"으로 스냅할 때 허용하는 거리 임계값   
-                }
-                
-                # 2. 표 찾기
-                tables = page.find_tables(table_settings=table_settings) 
-                
-                # 3. 테이블을 위에서 아래로 정렬 (순서 보장) (bbox : (x0, top, x1, bottom) = (왼쪽 경계x, 위쪽 경계y, 오른쪽 경계x, 아래쪽 경계y))
-                tables.sort(key=lambda t: t.bbox[1])
-                
-                last_y = 0 # 마지막으로 처리된 Y 좌표 (커서 역할)
+            page_count = len(pdf.pages)
+
+        # 페이지 범위를 나누어 각 워커가 PDF를 따로 열어서 처리
+        # 메모리 사용을 제한하기 위해 동시에 처리 중인 범위는 workers * 2개로 제한하고, 결과는 페이지 순서대로 넘김
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+        from itertools import groupby
+        ranges = [(start, min(start + pages_per_task, page_count)) for start in range(0, page_count, pages_per_task)]
+        max_in_flight = workers * 2
+        print(f"🔍 병렬 추출: {page_count}페이지, 워커 {workers}개, 범위 {len(ranges)}개")
+
+        # gunicorn gthread 워커에는 다른 스레드(작업 큐, 캘린더 갱신, 프로파일러 등)가 있어서 fork하면 잡혀 있던 lock을
+        # 자식이 물려받아 멈출 수 있으므로 forkserver(지원하지 않는 플랫폼에서는 spawn)로 워커 프로세스를 생성
+        start_method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context(start_method)) as executor:
+            pending = []  # 제출 순서(= 페이지 순서)대로 보관
+            next_range = 0
+            try:
+                while next_range < len(ranges) or pending:
+                    while next_range < len(ranges) and len(pending) < max_in_flight:
+                        start, end = ranges[next_range]
+                        pending.append(executor.submit(_extract_page_range, pdf_path, start, end))
+                        next_range += 1
+                    # 가장 앞선 범위의 결과부터 받아서 순서 유지
+                    for _, page_content in groupby(pending.pop(0).result(), key=lambda item: item["page"]):
+                        yield list(page_content)
+            except BaseException:
+                for future in pending:
+                    future.cancel()
+                raise
+
+
+def _extract_page_range(pdf_path: str, start: int, end: int) -> List[Dict[str, Any]]:
+    """
+    (프로세스 풀 워커) PDF를 직접 열어서 [start, end) 페이지 추출
+    """
+    import pdfplumber
+
+    content = []
+    with pdfplumber.open(pdf_path, pages=list(range(start + 1, end + 1))) as pdf:
+        for page in pdf.pages:
+            content.extend(_extract_page(page))
+    return content
+
+
+def _extract_page(page) -> List[Dict[str, Any]]:
+    """
+    페이지 1장에서 텍스트/표를 위에서 아래 순서로 추출
+    """
+    all_content = []
+
+    # 1. 표 추출 설정
+    table_settings = {
+        "vertical_strategy": "lines", # 표의 세로 경계
+        "horizontal_strategy": "lines", # 표의 가로 경계
+        "snap_tolerance": 3, # 3포인트. 아주 가까운 위치에 있는 선들을 "같은 선"으로 스냅할 때 허용하는 거리 임계값   
+    }
+    
+    # 2. 표 찾기
+    tables = page.find_tables(table_settings=table_settings) 
+    
+    # 3. 테이블을 위에서 아래로 정렬 (순서 보장) (bbox : (x0, top, x1, bottom) = (왼쪽 경계x, 위쪽 경계y, 오른쪽 경계x, 아래쪽 경계y))
+    tables.sort(key=lambda t: t.bbox[1])
+    
+    last_y = 0 # 마지막으로 처리된 Y 좌표 (커서 역할)
+    
+    for table in tables:
+        # ---------------------------------------------------------
+        # A. 표 등장 전까지의 텍스트 추출 (Last Y ~ Current Table Top)
+        # ---------------------------------------------------------
+        if table.bbox[1] > last_y:
+            try:
+                # 텍스트 영역 크롭 (페이지 전체 너비 사용)
+                text_box = (0, last_y, page.width, table.bbox[1]) # 테이블의 top 좌표까지 텍스트 추출함  
+                cropped_page = page.crop(text_box)
+                text = cropped_page.extract_text()
                 
-                for table in tables:
-                    # ---------------------------------------------------------
-                    # A. 표 등장 전까지의 텍스트 추출 (Last Y ~ Current Table Top)
-                    # ---------------------------------------------------------
-                    if table.bbox[1] > last_y:
-                        try:
-                            # 텍스트 영역 크롭 (페이지 전체 너비 사용)
-                            text_box = (0, last_y, page.width, table.bbox[1]) # 테이블의 top 좌표까지 텍스트 추출함  
-                            cropped_page = page.crop(text_box)
-                            text = cropped_page.extract_text()
-                            
-                            if text and text.strip():
-                                all_content.append({
-                                    "type": "text",
-                                    "content": text.strip(),
-                                    "page": page.page_number,
-                                    "y_start": last_y,
-                                    "y_end": table.bbox[1]
-                                })
-                        except Exception:
-                            pass # 영역이 너무 작거나 오류 발생 시 패스
-
-                    # ---------------------------------------------------------
-                    # B. 표 추출 및 처리
-                    # ---------------------------------------------------------
-                    table_data = table.extract()
-                    
-                    # 표 유효성 검사는 DataProcessor에서 할 수도 있지만, 
-                    # 추출 단계에서 명백한 쓰레기를 거르는 게 효율적일 수 있음.
-                    # 여기서는 Raw Data를 최대한 보존하고 Processor에게 넘김.
-                    
-                    if table_data:
-                        all_content.append({
-                            "type": "table",
-                            "content": table_data,
-                            "page": page.page_number,
-                            "y_start": table.bbox[1],
-                            "y_end": table.bbox[3],
-                        })
-                        
-                        last_y = table.bbox[3] # 테이블의 bottom 좌표가 마지막으로 처리된 Y 좌표가 됨  
-
-                # ---------------------------------------------------------
-                # C. 마지막 표 이후의 남은 텍스트 추출 (Last Y ~ Page Bottom)
-                # ---------------------------------------------------------
-                if last_y < page.height:
-                    try:
-                        text_box = (0, last_y, page.width, page.height)
-                        cropped_page = page.crop(text_box)
-                        text = cropped_page.extract_text()
-                        
-                        if text and text.strip():
-                            all_content.append({
-                                "type": "text",
-                                "content": text.strip(),
-                                "page": page.page_number,
-                                "y_start": last_y,
-                                "y_end": page.height
-                            })
-                    except Exception:
-                        pass
-                        
-        return all_content
+                if text and text.strip():
+                    all_content.append({
+                        "type": "text",
+                        "content": text.strip(),
+                        "page": page.page_number,
+                        "y_start": last_y,
+                        "y_end": table.bbox[1]
+                    })
+            except Exception:
+                pass # 영역이 너무 작거나 오류 발생 시 패스
+
+        # ---------------------------------------------------------
+        # B. 표 추출 및 처리
+        # ---------------------------------------------------------
+        table_data = table.extract()
+        
+        # 표 유효성 검사는 DataProcessor에서 할 수도 있지만, 
+        # 추출 단계에서 명백한 쓰레기를 거르는 게 효율적일 수 있음.
+        # 여기서는 Raw Data를 최대한 보존하고 Processor에게 넘김.
+        
+        if table_data:
+            all_content.append({
+                "type": "table",
+                "content": table_data,
+                "page": page.page_number,
+                "y_start": table.bbox[1],
+                "y_end": table.bbox[3],
+            })
+            
+            last_y = table.bbox[3] # 테이블의 bottom 좌표가 마지막으로 처리된 Y 좌표가 됨  
+
+    # ---------------------------------------------------------
+    # C. 마지막 표 이후의 남은 텍스트 추출 (Last Y ~ Page Bottom)
+    # ---------------------------------------------------------
+    if last_y < page.height:
+        try:
+            text_box = (0, last_y, page.width, page.height)
+            cropped_page = page.crop(text_box)
+            text = cropped_page.extract_text()
+            
+            if text and text.strip():
+                all_content.append({
+                    "type": "text",
+                    "content": text.strip(),
+                    "page": page.page_number,
+                    "y_start": last_y,
+                    "y_end": page.height
+                })
+        except Exception:
+            pass
+            
+    return all_content
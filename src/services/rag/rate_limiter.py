@@ -0,0 +1,214 @@
+import random
+import re
+import threading
+import time
+from typing import List
+
+from src.config.config import RATE_LIMITS
+from src.services.metrics import STAGE_SECONDS, EMBEDDING_TOKENS, UPSTREAM_RETRIES, RATE_LIMITED
+
+# 제공자별 기본 한도 (RATE_LIMITS 환경 변수로 덮어쓰기 가능)
+# - rpm / tpm: 분당 요청 수 / 분당 토큰 수
+# - batch / batch_tokens: 임베딩 요청 1회에 넣을 수 있는 최대 입력 개수 / 최대 토큰 수
+DEFAULT_LIMITS = {
+    "openai-embedding": {"rpm": 3000, "tpm": 1000000, "batch": 2048, "batch_tokens": 250000},
+    "gemini-embedding": {"rpm": 100, "tpm": 30000, "batch": 100, "batch_tokens": 20000},
+    "openai-llm": {"rpm": 500, "tpm": 200000},
+    "gemini-llm": {"rpm": 25, "tpm": 1000000},
+    "upstage-document-parse": {"rpm": 60, "tpm": 1000000},
+}
+
+
+def parse_rate_limits(value: str) -> dict:
+    """
+    RATE_LIMITS 환경 변수 파싱
+    형식: "gemini-embedding=rpm:100,tpm:30000;openai-llm=rpm:500"
+    """
+    limits = {}
+    if not value:
+        return limits
+    for entry in value.split(";"):
+        if "=" not in entry:
+            continue
+        name, options = entry.split("=", 1)
+        limits[name.strip()] = {
+            key.strip(): int(number)
+            for key, number in (option.split(":", 1) for option in options.split(",") if ":" in option)
+        }
+    return limits
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    토크나이저 없이 토큰 수 추정 (한도 계산용이므로 넉넉하게)
+    영문/숫자는 약 4글자당 1토큰, 한글 등 비ASCII 문자는 1글자당 1토큰으로 계산
+    """
+    ascii_chars = sum(1 for ch in text if ord(ch) < 128)
+    return ascii_chars // 4 + (len(text) - ascii_chars) + 1
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    error_msg = str(error)
+    return "429" in error_msg or "RESOURCE_EXHAUSTED" in error_msg or "quota" in error_msg.lower()
+
+
+def parse_retry_after(error: Exception):
+    """에러 메시지의 'retry in Xs' 힌트 추출 (없으면 None)"""
+    retry_match = re.search(r'retry in ([\d.]+)s', str(error), re.IGNORECASE)
+    return float(retry_match.group(1)) if retry_match else None
+
+
+class _TokenBucket:
+    def __init__(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.available = float(per_minute)
+        self.rate = per_minute / 60.0  # 초당 충전량
+        self.updated_at = time.monotonic()
+
+    def refill(self, now: float):
+        self.available = min(self.capacity, self.available + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def wait_time(self, amount: float) -> float:
+        amount = min(amount, self.capacity)
+        if self.available >= amount:
+            return 0.0
+        return (amount - self.available) / self.rate
+
+
+class RateLimiter:
+    def __init__(self, name: str, rpm: int, tpm: int, batch: int = 1, batch_tokens: int = None):
+        """
+        분당 요청 수 / 분당 토큰 수를 함께 관리하는 토큰 버킷 레이트 리미터
+        429 응답을 받으면 'retry in Xs' 힌트만큼 멈추고 요청 속도를 절반으로 낮춘 뒤, 성공할 때마다 조금씩 원래 속도로 회복합니다.
+
+        Args:
+            name: 리미터 이름 (예: "gemini-embedding")
+            rpm: 분당 최대 요청 수
+            tpm: 분당 최대 토큰 수
+            batch: 요청 1회에 넣을 최대 입력 개수 (임베딩 배치 크기)
+            batch_tokens: 요청 1회에 넣을 최대 토큰 수
+        """
+        self.name = name
+        self.rpm = rpm
+        self.batch = batch
+        self.batch_tokens = batch_tokens or tpm
+        self.requests = _TokenBucket(rpm)
+        self.tokens = _TokenBucket(tpm)
+        self.paused_until = 0.0
+        self.rate_limited_count = 0  # 연속 429 횟수 (성공하면 0으로 초기화)
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: int = 1):
+        """요청 1회 + tokens 만큼의 한도가 생길 때까지 대기"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.requests.refill(now)
+                self.tokens.refill(now)
+                wait = max(
+                    self.paused_until - now,
+                    self.requests.wait_time(1),
+                    self.tokens.wait_time(tokens),
+                )
+                if wait <= 0:
+                    self.requests.available -= 1
+                    self.tokens.available -= min(tokens, self.tokens.capacity)
+                    return
+            time.sleep(wait)
+
+    def report_success(self):
+        """성공 시 낮춰둔 요청 속도를 설정값까지 점진적으로 회복 (연속 429 횟수 초기화)"""
+        with self._lock:
+            self.rate_limited_count = 0
+            if self.requests.rate < self.rpm / 60.0:
+                self.requests.rate = min(self.rpm / 60.0, self.requests.rate * 1.1)
+
+    def report_rate_limited(self, retry_after: float = None) -> float:
+        """429 발생 시 요청 속도를 절반으로 낮추고 retry_after 동안 모든 요청을 멈춤. 실제 대기 시간 반환"""
+        RATE_LIMITED.labels(provider=self.name).inc()
+        with self._lock:
+            self.rate_limited_count += 1
+            self.requests.rate = max(1 / 60.0, self.requests.rate / 2)
+            if retry_after is None:
+                # 힌트가 없으면 연속 429 횟수에 따라 exponential backoff
+                retry_after = min(60.0, 2 * (2 ** min(self.rate_limited_count, 5))) + random.uniform(0, 1)
+            self.paused_until = max(self.paused_until, time.monotonic() + retry_after)
+            return retry_after
+
+    def call(self, func, tokens: int = 1, max_retries: int = 3):
+        """
+        한도를 확보한 뒤 func() 실행. 429 에러는 최대 max_retries회 재시도하고, 그 외 에러는 즉시 재발생
+        """
+        for attempt in range(max_retries):
+            self.acquire(tokens)
+            try:
+                result = func()
+            except Exception as e:
+                if not is_rate_limit_error(e) or attempt == max_retries - 1:
+                    raise
+                wait_time = self.report_rate_limited(parse_retry_after(e))
+                UPSTREAM_RETRIES.labels(provider=self.name).inc()
+                print(f"⚠️ [{self.name}] 할당량 초과 (429). {wait_time:.1f}초 후 재시도... ({attempt + 1}/{max_retries})")
+                continue
+            self.report_success()
+            return result
+
+    def iter_batches(self, items: List, get_text=lambda item: item, max_size: int = None):
+        """
+        제공자의 요청 1회 최대 입력 개수/토큰 수에 맞춰 items를 나눔
+        :param max_size: 배치 최대 개수를 제공자 한도보다 더 작게 제한 (items가 제너레이터면 이 개수가 모이는 대로 바로 yield)
+        """
+        max_items = min(self.batch, max_size) if max_size else self.batch
+        batch, batch_tokens = [], 0
+        for item in items:
+            item_tokens = estimate_tokens(get_text(item))
+            if batch and (len(batch) >= max_items or batch_tokens + item_tokens > self.batch_tokens):
+                yield batch
+                batch, batch_tokens = [], 0
+            batch.append(item)
+            batch_tokens += item_tokens
+        if batch:
+            yield batch
+
+
+class RateLimitedEmbeddings:
+    def __init__(self, embeddings, limiter: RateLimiter):
+        """
+        LangChain 임베딩 객체의 API 호출을 RateLimiter로 감싸는 래퍼
+        (임베딩 캐시를 함께 사용할 경우 캐시 안쪽에 두어 캐시 적중분은 한도를 소모하지 않도록 함)
+        """
+        self.embeddings = embeddings
+        self.limiter = limiter
+        # 한도 대기 시간은 빼고 API 호출 시간만 기록
+        self.embed_documents_timed = STAGE_SECONDS.time(stage="embed")(embeddings.embed_documents)
+        self.embed_query_timed = STAGE_SECONDS.time(stage="embed_query")(embeddings.embed_query)
+        self.token_counter = EMBEDDING_TOKENS.labels(provider=limiter.name)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        vectors = []
+        for batch in self.limiter.iter_batches(texts):
+            tokens = sum(estimate_tokens(text) for text in batch)
+            vectors.extend(self.limiter.call(lambda: self.embed_documents_timed(batch), tokens=tokens))
+            self.token_counter.inc(tokens)
+        return vectors
+
+    def embed_query(self, text: str) -> List[float]:
+        tokens = estimate_tokens(text)
+        vector = self.limiter.call(lambda: self.embed_query_timed(text), tokens=tokens)
+        self.token_counter.inc(tokens)
+        return vector
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(name: str) -> RateLimiter:
+    """프로세스 전체에서 공유하는 제공자별 RateLimiter 반환"""
+    with _limiters_lock:
+        if name not in _limiters:
+            limits = dict(DEFAULT_LIMITS.get(name, {"rpm": 60, "tpm": 100000}))
+            limits.update(parse_rate_limits(RATE_LIMITS).get(name, {}))
+            _limiters[name] = RateLimiter(name, **limits)
+        return _limiters[name]
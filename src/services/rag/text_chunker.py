@@ -1,27 +1,225 @@
 # from langchain_text_splitters import MarkdownHeaderTextSplitter, RecursiveCharacterTextSplitter
 import gc
+import re
+
+from src.config.config import CHUNK_MAX_TOKENS
+from src.services.rag.rate_limiter import estimate_tokens
+
+# 제목 기준 분할에 사용할 헤더 (마크다운 기호, metadata 키)
+HEADERS_TO_SPLIT_ON = [
+    ("#", "header_1"),
+    ("##", "header_2"),
+    ("###", "header_3"),
+]
+
+# 추출기가 마크다운에 넣는 페이지 구분 표시 (청크 본문에서는 제거하고 metadata의 page로 기록)
+PAGE_MARKER_PATTERN = re.compile(r"<!--\s*page:\s*(\d+)\s*-->")
+# 마크다운 표의 제목 구분 행 (|---|---|)
+TABLE_SEPARATOR_PATTERN = re.compile(r"^\|\s*:?-{3,}")
+
+
+def page_marker(page: int) -> str:
+    return f"<!-- page: {page} -->"
+
 
 class TextChunker:
+    # 추출 캐시에 저장된 청크 목록의 버전 (청킹 규칙을 바꾸면 올려서 이전 캐시를 무효화)
+    version = "2"
+
+    def __init__(self, max_tokens: int = None):
+        """
+        :param max_tokens: 청크 1개의 최대 토큰 수 (None이면 CHUNK_MAX_TOKENS, 기본 800 - estimate_tokens 기준)
+        """
+        if max_tokens is None:
+            max_tokens = int(CHUNK_MAX_TOKENS) if CHUNK_MAX_TOKENS else 800
+        self.max_tokens = max_tokens
+
     def chunk_markdown(self, markdown_text):
-        from langchain_text_splitters import MarkdownHeaderTextSplitter
         gc.collect()
 
-        # 1. 제목 기준으로 1차 분할
-        headers_to_split_on = [
-            ("#", "header_1"),
-            ("##", "header_2"),
-            ("###", "header_3"),
-        ]
-        # MarkdownHeaderTextSplitter: 자동으로 헤더 뒤의 텍스트를 추출해서 metadata에 추가함  
-        markdown_splitter = MarkdownHeaderTextSplitter(headers_to_split_on=headers_to_split_on)
-        header_splits = markdown_splitter.split_text(markdown_text)
-
-        # 2. 내용이 너무 긴 경우를 대비해 토큰 단위로 2차 분할 (테스트를 위해 비활성화)
-        # text_splitter = RecursiveCharacterTextSplitter(
-        #     chunk_size=500,
-        #     chunk_overlap=50
-        # )
-        # final_chunks = text_splitter.split_documents(header_splits)
+        # 제목 기준으로 분할하고, 너무 긴 섹션/표는 max_tokens 이하로 다시 분할
+        chunks = list(self.iter_chunks([markdown_text]))
 
         gc.collect()
-        return header_splits # 우선은 헤더 단위로만 청크 생성  
\ No newline at end of file
+        return chunks
+
+    def iter_chunks(self, markdown_pieces):
+        """
+        마크다운 조각들을 순서대로 받아 제목(#, ##, ###) 기준 청크(Document)를 만들어지는 대로 yield 합니다.
+        MarkdownHeaderTextSplitter(strip_headers=True)와 같은 규칙으로 분할하지만
+        문서 전체를 메모리에 올리지 않고 현재 청크만 보관합니다.
+        - 헤더 줄은 본문에서 제외하고 metadata(header_1~3)에 기록 (상위 헤더가 바뀌면 하위 헤더는 초기화)
+        - 코드 블록(``` / ~~~) 안의 # 은 헤더로 보지 않음
+        - 빈 줄로 나뉜 문단은 "  \\n"으로 이어 붙임
+        - max_tokens를 넘는 섹션은 문단 단위로, 큰 표는 제목 행을 반복하며 행 묶음 단위로 나눔 (_split_section)
+        - 페이지 표시(<!-- page: N -->)는 본문에서 제거하고 청크가 시작하는 페이지를 metadata의 page로 기록
+
+        Args:
+            markdown_pieces: 마크다운 문자열 조각 iterable (이어 붙이면 전체 문서가 되어야 함)
+        """
+        # 청크 분할 자체는 langchain 없이 처리하고, 벡터 DB에 넘길 Document 클래스만 사용
+        from langchain_core.documents import Document
+
+        headers = sorted(HEADERS_TO_SPLIT_ON, key=lambda header: len(header[0]), reverse=True)
+        header_stack = []  # (레벨, metadata 키)
+        metadata = {}
+        paragraph, paragraph_page = [], None  # 현재 문단의 줄들, 문단이 시작한 페이지
+        page = None
+        chunk_parts, chunk_pages, chunk_metadata = [], [], None
+        in_code_block, opening_fence = False, ""
+
+        for line in self._iter_lines(markdown_pieces):
+            stripped_line = "".join(filter(str.isprintable, line.strip()))
+            if not in_code_block:
+                page_match = PAGE_MARKER_PATTERN.fullmatch(stripped_line)
+                if page_match:
+                    page = int(page_match.group(1))
+                    continue
+                if stripped_line.startswith("```") and stripped_line.count("```") == 1:
+                    in_code_block, opening_fence = True, "```"
+                elif stripped_line.startswith("~~~"):
+                    in_code_block, opening_fence = True, "~~~"
+            elif stripped_line.startswith(opening_fence):
+                in_code_block, opening_fence = False, ""
+
+            if in_code_block:
+                if not paragraph:
+                    paragraph_page = page
+                paragraph.append(stripped_line)
+                continue
+
+            header = next(
+                (
+                    (sep, name) for sep, name in headers
+                    if stripped_line.startswith(sep)
+                    and (len(stripped_line) == len(sep) or stripped_line[len(sep)] == " ")
+                ),
+                None,
+            )
+            if header is None and stripped_line:
+                if not paragraph:
+                    paragraph_page = page
+                paragraph.append(stripped_line)
+                continue
+
+            # 헤더 줄 또는 빈 줄: 지금까지의 문단을 현재 metadata로 마감
+            if paragraph:
+                content = "\n".join(paragraph)
+                paragraph = []
+                if chunk_parts and chunk_metadata == metadata:
+                    chunk_parts.append(content)
+                    chunk_pages.append(paragraph_page)
+                else:
+                    if chunk_parts:
+                        yield from self._split_section(chunk_parts, chunk_pages, chunk_metadata, Document)
+                    chunk_parts, chunk_pages, chunk_metadata = [content], [paragraph_page], metadata
+
+            if header is not None:
+                sep, name = header
+                level = sep.count("#")
+                metadata = dict(metadata)
+                while header_stack and header_stack[-1][0] >= level:
+                    metadata.pop(header_stack.pop()[1], None)
+                header_stack.append((level, name))
+                metadata[name] = stripped_line[len(sep):].strip()
+
+        if paragraph:
+            content = "\n".join(paragraph)
+            if chunk_parts and chunk_metadata == metadata:
+                chunk_parts.append(content)
+                chunk_pages.append(paragraph_page)
+            else:
+                if chunk_parts:
+                    yield from self._split_section(chunk_parts, chunk_pages, chunk_metadata, Document)
+                chunk_parts, chunk_pages, chunk_metadata = [content], [paragraph_page], metadata
+        if chunk_parts:
+            yield from self._split_section(chunk_parts, chunk_pages, chunk_metadata, Document)
+
+    def _split_section(self, parts, pages, metadata, document_class):
+        """
+        제목 1개 아래의 문단들을 max_tokens 이하의 청크로 묶어 Document로 yield
+        - 문단은 순서대로 이어 붙이다가 한도를 넘으면 새 청크 시작
+        - 한 문단이 한도보다 크면 표는 행 묶음(제목 행 반복), 일반 문단은 줄 단위로 나눔 (_split_paragraph)
+        - metadata: header_1~3, section(헤더 경로), page(청크가 시작하는 페이지)
+        """
+        base_metadata = dict(metadata)
+        section = " > ".join(metadata[name] for _, name in HEADERS_TO_SPLIT_ON if name in metadata)
+        if section:
+            base_metadata["section"] = section
+
+        def make_document(texts, page):
+            chunk_metadata = dict(base_metadata)
+            if page is not None:
+                chunk_metadata["page"] = page
+            return document_class(page_content="  \n".join(texts), metadata=chunk_metadata)
+
+        part_tokens = [estimate_tokens(part) for part in parts]
+        if sum(part_tokens) <= self.max_tokens:
+            yield make_document(parts, pages[0])
+            return
+
+        texts, texts_page, used = [], None, 0
+        for part, page, tokens in zip(parts, pages, part_tokens):
+            pieces = [(part, tokens)] if tokens <= self.max_tokens else self._split_paragraph(part)
+            for piece, piece_tokens in pieces:
+                if texts and used + piece_tokens > self.max_tokens:
+                    yield make_document(texts, texts_page)
+                    texts, used = [], 0
+                if not texts:
+                    texts_page = page
+                texts.append(piece)
+                used += piece_tokens
+        if texts:
+            yield make_document(texts, texts_page)
+
+    def _split_paragraph(self, paragraph):
+        """
+        max_tokens보다 큰 문단을 (조각, 토큰 수) 목록으로 나눔
+        - 마크다운 표: 줄(행) 단위로 묶되 두 번째 조각부터 제목 행(+구분 행)을 반복 (표 앞의 설명 줄은 첫 조각에 포함)
+        - 일반 문단: 줄 단위로 묶고, 한 줄이 한도보다 크면 글자 수로 자름
+        """
+        lines = paragraph.split("\n")
+        repeat_header = []
+        separator_index = next((i for i, line in enumerate(lines) if TABLE_SEPARATOR_PATTERN.match(line)), None)
+        if separator_index is not None:
+            header_start = separator_index
+            while header_start > 0 and lines[header_start - 1].startswith("|"):
+                header_start -= 1
+            header = lines[header_start:separator_index + 1]
+            # 제목 행이 너무 크면 반복하지 않음 (조각마다 제목 행만 들어가는 것 방지)
+            if estimate_tokens("\n".join(header)) * 2 <= self.max_tokens:
+                repeat_header = header
+        return self._group_lines(lines, repeat_header)
+
+    def _group_lines(self, lines, repeat_header):
+        """줄들을 max_tokens 이하 조각으로 묶어 (조각, 토큰 수) 목록 반환. 두 번째 조각부터는 repeat_header를 앞에 붙임"""
+        header_tokens = sum(estimate_tokens(line) for line in repeat_header)
+        pieces, group, used = [], [], 0
+        for line in lines:
+            line_tokens = estimate_tokens(line)
+            if line_tokens + header_tokens > self.max_tokens:
+                # 한 줄이 한도보다 크면 글자 수 비율로 자름
+                step = max(1, len(line) * (self.max_tokens - header_tokens) // line_tokens)
+                line_pieces = [line[i:i + step] for i in range(0, len(line), step)]
+            else:
+                line_pieces = [line]
+            for piece in line_pieces:
+                piece_tokens = estimate_tokens(piece)
+                if group and used + piece_tokens > self.max_tokens:
+                    pieces.append(("\n".join(group), used))
+                    group, used = list(repeat_header), header_tokens
+                group.append(piece)
+                used += piece_tokens
+        if group:
+            pieces.append(("\n".join(group), used))
+        return pieces
+
+    @staticmethod
+    def _iter_lines(pieces):
+        """조각 경계에 걸친 줄을 이어 붙여 한 줄씩 yield (str.split("\\n")과 같은 결과)"""
+        rest = ""
+        for piece in pieces:
+            lines = (rest + piece).split("\n")
+            rest = lines.pop()
+            yield from lines
+        yield rest
@@ -0,0 +1,124 @@
+"""
+Upstage document-parse 로컬 스텁 서버 (테스트/벤치마크용, 실제 API 호출 없음)
+
+받은 PDF의 페이지마다 텍스트 레이어를 읽어 <p> 태그로 감싼 HTML(과 페이지 번호가 담긴 elements)을 돌려줍니다.
+지연 시간과 일시적 오류(503)를 흉내낼 수 있어 분할/동시 요청, 재시도, 순서 보장을 확인할 때 사용합니다.
+
+실행 방법:
+    python -m src.services.rag.upstage_stub --port 8765 --latency 0.2 --fail-rate 0.1
+    UPSTAGE_BASE_URL=http://127.0.0.1:8765/ PDF_EXTRACTOR=upstage python -m src.app
+"""
+import argparse
+import html
+import io
+import json
+import random
+import threading
+import time
+from email.parser import BytesParser
+from email.policy import default as default_policy
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def render_pdf_elements(pdf_bytes: bytes) -> list:
+    """PDF 바이트의 페이지별 텍스트를 Upstage 응답의 elements와 같은 형태로 변환 (페이지당 문단 1개)"""
+    from pypdf import PdfReader
+
+    elements = []
+    for index, page in enumerate(PdfReader(io.BytesIO(pdf_bytes)).pages):
+        text = (page.extract_text() or "").strip()
+        elements.append({
+            "id": index,
+            "category": "paragraph",
+            "page": index + 1,
+            "content": {"html": f"<p id='{index}' data-category='paragraph'>{html.escape(text)}</p>", "markdown": "", "text": text},
+        })
+    return elements
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        server = self.server
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        with server.lock:
+            server.request_count += 1
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+        try:
+            if random.random() < server.fail_rate:
+                self._send(503, {"error": "stub: temporary failure"})
+                return
+
+            message = BytesParser(policy=default_policy).parsebytes(
+                b"Content-Type: " + self.headers["Content-Type"].encode() + b"\r\n\r\n" + body
+            )
+            document = next(
+                (part.get_payload(decode=True) for part in message.iter_parts() if part.get_param("name", header="content-disposition") == "document"),
+                None,
+            )
+            if document is None:
+                self._send(400, {"error": "stub: document is required"})
+                return
+
+            elements = render_pdf_elements(document)
+            time.sleep(server.latency * len(elements))
+            html_string = "\n".join(element["content"]["html"] for element in elements)
+            self._send(200, {"content": {"html": html_string, "markdown": ""}, "elements": elements, "usage": {"pages": len(elements)}})
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+    def _send(self, status: int, payload: dict):
+        data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+def start_stub_server(port: int = 0, latency: float = 0.0, fail_rate: float = 0.0, verbose: bool = False):
+    """
+    스텁 서버를 백그라운드 스레드에서 실행하고 (server, base_url) 반환 (server.shutdown()으로 종료)
+
+    Args:
+        port: 포트 (0이면 빈 포트 자동 선택)
+        latency: 페이지당 응답 지연 시간 (초)
+        fail_rate: 503 응답 비율 (0~1)
+        verbose: 요청 로그 출력 여부
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", port), _StubHandler)
+    server.daemon_threads = True
+    server.latency = latency
+    server.fail_rate = fail_rate
+    server.verbose = verbose
+    server.lock = threading.Lock()
+    server.request_count = 0
+    server.in_flight = 0
+    server.max_in_flight = 0
+    threading.Thread(target=server.serve_forever, name="upstage-stub", daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Upstage document-parse 로컬 스텁 서버")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="페이지당 응답 지연 시간 (초)")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="503 응답 비율 (0~1)")
+    args = parser.parse_args()
+
+    server, base_url = start_stub_server(args.port, args.latency, args.fail_rate, verbose=True)
+    print(f"🧪 Upstage 스텁 서버 실행 중: {base_url} (UPSTAGE_BASE_URL로 지정)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -2,17 +2,23 @@
 # from langchain_google_genai import GoogleGenerativeAIEmbeddings
 # from langchain_huggingface import HuggingFaceEmbeddings
 # from langchain_chroma import Chroma
-from src.config.config import OPENAI_API_KEY, GOOGLE_API_KEY, RENDER
-import time
-import random
+from src.config.config import OPENAI_API_KEY, GOOGLE_API_KEY, CHUNK_BATCH_SIZE, EMBEDDING_CACHE_PATH, EMBEDDING_CACHE_MAX_MB, QUERY_EMBEDDING_CACHE_SIZE, HYBRID_SEARCH, LEXICAL_INDEX_DIR
+from src.services.rag.rate_limiter import get_rate_limiter, RateLimitedEmbeddings
+from src.services.rag.lexical_index import LexicalIndex, reciprocal_rank_fusion
+from src.services.tracing import span, current_span
+from pathlib import Path
 import gc
 
+# 벡터 DB 컬렉션 이름
+COLLECTION_NAME = "apt_notices"
+
 class VectorStoreService:
-    def __init__(self, persist_directory=None, embedding_model="openai"):
+    def __init__(self, persist_directory=None, embedding_model="openai", embeddings=None):
         """
         VectorStoreService 초기화
         :param persist_directory: None이면 in-memory 모드 (파일 저장 안 함)
         :param embedding_model: 사용할 임베딩 모델 ("openai" 또는 "gemini")
+        :param embeddings: 직접 만든 임베딩 객체 (벤치마크용 가짜 임베딩 등, 주어지면 embedding_model의 라이브러리를 로드하지 않음)
         """
         # from langchain_openai import OpenAIEmbeddings
         # from langchain_google_genai import GoogleGenerativeAIEmbeddings
@@ -23,12 +29,16 @@ class VectorStoreService:
         print("VectorStoreService 1")
 
         # 1. 임베딩 라이브러리만 먼저 로드
-        if embedding_model == "gemini":
+        if embeddings is not None:
+            self.embedding_model_name = getattr(embeddings, "model", None) or embedding_model
+            self.embeddings = embeddings
+        elif embedding_model == "gemini":
             from langchain_google_genai import GoogleGenerativeAIEmbeddings
             gc.collect()
             print("VectorStoreService 2")
+            self.embedding_model_name = "models/gemini-embedding-001"
             self.embeddings = GoogleGenerativeAIEmbeddings(
-                model="models/gemini-embedding-001",
+                model=self.embedding_model_name,
                 google_api_key=GOOGLE_API_KEY,  # API 키 명시적으로 전달
                 # rate limit 방지를 위한 추가 설정
                 request_options={"timeout": 60}  # 타임아웃 설정
@@ -37,22 +47,54 @@ class VectorStoreService:
             from langchain_openai import OpenAIEmbeddings
             gc.collect()
             print("VectorStoreService 2.1")
+            self.embedding_model_name = "text-embedding-3-small"
             self.embeddings = OpenAIEmbeddings(
-                model="text-embedding-3-small",
+                model=self.embedding_model_name,
                 api_key=OPENAI_API_KEY
             )
         gc.collect() # 2. 임시 메모리 청소  
 
-        # 3. 그 다음 Chroma 로드
-        from langchain_chroma import Chroma
+        # 2-1. 임베딩 API 호출을 제공자별 공용 레이트 리미터로 감싸기 (분당 요청/토큰 한도, 429 대응)
+        self.rate_limiter = get_rate_limiter(f"{embedding_model}-embedding")
+        self.embeddings = RateLimitedEmbeddings(self.embeddings, self.rate_limiter)
+        # 질문 임베딩은 청크 임베딩 영구 캐시를 거치지 않고 질문 임베딩 캐시(메모리)만 사용
+        self.query_embeddings = self.embeddings
+        # 여러 질문을 한 번의 요청(embed_documents)으로 임베딩할 수 있는지
+        # (Gemini는 질문/문서 임베딩의 task_type이 달라 질문마다 embed_query 사용)
+        self.batch_query_embedding = embedding_model != "gemini"
+        self.query_cache = None
+        query_cache_size = int(QUERY_EMBEDDING_CACHE_SIZE) if QUERY_EMBEDDING_CACHE_SIZE else 500
+        if query_cache_size > 0:
+            from src.services.rag.embedding_cache import QueryEmbeddingCache
+            self.query_cache = QueryEmbeddingCache(max_entries=query_cache_size)
+
+        # 2-2. 임베딩 캐시 적용 (이전 공고문과 동일한 청크는 API 호출 없이 캐시된 벡터 사용)
+        self.embedding_cache = None
+        cache_path = self._embedding_cache_path()
+        if cache_path:
+            from src.services.rag.embedding_cache import EmbeddingCache, CachedEmbeddings
+            max_mb = int(EMBEDDING_CACHE_MAX_MB) if EMBEDDING_CACHE_MAX_MB else 200
+            self.embedding_cache = EmbeddingCache(cache_path, max_bytes=max_mb * 1024 * 1024)
+            self.embeddings = CachedEmbeddings(self.embeddings, self.embedding_cache, self.embedding_model_name)
+            print(f"🗃️ 임베딩 캐시 사용: {cache_path} (최대 {max_mb}MB)")
+
+        # 3. 그 다음 Chroma 로드 (클라이언트는 직접 만들어 보관 - 컬렉션 핸들로 여러 질문을 한 번에 조회하기 위해)
+        import chromadb
         gc.collect()
         print("VectorStoreService 3")
-        self.vector_db = Chroma(
-            persist_directory=self.persist_directory,  # None이면 메모리만 사용
-            embedding_function=self.embeddings,
-            collection_name="apt_notices" # 컬렉션 이름 지정
-        )
+        if self.persist_directory:
+            self.chroma_client = chromadb.Client(chromadb.config.Settings(is_persistent=True, persist_directory=self.persist_directory))
+        else:
+            self.chroma_client = chromadb.Client(chromadb.config.Settings())  # 메모리만 사용
+        self._open_vector_db()
         gc.collect() # 4. 메모리 청소  
+
+        # 5. 공고문별 BM25 어휘 색인 (하이브리드 검색용, 벡터 DB 폴더 옆에 저장)
+        self.lexical_index = None
+        if not (HYBRID_SEARCH and HYBRID_SEARCH.lower() in ("off", "false", "0")):
+            index_dir = self._lexical_index_dir()
+            self.lexical_index = LexicalIndex(index_dir)
+            print(f"🔤 하이브리드 검색 사용 (어휘 색인: {index_dir or 'in-memory'})")
         
         # # 임베딩 모델 선택 (기본값: OpenAI - 더 안정적이고 rate limit이 높음)
         # if embedding_model == "gemini":
@@ -87,118 +129,272 @@ class VectorStoreService:
 
         # gc.collect()
 
-    def add_documents(self, chunks):
-        """청크 리스트를 벡터 DB에 추가 (재시도 로직 포함)"""
+    def _open_vector_db(self):
+        """컬렉션을 열거나 새로 만들고, 같은 클라이언트/컬렉션으로 langchain Chroma 연결 (컬렉션 삭제 후에도 다시 호출)"""
+        from langchain_chroma import Chroma
+        self.collection = self.chroma_client.get_or_create_collection(name=COLLECTION_NAME, embedding_function=None)
+        self.vector_db = Chroma(
+            client=self.chroma_client,
+            embedding_function=self.embeddings,
+            collection_name=COLLECTION_NAME
+        )
+
+    def _embedding_cache_path(self):
+        """임베딩 캐시 파일 경로 (EMBEDDING_CACHE_PATH 우선, 없으면 벡터 DB 폴더 옆에 저장)"""
+        if EMBEDDING_CACHE_PATH:
+            if EMBEDDING_CACHE_PATH.lower() == "off":
+                return None
+            return EMBEDDING_CACHE_PATH
+        if self.persist_directory is None:
+            # in-memory 모드에서는 캐시도 남기지 않음
+            return None
+        return str(Path(self.persist_directory).parent / "embedding_cache.sqlite3")
+
+    def _lexical_index_dir(self):
+        """어휘 색인 폴더 (LEXICAL_INDEX_DIR 우선, 없으면 벡터 DB 폴더 옆에 저장, in-memory 모드면 None)"""
+        if LEXICAL_INDEX_DIR:
+            return LEXICAL_INDEX_DIR
+        if self.persist_directory is None:
+            return None
+        return str(Path(self.persist_directory).parent / "lexical_index")
+
+    def has_document(self, doc_id) -> bool:
+        """doc_id의 청크가 이미 저장되어 있는지 확인 (확인 실패 시 False)"""
+        try:
+            # include 옵션 없이 호출하면 ids는 기본 반환됨
+            existing = self.vector_db.get(where={"doc_id": str(doc_id)}, limit=1)
+            return bool(existing and existing.get("ids"))
+        except Exception as e:
+            # 중복 체크 실패 시에는 로그만 남기고 계속 진행
+            print(f"⚠️ 중복 확인 실패(계속 진행): {e}")
+            return False
+
+    def delete_document(self, doc_id):
+        """doc_id의 청크 모두 삭제"""
+        existing = self.vector_db.get(where={"doc_id": str(doc_id)})
+        if existing and existing.get("ids"):
+            self.vector_db.delete(ids=existing["ids"])
+            print(f"🗑️ doc_id={doc_id}의 청크 {len(existing['ids'])}개 삭제")
+        if self.lexical_index:
+            self.lexical_index.delete(doc_id)
+
+    def finalize_document(self, doc_id):
+        """문서 1개의 적재가 끝났을 때 호출 (어휘 색인 저장)"""
+        if self.lexical_index:
+            self.lexical_index.save(doc_id)
+
+    def iter_batches(self, chunks, max_size=None):
+        """
+        청크 iterable을 제공자의 요청 1회 최대 입력 개수/토큰 수에 맞춰 배치로 나누어 yield
+        (CHUNK_BATCH_SIZE 또는 max_size가 주어지면 배치 크기를 그 이하로 제한 - 메모리 절약)
+        """
+        sizes = [size for size in (int(CHUNK_BATCH_SIZE) if CHUNK_BATCH_SIZE else None, max_size) if size]
+        batch_size = min(sizes) if sizes else None
+        # 배치 크기만큼 모이는 대로 넘김 (제공자 한도(예: 2048개)까지 모은 뒤 나누면 문서 전체 청크를 기다리게 됨)
+        yield from self.rate_limiter.iter_batches(chunks, get_text=lambda chunk: chunk.page_content, max_size=batch_size)
+
+    def add_documents(self, chunks, skip_existing=True):
+        """
+        청크 리스트를 벡터 DB에 추가 (재시도 로직 포함)
+        :param skip_existing: True면 동일 doc_id가 이미 저장돼 있을 때 스킵
+                              (한 문서를 여러 배치로 나누어 저장하는 경우 False로 호출)
+        """
         if not chunks:
             print("⚠️ 저장할 청크가 없습니다.")
             return
 
         # 중복 방지: 동일 doc_id가 이미 저장돼 있으면 스킵
-        try:
+        if skip_existing:
             first_meta = getattr(chunks[0], "metadata", {}) or {}
-            doc_id = str(first_meta.get("doc_id")) if first_meta.get("doc_id") is not None else None
-            if doc_id:
-                # include 옵션 없이 호출하면 ids는 기본 반환됨
-                existing = self.vector_db.get(where={"doc_id": doc_id}, limit=1)
-                if existing and existing.get("ids"):
-                    print(f"⏩ doc_id={doc_id}는 이미 저장되어 있어 추가하지 않습니다.")
-                    return
-        except Exception as e:
-            # 중복 체크 실패 시에는 로그만 남기고 계속 진행
-            print(f"⚠️ 중복 확인 실패(계속 진행): {e}")
-        
-        print(f"💾 벡터 DB 저장 시작... (청크 {len(chunks)}개)")
-        
-        # 재시도 로직 (429 에러 대응)
-        max_retries = 3
-        retry_delay = 2  # 초기 대기 시간 (초)
-        
-        # Render 환경인지 확인 (로컬에서는 한 번에 처리, Render에서는 배치 처리)
-        is_render = RENDER == "true" or RENDER == "1"
-        
-        for attempt in range(max_retries):
-            try:
-                if is_render:
-                    # Render 환경: 작은 배치로 나누어 처리 (rate limit 방지)
-                    # Gemini API 무료 티어: 분당 약 15-60 요청 제한 (모델에 따라 다름)
-                    batch_size = 5  # 한 번에 처리할 청크 수 (더 작게)
-                    for i in range(0, len(chunks), batch_size):
-                        batch = chunks[i:i + batch_size]
-                        self.vector_db.add_documents(batch)
-                        del batch
-                        gc.collect()
-
-                        # 배치 간 대기 (rate limit 방지) - 분당 15 요청 기준으로 약 4초 간격
-                        if i + batch_size < len(chunks):
-                            wait_time = 4.0  # 4초 대기 (분당 15 요청 = 4초당 1 요청)
-                            print(f"  배치 {i//batch_size + 1} 완료. {wait_time}초 대기 중... (rate limit 방지)")
-                            time.sleep(wait_time)
-                else:
-                    # 로컬 환경: 한 번에 처리
-                    self.vector_db.add_documents(chunks)
-                
-                print("✅ 벡터 DB 저장 완료!")
+            doc_id = first_meta.get("doc_id")
+            if doc_id is not None and self.has_document(doc_id):
+                print(f"⏩ doc_id={doc_id}는 이미 저장되어 있어 추가하지 않습니다.")
                 return
-                
-            except Exception as e:
-                error_msg = str(e)
-                
-                # 차원 불일치 에러 처리 (임베딩 모델 변경 시 발생)
-                if "dimension" in error_msg.lower() or "expecting embedding" in error_msg.lower():
-                    print("⚠️ 임베딩 차원 불일치 감지. 기존 벡터 DB를 초기화합니다...")
-                    try:
-                        # 기존 컬렉션 삭제
-                        self.vector_db.delete_collection()
-                        del self.vector_db
-                        gc.collect()
-                        # 새 컬렉션 생성 (현재 임베딩 모델로)
-                        from langchain_chroma import Chroma
-                        self.vector_db = Chroma(
-                            persist_directory=self.persist_directory,
-                            embedding_function=self.embeddings,
-                            collection_name="apt_notices"
-                        )
-                        gc.collect()
-                        print("✅ 벡터 DB 재생성 완료. 다시 시도합니다...")
-                        # 재시도 (한 번만)
-                        continue
-                    except Exception as init_error:
-                        print(f"❌ 벡터 DB 재생성 실패: {init_error}")
-                        raise
-                
-                # 429 에러 처리 (할당량 초과)
-                elif "429" in error_msg or "RESOURCE_EXHAUSTED" in error_msg or "quota" in error_msg.lower():
-                    if attempt < max_retries - 1:
-                        # Exponential backoff: 대기 시간 증가
-                        wait_time = retry_delay * (2 ** attempt) + random.uniform(0, 1)
-                        print(f"⚠️ 할당량 초과 (429). {wait_time:.1f}초 후 재시도... ({attempt + 1}/{max_retries})")
-                        time.sleep(wait_time)
-                    else:
-                        print(f"❌ 최대 재시도 횟수 초과. 에러: {e}")
-                        raise
-                else:
-                    # 다른 에러는 즉시 재발생
-                    print(f"❌ 벡터 DB 저장 실패: {e}")
+
+        print(f"💾 벡터 DB 저장 시작... (청크 {len(chunks)}개)")
+
+        # 제공자의 요청 1회 최대 입력 크기에 맞춰 배치로 저장
+        # 분당 요청/토큰 한도 및 429 재시도는 임베딩 래퍼(RateLimitedEmbeddings)에서 처리됨
+        batches = list(self.iter_batches(chunks))
+        for index, batch in enumerate(batches):
+            # 임베딩 API 호출 + Chroma 저장 + 어휘 색인 추가
+            with span("vector_store.add_batch", chunks=len(batch), chars=sum(len(chunk.page_content) for chunk in batch)):
+                self._add_batch(batch)
+            if len(batches) > 1:
+                print(f"  배치 {index + 1}/{len(batches)} 저장 완료 (청크 {len(batch)}개)")
+            gc.collect()
+
+        for doc_id in {str(chunk.metadata.get("doc_id")) for chunk in chunks if chunk.metadata.get("doc_id") is not None}:
+            self.finalize_document(doc_id)
+        print("✅ 벡터 DB 저장 완료!")
+
+    def _add_batch(self, batch):
+        """배치 1개 저장 (임베딩 차원 불일치 시 컬렉션 재생성 후 한 번 재시도)"""
+        try:
+            ids = self.vector_db.add_documents(batch)
+        except Exception as e:
+            error_msg = str(e)
+
+            # 차원 불일치 에러 처리 (임베딩 모델 변경 시 발생)
+            if "dimension" in error_msg.lower() or "expecting embedding" in error_msg.lower():
+                print("⚠️ 임베딩 차원 불일치 감지. 기존 벡터 DB를 초기화합니다...")
+                try:
+                    # 기존 컬렉션 삭제 (어휘 색인도 이전 청크를 가리키므로 함께 삭제)
+                    self.vector_db.delete_collection()
+                    del self.vector_db
+                    if self.lexical_index:
+                        self.lexical_index.clear()
+                    gc.collect()
+                    # 새 컬렉션 생성 (현재 임베딩 모델로)
+                    self._open_vector_db()
+                    gc.collect()
+                    print("✅ 벡터 DB 재생성 완료. 다시 시도합니다...")
+                except Exception as init_error:
+                    print(f"❌ 벡터 DB 재생성 실패: {init_error}")
                     raise
+                # 재시도 (한 번만)
+                ids = self.vector_db.add_documents(batch)
+            else:
+                print(f"❌ 벡터 DB 저장 실패: {e}")
+                raise
+
+        if self.lexical_index:
+            by_doc = {}
+            for chunk_id, chunk in zip(ids, batch):
+                chunk_ids, texts = by_doc.setdefault(str(chunk.metadata.get("doc_id")), ([], []))
+                chunk_ids.append(chunk_id)
+                texts.append(chunk.page_content)
+            for doc_id, (chunk_ids, texts) in by_doc.items():
+                self.lexical_index.add(doc_id, chunk_ids, texts)
 
     def search(self, query, k=3, filter=None):
-        """유사한 문서 검색"""
-        return self.vector_db.similarity_search(query, k=k, filter=filter)
+        """유사한 문서 검색 (질문 임베딩 캐시 사용)"""
+        with span("vector_store.search", k=k, filter=filter, query_chars=len(query)) as search_span:
+            docs = self.vector_db.similarity_search_by_vector(self.embed_query(query), k=k, filter=filter)
+            search_span.set(results=len(docs), result_chars=sum(len(doc.page_content) for doc in docs))
+        return docs
+
+    def search_many(self, queries, k=3, filter=None):
+        """
+        여러 질문을 한꺼번에 검색 (임베딩은 한 번의 요청으로, 벡터 검색은 한 번의 Chroma 조회로 처리)
+        :return: 질문 순서대로 문서 목록의 목록
+        """
+        with span("vector_store.search_many", queries=len(queries), k=k, filter=filter):
+            return self.search_many_by_vector(self.embed_queries(queries), k=k, filter=filter)
+
+    def embed_query(self, query):
+        """질문 임베딩 (답변 캐시 조회와 검색에 같은 임베딩을 재사용하기 위해 분리, 같은 질문은 캐시에서 반환)"""
+        if self.query_cache is not None:
+            vector = self.query_cache.get(self.embedding_model_name, query)
+            if vector is not None:
+                current_span().set(cache="hit")
+                return vector
+        vector = self.query_embeddings.embed_query(query)
+        if self.query_cache is not None:
+            self.query_cache.put(self.embedding_model_name, query, vector)
+        return vector
+
+    def embed_queries(self, queries):
+        """여러 질문 임베딩 (캐시에 없는 질문만 중복 없이 한 번의 요청으로 임베딩)"""
+        vectors = [
+            self.query_cache.get(self.embedding_model_name, query) if self.query_cache is not None else None
+            for query in queries
+        ]
+        missing = list(dict.fromkeys(query for query, vector in zip(queries, vectors) if vector is None))
+        if missing:
+            if self.batch_query_embedding:
+                new_vectors = self.query_embeddings.embed_documents(missing)
+            else:
+                new_vectors = [self.query_embeddings.embed_query(query) for query in missing]
+            vector_by_query = dict(zip(missing, new_vectors))
+            if self.query_cache is not None:
+                for query, vector in vector_by_query.items():
+                    self.query_cache.put(self.embedding_model_name, query, vector)
+            vectors = [vector if vector is not None else vector_by_query[query] for query, vector in zip(queries, vectors)]
+        return vectors
+
+    def search_by_vector(self, embedding, k=3, filter=None):
+        """이미 계산된 질문 임베딩으로 유사한 문서 검색"""
+        with span("vector_store.search_by_vector", k=k, filter=filter) as search_span:
+            docs = self.vector_db.similarity_search_by_vector(embedding, k=k, filter=filter)
+            search_span.set(results=len(docs), result_chars=sum(len(doc.page_content) for doc in docs))
+        return docs
+
+    def search_many_by_vector(self, embeddings, k=3, filter=None):
+        """이미 계산된 질문 임베딩 여러 개로 한 번에 검색 (질문 순서대로 문서 목록의 목록 반환)"""
+        if not embeddings:
+            return []
+        from langchain_core.documents import Document
+        with span("vector_store.search_many_by_vector", queries=len(embeddings), k=k, filter=filter) as search_span:
+            # langchain_chroma는 질문 1개씩만 조회하므로 직접 연 컬렉션 핸들에 여러 임베딩을 한 번에 전달
+            results = self.collection.query(
+                query_embeddings=embeddings, n_results=k, where=filter, include=["documents", "metadatas"]
+            )
+            docs_per_query = [
+                [Document(page_content=text, metadata=metadata or {}) for text, metadata in zip(texts, metadatas) if text is not None]
+                for texts, metadatas in zip(results["documents"], results["metadatas"])
+            ]
+            search_span.set(results=sum(len(docs) for docs in docs_per_query))
+        return docs_per_query
+
+    def hybrid_search_by_vector(self, query, embedding, k=5, filter=None, fetch_k=20):
+        """
+        벡터 검색과 공고문별 BM25 어휘 검색 결과를 RRF로 합쳐 상위 k개 반환
+        (doc_id 필터가 없거나 하이브리드 검색이 꺼져 있으면 벡터 검색만 사용)
+        :param fetch_k: 각 검색 방식에서 가져올 후보 수
+        """
+        doc_id = (filter or {}).get("doc_id")
+        if self.lexical_index is None or doc_id is None:
+            return self.search_by_vector(embedding, k=k, filter=filter)
+
+        dense_docs = self.search_by_vector(embedding, k=fetch_k, filter=filter)
+        with span("vector_store.lexical_search", k=fetch_k, doc_id=doc_id) as lexical_span:
+            lexical_ids = [chunk_id for chunk_id, _ in self._lexical_search(doc_id, query, fetch_k)]
+            lexical_span.set(results=len(lexical_ids))
+        if not lexical_ids:
+            return dense_docs[:k]
+
+        from langchain_core.documents import Document
+        with span("vector_store.get", ids=len(lexical_ids)):
+            fetched = self.vector_db.get(ids=lexical_ids, include=["documents", "metadatas"])
+        by_id = {
+            chunk_id: Document(page_content=text, metadata=metadata or {})
+            for chunk_id, text, metadata in zip(fetched["ids"], fetched["documents"], fetched["metadatas"])
+        }
+        lexical_docs = [by_id[chunk_id] for chunk_id in lexical_ids if chunk_id in by_id]
+
+        # 같은 청크는 내용으로 식별 (벡터 검색 결과에는 id가 없음)
+        docs_by_content = {doc.page_content: doc for doc in lexical_docs}
+        docs_by_content.update((doc.page_content, doc) for doc in dense_docs)
+        fused = reciprocal_rank_fusion([
+            [doc.page_content for doc in dense_docs],
+            [doc.page_content for doc in lexical_docs],
+        ])
+        return [docs_by_content[content] for content in fused[:k]]
+
+    def _lexical_search(self, doc_id, query, k):
+        """어휘 색인 검색 (색인이 없는 기존 문서는 벡터 DB에 저장된 청크로 색인을 만든 뒤 검색)"""
+        doc_id = str(doc_id)
+        if not self.lexical_index.has(doc_id):
+            existing = self.vector_db.get(where={"doc_id": doc_id}, include=["documents"])
+            if not existing or not existing.get("ids"):
+                return []
+            self.lexical_index.add(doc_id, existing["ids"], existing["documents"])
+            self.lexical_index.save(doc_id)
+            print(f"🔤 doc_id={doc_id} 어휘 색인 생성 (청크 {len(existing['ids'])}개)")
+        return self.lexical_index.search(doc_id, query, k)
 
     def clear(self):
         """벡터 DB 데이터를 모두 삭제합니다."""
         try:
+            if self.lexical_index:
+                self.lexical_index.clear()
             self.vector_db.delete_collection()
             # 컬렉션 재생성 (삭제 후 다시 쓰기 위해)
             del self.vector_db
             gc.collect()
 
-            from langchain_chroma import Chroma
-            self.vector_db = Chroma(
-                persist_directory=self.persist_directory,  # None이면 in-memory
-                embedding_function=self.embeddings,
-                collection_name="apt_notices"
-            )
+            self._open_vector_db()
             gc.collect()
             print("✅ 벡터 DB 초기화 완료")
         except Exception as e:
@@ -1,38 +1,51 @@
 from pathlib import Path
-from src.config.config import OPENAI_API_KEY, GOOGLE_API_KEY, CHUNK_BATCH_SIZE, RENDER
+import json
+from src.config.config import OPENAI_API_KEY, GOOGLE_API_KEY, RENDER, ANSWER_CACHE_THRESHOLD, ANSWER_CACHE_TTL, ANSWER_CACHE_MAX_ENTRIES, INGEST_BATCH_SIZE, INGEST_QUEUE_SIZE, EXTRACTION_CACHE_PATH, EXTRACTION_CACHE_MAX_MB, RETRIEVAL_K, CONTEXT_TOKEN_BUDGET, CONTEXT_MAX_TABLE_ROWS
+from src.services.rag.rate_limiter import get_rate_limiter, estimate_tokens, is_rate_limit_error
+from src.services.rag.ingest_pipeline import run_in_background
+from src.services.rag.context_builder import ContextBuilder, count_tokens
+from src.services.metrics import STAGE_SECONDS, LLM_TOKENS, Stopwatch
+from src.services.tracing import span, traced, current_span
 # from openai import OpenAI
 # from google.genai import Client
 import time
-import random
-import re
 import gc
 
 # 분리된 모듈 import
-# from src.services.rag.pdf_extractor_pymupdf import PDFExtractorPyMuPDF
-# from src.services.rag.pdf_extractor_llama import PDFExtractorLlama
-# from src.services.rag.pdf_extractor_marker import PDFExtractorMarker
 # from src.services.rag.pdf_extractor import PDFExtractor
 # from src.services.rag.data_processor import DataProcessor
 # from src.services.rag.text_chunker import TextChunker
 # from src.services.rag.vector_store import VectorStoreService
 
+# 모델별 답변 접두어 (정상 생성된 답변인지 구분하는 데도 사용)
+ANSWER_PREFIXES = {
+    "openai": "GPT-4o-mini: ",
+    "gemini": "Gemini 3 Pro: ",
+}
+
 # openai = OpenAI(api_key=OPENAI_API_KEY)
 # genai_client = Client(api_key=GOOGLE_API_KEY) 
 
 class RAGService:
-    def __init__(self, persist_directory=None, embedding_model="openai"):
+    def __init__(self, persist_directory=None, embedding_model="openai", embeddings=None, openai_client=None, genai_client=None):
         """
         RAG 파이프라인을 총괄하는 서비스 클래스.
         ETL 프로세스를 각 담당 클래스에게 위임하여 실행합니다.
         :param persist_directory: None이면 in-memory 모드 (파일 저장 안 함, 서버 재시작 시 데이터 사라짐)
         :param embedding_model: 사용할 임베딩 모델 ("openai" 또는 "gemini")
+        :param embeddings: 직접 만든 임베딩 객체 (벤치마크 등 오프라인 실행용, VectorStoreService로 전달)
+        :param openai_client / genai_client: 직접 만든 LLM 클라이언트 (주어지면 해당 SDK를 로드하지 않음)
         """
         print("RAGService 1")
-        from google.genai import Client
-        gc.collect()
+        if genai_client is None:
+            from google.genai import Client
+            gc.collect()
+            genai_client = Client(api_key=GOOGLE_API_KEY)
         print("RAGService 2")
-        from openai import OpenAI
-        gc.collect()
+        if openai_client is None:
+            from openai import OpenAI
+            gc.collect()
+            openai_client = OpenAI(api_key=OPENAI_API_KEY)
         print("RAGService 3")
         from src.services.rag.pdf_extractor import PDFExtractor
         gc.collect()
@@ -45,124 +58,225 @@ class RAGService:
         gc.collect()
         print("RAGService 6")
 
-        self.openai = OpenAI(api_key=OPENAI_API_KEY)
-        self.genai_client = Client(api_key=GOOGLE_API_KEY) 
+        self.openai = openai_client
+        self.genai_client = genai_client
 
         # 각 단계별 담당자(Worker) 초기화
         self.pdf_extractor = PDFExtractor()
-        # self.pdf_extractor_pymupdf = PDFExtractorPyMuPDF()
-        # self.pdf_extractor_llama = PDFExtractorLlama()
-        # self.pdf_extractor_marker = PDFExtractorMarker()
         # self.data_processor = DataProcessor()
         self.text_chunker = TextChunker()
-        self.vector_store = VectorStoreService(persist_directory, embedding_model=embedding_model)  # None = in-memory
+        self.vector_store = VectorStoreService(persist_directory, embedding_model=embedding_model, embeddings=embeddings)  # None = in-memory
+        from src.services.rag.answer_cache import AnswerCache
+        self.answer_cache = AnswerCache(
+            threshold=float(ANSWER_CACHE_THRESHOLD) if ANSWER_CACHE_THRESHOLD else 0.95,
+            ttl=float(ANSWER_CACHE_TTL) if ANSWER_CACHE_TTL else 3600,
+            max_entries=int(ANSWER_CACHE_MAX_ENTRIES) if ANSWER_CACHE_MAX_ENTRIES else 100,
+        )
+
+        # 검색된 청크로 프롬프트 컨텍스트 구성 (중복 제거, 표 축소, 토큰 한도)
+        self.context_builder = ContextBuilder(
+            token_budget=int(CONTEXT_TOKEN_BUDGET) if CONTEXT_TOKEN_BUDGET else 4000,
+            max_table_rows=int(CONTEXT_MAX_TABLE_ROWS) if CONTEXT_MAX_TABLE_ROWS else 12,
+        )
+
+        # PDF 추출 결과 캐시 (같은 PDF 재분석 시 OCR 추출/변환/청킹 생략)
+        self.extraction_cache = None
+        cache_path = self._extraction_cache_path(persist_directory)
+        if cache_path:
+            from src.services.rag.extraction_cache import ExtractionCache
+            max_mb = int(EXTRACTION_CACHE_MAX_MB) if EXTRACTION_CACHE_MAX_MB else 300
+            self.extraction_cache = ExtractionCache(cache_path, max_bytes=max_mb * 1024 * 1024)
+            print(f"🗃️ 추출 캐시 사용: {cache_path} (최대 {max_mb}MB)")
         gc.collect()
 
+    @staticmethod
+    def _extraction_cache_path(persist_directory):
+        """추출 캐시 파일 경로 (EXTRACTION_CACHE_PATH 우선, 없으면 벡터 DB 폴더 옆에 저장)"""
+        if EXTRACTION_CACHE_PATH:
+            if EXTRACTION_CACHE_PATH.lower() == "off":
+                return None
+            return EXTRACTION_CACHE_PATH
+        if persist_directory is None:
+            # in-memory 모드에서는 캐시도 남기지 않음
+            return None
+        return str(Path(persist_directory).parent / "extraction_cache.sqlite3")
 
-    def process_for_rag(self, pdf_path: str, doc_id: str):
+
+    @traced("process_for_rag")
+    def process_for_rag(self, pdf_path: str, doc_id: str, progress_callback=None, html_content: str = None):
         """
         PDF 파일을 처리하여 RAG 시스템에 적재할 수 있는 형태로 변환 및 저장합니다.
         :param pdf_path: PDF 파일 경로
         :param doc_id: 문서를 식별할 수 있는 고유 ID (예: house_manage_no)
+        :param html_content: 이미 추출된 Upstage HTML (주어지면 추출기 선택과 PDF 추출 생략 - 벤치마크 등)
+        :param progress_callback: 단계별 진행 상황 보고 함수 progress_callback(stage, state)
+                                  stage: "extract" / "chunk" / "embed", state: "running" / "done"
         """
+        def report(stage, state):
+            if progress_callback:
+                progress_callback(stage, state)
+
+        # 중복 방지: 동일 doc_id가 이미 저장돼 있으면 추출/청킹/임베딩 모두 생략
+        doc_id = str(doc_id)
+        process_span = current_span()
+        process_span.set(doc_id=doc_id)
+        if self.vector_store.has_document(doc_id):
+            process_span.set(skipped=True)
+            print(f"⏩ doc_id={doc_id}는 이미 저장되어 있어 추가하지 않습니다.")
+            for stage in ("extract", "chunk", "embed"):
+                report(stage, "done")
+            return '====처리 완료===='
+
         # 1. Extract: PDF에서 Raw 데이터 추출
         print(f"🔍 PDF 추출 시작: {pdf_path}")
-        # Upstage Information Extraction API 사용
-        # html_string = self.pdf_extractor.extract_html_by_information_extraction(pdf_path) # pdf -> json
-
-        # Upstage Document AI API 사용
-        # html_string = self.pdf_extractor.extract_html_by_document_digitization(pdf_path) # pdf -> html
-        # markdown_content = self.pdf_extractor.html_to_markdown(html_string)
-
-        # 역삼센트럴자이 저장된 html 파일 읽어오기 (API 사용 방지)
-        with open("extracted_view.html", "r", encoding="utf-8") as f:
-            html_content = f.read()
-        markdown_content = self.pdf_extractor.html_to_markdown(html_content)
-
-        # raw_content = self.pdf_extractor.extract_content(pdf_path) ############################################## 1
-        # # raw_content = self.pdf_extractor_pymupdf.extract_content(pdf_path)
-        # # raw_content = self.pdf_extractor_llama.extract_content(pdf_path)
-        # # raw_content = self.pdf_extractor_marker.extract_content(pdf_path)
-        
-        # # (디버깅용) 추출된 표 데이터 엑셀 저장
-        # self.save_tables_to_excel(raw_content)
-        
-        # # 2. Transform: 데이터 정제 및 마크다운 변환
-        # print("🧹 데이터 정제 및 변환 중...")
-        # processed_docs = self.data_processor.process_content(raw_content) ######################################## 2
-        
-        # # raw_content 메모리 해제 (더 이상 필요 없음)
-        # del raw_content
-        # import gc
-        # gc.collect()
-        
-        # # 3. 마크다운 문서 생성
-        # final_rag_document = "\n\n".join(processed_docs)
-        
-        final_rag_document = markdown_content
-        
-        # 로컬 환경에서만 마크다운 파일 저장
+        report("extract", "running")
+        from src.services.rag.extractor_registry import get_extractor, select_extractor
+        if html_content is not None:
+            # 이미 추출된 Upstage HTML이 주어진 경우 (벤치마크 등)
+            extractor = get_extractor("upstage")
+        else:
+            # 사전 검사로 PDF마다 추출기 선택 (텍스트 PDF는 로컬 추출, 스캔 PDF만 OCR) - PDF_EXTRACTOR로 고정 가능
+            extractor = select_extractor(pdf_path)
+
+        # 같은 PDF(내용 기준)를 같은 추출기로 처리한 결과가 캐시에 있으면 추출/변환/청킹 생략
+        cache = self.extraction_cache
+        cache_key = None
+        if cache and html_content is None:
+            pdf_sha256 = cache.file_sha256(pdf_path)
+            if pdf_sha256:
+                cache_key = cache.make_key(pdf_sha256, extractor.name, extractor.version)
+        chunks_kind = f"chunks:{self.text_chunker.version}"
+        cached_chunks = cache.get(cache_key, chunks_kind) if cache_key else None
+        cached_markdown = cache.get(cache_key, "markdown") if cache_key and cached_chunks is None else None
+        if cached_chunks is not None or cached_markdown is not None:
+            print(f"♻️ 추출 캐시 적중: {'청크' if cached_chunks is not None else '마크다운'} 재사용")
+
+        # 1~5. 추출 → 변환 → 청킹 → 임베딩/저장을 제너레이터로 연결하여 동시에 진행
+        # - 추출/변환/청킹은 백그라운드 스레드에서, 임베딩/저장은 현재 스레드에서 실행
+        # - 추출기는 페이지(범위) 단위로 결과를 넘기고, 단계 사이 대기열 크기를 제한하여 문서 전체 추출 결과/마크다운/청크 리스트를 메모리에 올리지 않음
         is_render = RENDER == "true" or RENDER == "1"
-        if not is_render:
-            # 로컬 환경: data/md/에 마크다운 저장
-            self.save_rag_document_as_md(pdf_path, final_rag_document)
-        
-        # processed_docs 메모리 해제
-        # del processed_docs
-        # gc.collect()
-        
-        # 4. Chunking: 텍스트 청킹 (메모리 효율을 위해 배치로 처리)
-        print("🔪 텍스트 청킹 중...")
-        chunks = self.text_chunker.chunk_markdown(final_rag_document) ############################################ 3
-        
-        # final_rag_document 메모리 해제 (청킹 완료 후 더 이상 필요 없음)
-        del final_rag_document
-        gc.collect()
-        
-        # [중요]⭐ 모든 청크에 문서 ID(doc_id) 메타데이터 추가
-        # 검색(Retrieval) 성능을 높이기 위해 다음 메타데이터 추가하면 좋음
-        # 청크 요약, 핵심 키워드, 부모 문서의 제목, 페이지 번호  
-        for chunk in chunks:
-            chunk.metadata['doc_id'] = str(doc_id)
+        # 추출/변환/청킹은 번갈아 실행되므로 각 이터레이터의 next()에 걸린 시간을 따로 누적
+        # (변환 시간 = 마크다운 시간 - 추출 시간, 청킹 시간 = 청커 시간 - 마크다운 시간)
+        extract_watch, markdown_watch, chunker_watch = Stopwatch(), Stopwatch(), Stopwatch()
+
+        def raw_pieces():
+            if html_content is not None:
+                # 이미 추출된 Upstage HTML이 주어진 경우 (벤치마크 등)
+                yield html_content
+                return
+            cached_raw = cache.get(cache_key, "raw") if cache_key and extractor.cache_raw else None
+            if cached_raw is not None:
+                print("♻️ 추출 캐시 적중: 원본 추출 결과 재사용")
+                yield cached_raw
+                return
+            # 페이지(범위) 단위로 추출하는 대로 넘겨 변환/청킹/임베딩과 동시에 진행 (문서 전체 추출 결과를 메모리에 올리지 않음)
+            cache_writer = cache.writer(cache_key, "raw") if cache_key and extractor.cache_raw else None
+            raw_chars = 0
+            with span("extract", extractor=extractor.name) as extract_span:
+                for piece in extract_watch.iterate(extractor.iter_raw(pdf_path)):
+                    raw_chars += len(piece)
+                    if cache_writer:
+                        cache_writer.write(piece)
+                    yield piece
+                extract_span.set(raw_chars=raw_chars, extract_ms=round(extract_watch.elapsed * 1000, 3))
+            STAGE_SECONDS.observe(extract_watch.elapsed, stage="extract")
+            if cache_writer:
+                cache_writer.commit()
+
+        def markdown_pieces():
+            if cached_markdown is not None:
+                yield cached_markdown
+                report("extract", "done")
+                return
+            # 로컬 환경에서만 마크다운 파일 저장 (조각 단위로 이어서 기록)
+            md_file = None if is_render else self.open_rag_document_md(pdf_path)
+            cache_writer = cache.writer(cache_key, "markdown") if cache_key else None
+            try:
+                for raw_piece in raw_pieces():
+                    for piece in extractor.iter_markdown(raw_piece):
+                        if md_file:
+                            md_file.write(piece)
+                        if cache_writer:
+                            cache_writer.write(piece)
+                        yield piece
+            finally:
+                if md_file:
+                    md_file.close()
+                    print(f"✅ 최종 Markdown 저장 완료: {md_file.name}")
+            if cache_writer:
+                cache_writer.commit()
+            report("extract", "done")
+
+        def chunk_source():
+            if cached_chunks is not None:
+                report("extract", "done")
+                yield from self._load_chunks(cached_chunks)
+                return
+            cache_writer = cache.writer(cache_key, chunks_kind) if cache_key else None
+            for chunk in chunker_watch.iterate(self.text_chunker.iter_chunks(markdown_watch.iterate(markdown_pieces()))):
+                if cache_writer:
+                    cache_writer.write(self._dump_chunk(chunk))
+                yield chunk
+            if cache_writer:
+                cache_writer.commit()
+
+        def tagged_chunks():
+            print("🔪 텍스트 청킹 중...")
+            report("chunk", "running")
+            count = chunk_chars = 0
+            # 백그라운드 스레드에서 실행되는 변환/청킹 구간 (임베딩 대기열이 가득 차서 멈춘 시간 포함)
+            with span("transform_and_chunk", cached="chunks" if cached_chunks is not None else "markdown" if cached_markdown is not None else None) as chunk_span:
+                for chunk in chunk_source():
+                    # [중요]⭐ 모든 청크에 문서 ID(doc_id) 메타데이터 추가
+                    # 검색(Retrieval) 성능을 높이기 위해 다음 메타데이터 추가하면 좋음
+                    # 청크 요약, 핵심 키워드, 부모 문서의 제목, 페이지 번호
+                    chunk.metadata['doc_id'] = doc_id
+                    chunk.metadata['extractor'] = extractor.name
+                    count += 1
+                    chunk_chars += len(chunk.page_content)
+                    yield chunk
+                chunk_span.set(
+                    chunks=count, chunk_chars=chunk_chars,
+                    html_to_markdown_ms=round((markdown_watch.elapsed - extract_watch.elapsed) * 1000, 3),
+                    chunk_ms=round((chunker_watch.elapsed - markdown_watch.elapsed) * 1000, 3),
+                )
+            print(f"✅ 총 {count}개의 청크가 생성되었습니다.")
+            if cached_chunks is None:
+                if cached_markdown is None:
+                    STAGE_SECONDS.observe(markdown_watch.elapsed - extract_watch.elapsed, stage="html_to_markdown")
+                STAGE_SECONDS.observe(chunker_watch.elapsed - markdown_watch.elapsed, stage="chunk")
+            report("chunk", "done")
 
-        print(f"✅ 총 {len(chunks)}개의 청크가 생성되었습니다.")
-        
         # 5. Load: 벡터 DB 저장
-        if chunks:
-            # Render 환경인지 확인 (환경 변수로 구분)
-            # CHUNK_BATCH_SIZE가 명시적으로 설정되어 있으면 그 값을 사용
-            # 없으면 RENDER 환경 변수를 확인하여 결정
-            chunk_batch_size_env = CHUNK_BATCH_SIZE
-            
-            if chunk_batch_size_env is not None:
-                # 명시적으로 설정된 경우
-                chunk_batch_size = int(chunk_batch_size_env)
-            else:
-                # 환경 변수가 없으면 RENDER 환경 확인
-                is_render = RENDER == "true" or RENDER == "1"
-                chunk_batch_size = 50 if is_render else 0  # Render면 50, 로컬이면 0 (한 번에 처리)
-            
-            # 배치 크기가 0이거나 청크 개수보다 크면 한 번에 처리 (로컬 환경)
-            if chunk_batch_size == 0 or chunk_batch_size >= len(chunks):
-                print(f"  💾 청크 저장 중... (한 번에 {len(chunks)}개)")
-                self.vector_store.add_documents(chunks) ########################################################### 4
-            else:
-                # Render 환경: 배치로 나누어 저장 (메모리 효율)
-                total_chunks = len(chunks)
-                print(f"  💾 청크 배치 저장 중... (배치 크기: {chunk_batch_size})")
-                
-                for i in range(0, total_chunks, chunk_batch_size):
-                    batch = chunks[i:i + chunk_batch_size]
-                    print(f"    배치 {i//chunk_batch_size + 1}/{(total_chunks + chunk_batch_size - 1)//chunk_batch_size} 저장 중...")
-                    self.vector_store.add_documents(batch)
-                    # 배치 저장 후 메모리 해제
-                    del batch
-                    gc.collect()
-            
-            # 모든 청크 메모리 해제
-            del chunks
-            gc.collect()
+        # 배치 분할, 분당 요청/토큰 한도 및 429 재시도는 VectorStoreService에서 제공자 한도에 맞춰 처리
+        batch_size = int(INGEST_BATCH_SIZE) if INGEST_BATCH_SIZE else 32
+        queue_size = int(INGEST_QUEUE_SIZE) if INGEST_QUEUE_SIZE else 2
+        batches = run_in_background(
+            self.vector_store.iter_batches(tagged_chunks(), max_size=batch_size),
+            maxsize=queue_size,
+            name=f"extract-{doc_id}",
+        )
+        stored = 0
+        try:
+            for batch in batches:
+                if stored == 0:
+                    report("embed", "running")
+                self.vector_store.add_documents(batch, skip_existing=False) ################################### 4
+                stored += len(batch)
+                print(f"  💾 청크 저장 중... ({stored}개 완료)")
+        except Exception:
+            # 일부 배치만 저장된 상태로 남으면 다음 분석 때 '이미 저장됨'으로 스킵되므로 삭제
+            if stored:
+                self.vector_store.delete_document(doc_id)
+            raise
+        self.vector_store.finalize_document(doc_id)
+        process_span.set(extractor=extractor.name, chunks=stored)
+        gc.collect()
+
+        # 공고문 내용이 바뀌었을 수 있으므로 해당 문서의 답변 캐시 무효화
+        self.answer_cache.invalidate(doc_id)
 
+        report("embed", "done")
         return '====처리 완료===='
 
     def answer_question(self, question: str, doc_id: str = None, model: str = "openai", conversation_history: list = []):
@@ -172,6 +286,64 @@ class RAGService:
         :param model: 사용할 모델 ("openai" 또는 "gemini")
         :param conversation_history: 이전 대화 내용
         """
+        with span("answer_question", doc_id=doc_id, model=model, question_chars=len(question), stream=False) as answer_span:
+            early_answer, system_prompt, question_vector, use_cache = self._prepare_answer(question, doc_id, model, conversation_history)
+            if early_answer is not None:
+                answer_span.set(answer_chars=len(early_answer))
+                return early_answer
+
+            # 3. Generate: 답변 생성
+            with STAGE_SECONDS.time(stage="llm_generate"), span("llm_generate", model=model, prompt_chars=len(system_prompt)) as generate_span:
+                answer = self._generate_answer(system_prompt, question, model)
+                generate_span.set(answer_chars=len(answer))
+
+            # 정상 생성된 답변만 캐시에 저장 (에러/안내 메시지는 저장하지 않음)
+            if self._record_answer(model, answer) and use_cache:
+                self.answer_cache.store(str(doc_id), model, question, question_vector, answer)
+            answer_span.set(answer_chars=len(answer))
+            return answer
+
+    def answer_question_stream(self, question: str, doc_id: str = None, model: str = "openai", conversation_history: list = []):
+        """
+        answer_question의 스트리밍 버전. 답변을 생성되는 대로 조각(str) 단위로 yield 합니다.
+        (429 재시도는 첫 토큰을 보내기 전에만 수행됨)
+        """
+        with span("answer_question", doc_id=doc_id, model=model, question_chars=len(question), stream=True) as answer_span:
+            early_answer, system_prompt, question_vector, use_cache = self._prepare_answer(question, doc_id, model, conversation_history)
+            if early_answer is not None:
+                answer_span.set(answer_chars=len(early_answer))
+                yield early_answer
+                return
+
+            pieces = []
+            started = time.perf_counter()
+            with STAGE_SECONDS.time(stage="llm_generate"), span("llm_generate", model=model, prompt_chars=len(system_prompt)) as generate_span:
+                for piece in self._generate_answer_stream(system_prompt, question, model):
+                    if not pieces:
+                        # 첫 조각까지 걸린 시간 (사용자가 답변을 보기 시작하는 시점)
+                        generate_span.set(first_piece_ms=round((time.perf_counter() - started) * 1000, 3))
+                    pieces.append(piece)
+                    yield piece
+
+            answer = "".join(pieces)
+            generate_span.set(answer_chars=len(answer))
+            answer_span.set(answer_chars=len(answer))
+            if self._record_answer(model, answer) and use_cache:
+                self.answer_cache.store(str(doc_id), model, question, question_vector, answer)
+
+    @staticmethod
+    def _record_answer(model: str, answer: str) -> bool:
+        """정상 생성된 답변(모델 접두어로 시작)이면 답변 토큰 수를 기록하고 True 반환 (에러/안내 메시지는 False)"""
+        if not answer.startswith(ANSWER_PREFIXES.get(model, ANSWER_PREFIXES["openai"])):
+            return False
+        LLM_TOKENS.labels(model=model, kind="completion").inc(count_tokens(answer, model))
+        return True
+
+    def _prepare_answer(self, question: str, doc_id: str, model: str, conversation_history: list):
+        """
+        답변 생성 전 단계 (캐시 확인 → 검색 → 프롬프트 구성)
+        :return: (바로 반환할 답변 또는 None, 시스템 프롬프트, 질문 임베딩, 답변 캐시 사용 여부)
+        """
         model_display = "GPT-4o-mini" if model == "openai" else "Gemini Pro"
         print(f"🤔 질문 분석 중: {question}")
         print(f"📋 문서 ID: {doc_id}, 선택된 LLM: {model_display}")
@@ -186,16 +358,29 @@ class RAGService:
         # - 한 달 10,000원 예산: 하루 약 512개 질문 가능 (여전히 충분!)
         
         # 1. Retrieve: 관련 문서 검색 (필터 적용)
-        # k=10으로 증가하여 표 데이터 등 다양한 형식의 정보도 포함
-        filter_condition = {"doc_id": str(doc_id)} if doc_id else None
-        related_docs = self.vector_store.search(query=question, k=10, filter=filter_condition) 
+        with span("embed_query", chars=len(question)):
+            question_vector = self.vector_store.embed_query(question)
+
+        # 대화 히스토리가 없는 질문은 같은 공고문의 유사 질문 답변을 재사용 (LLM 호출 생략)
+        use_cache = bool(doc_id) and not conversation_history
+        if use_cache:
+            with span("answer_cache.lookup") as lookup_span:
+                cached_answer = self.answer_cache.lookup(str(doc_id), model, question_vector)
+                lookup_span.set(hit=bool(cached_answer))
+            if cached_answer:
+                return cached_answer, None, question_vector, use_cache
+
+        related_docs = self.retrieve(question, question_vector, doc_id)
         
         if not related_docs:
             print("⚠️ 검색된 문서가 없습니다. 벡터 DB에 데이터가 저장되어 있는지 확인해주세요.")
-            return "죄송합니다. 해당 공고문에서 관련 정보를 찾을 수 없습니다. 먼저 공고문을 분석해주세요."
+            return "죄송합니다. 해당 공고문에서 관련 정보를 찾을 수 없습니다. 먼저 공고문을 분석해주세요.", None, question_vector, use_cache
 
         # 2. Augment: 프롬프트 구성
-        context = "\n\n".join([doc.page_content for doc in related_docs])
+        # 중복/유사 청크 제거, 큰 표는 질문과 관련된 행/열만 남기고, 관련도 순으로 토큰 한도까지만 사용
+        with span("context_build", retrieved_chars=sum(len(doc.page_content) for doc in related_docs)) as context_span:
+            context, context_stats = self.context_builder.build(question, related_docs, model)
+            context_span.set(**context_stats)
         
         # 디버깅: 검색된 문서 정보 출력
         print(f"📄 검색된 문서 개수: {len(related_docs)}")
@@ -229,7 +414,34 @@ class RAGService:
         # 시스템 프롬프트에 히스토리 섹션 추가
         system_prompt += f"\n\n[이전 대화 내용]\n{history_text}"
 
-        # 3. Generate: 답변 생성
+        prompt_tokens = count_tokens(f"{system_prompt}\n\n질문: {question}", model)
+        LLM_TOKENS.labels(model=model, kind="prompt").inc(prompt_tokens)
+        current_span().set(prompt_tokens=prompt_tokens)
+        print(
+            f"🧮 프롬프트 토큰: {prompt_tokens} (컨텍스트 {context_stats['context_tokens']}, "
+            f"청크 {context_stats['used']}/{context_stats['retrieved']}개 사용, 중복 제거 {context_stats['duplicates']}개)"
+        )
+        return None, system_prompt, question_vector, use_cache
+
+    @STAGE_SECONDS.time(stage="vector_search")
+    @traced("retrieve")
+    def retrieve(self, question: str, question_vector, doc_id: str = None):
+        """
+        질문과 관련된 청크 검색
+        공고문이 지정되면 벡터 검색 + BM25 어휘 검색(정확한 수치/코드/날짜)을 합친 하이브리드 검색으로 k를 줄여 프롬프트를 작게 유지
+        (하이브리드 검색을 끄면 예전처럼 벡터 검색 k=10으로 표 데이터 등 다양한 형식의 정보도 포함)
+        """
+        filter_condition = {"doc_id": str(doc_id)} if doc_id else None
+        if self.vector_store.lexical_index is None:
+            k = int(RETRIEVAL_K) if RETRIEVAL_K else 10
+            return self.vector_store.search_by_vector(question_vector, k=k, filter=filter_condition)
+        k = int(RETRIEVAL_K) if RETRIEVAL_K else 6
+        return self.vector_store.hybrid_search_by_vector(question, question_vector, k=k, filter=filter_condition)
+
+    def _generate_answer(self, system_prompt: str, question: str, model: str) -> str:
+        """
+        선택된 LLM으로 답변 생성 (실패 시 사용자에게 보여줄 안내 메시지 반환)
+        """
         try:
             if model == "gemini":
                 # Gemini 모델 사용 (새 SDK: google-genai)
@@ -237,85 +449,193 @@ class RAGService:
                     return "GOOGLE_API_KEY가 설정되지 않아 Gemini를 사용할 수 없습니다."
                 
                 prompt = f"{system_prompt}\n\n질문: {question}"
+                limiter = get_rate_limiter("gemini-llm")
+                # 한도 계산용 토큰 수: 입력 프롬프트 + 최대 출력 토큰
+                request_tokens = estimate_tokens(prompt) + 2000
                 
-                # 재시도 로직 (429 에러 대응)
+                # 빈 응답 재시도 (429 에러는 레이트 리미터가 대기 후 재시도)
                 max_retries = 3
-                retry_delay = 2  # 초기 대기 시간 (초)
                 
                 for attempt in range(max_retries):
                     try:
                         # 새 SDK 사용법
-                        response = self.genai_client.models.generate_content(
-                            model='gemini-3-pro-preview',
-                            contents=prompt,
-                            config={
-                                'temperature': 0,
-                                'max_output_tokens': 2000,  # 500 → 2000으로 증가 (MAX_TOKENS 에러 방지)
-                            }
+                        response = limiter.call(
+                            lambda: self.genai_client.models.generate_content(
+                                model='gemini-3-pro-preview',
+                                contents=prompt,
+                                config={
+                                    'temperature': 0,
+                                    'max_output_tokens': 2000,  # 500 → 2000으로 증가 (MAX_TOKENS 에러 방지)
+                                }
+                            ),
+                            tokens=request_tokens,
                         )
-                        
-                        # response.text가 None인 경우 처리
-                        if response.text is None:
-                            # finish_reason 확인
-                            if hasattr(response, 'candidates') and response.candidates:
-                                candidate = response.candidates[0]
-                                finish_reason = getattr(candidate, 'finish_reason', None)
-                                print(f"⚠️ Gemini 응답이 None입니다. finish_reason: {finish_reason}")
-                                
-                                if finish_reason == 'MAX_TOKENS':
-                                    print("⚠️ 최대 토큰 수에 도달했습니다. max_output_tokens를 늘려야 합니다.")
-                                    return "죄송합니다. 응답이 너무 길어서 생성하지 못했습니다. 질문을 더 구체적으로 해주세요."
-                            
-                            if attempt < max_retries - 1:
-                                print(f"  재시도합니다... ({attempt + 1}/{max_retries})")
-                                time.sleep(2)
-                                continue
-                            else:
-                                return "죄송합니다. Gemini가 응답을 생성하지 못했습니다. 다시 시도해주세요."
-                        
-                        return f"Gemini 3 Pro: {response.text}"
-                        
                     except Exception as e:
-                        error_msg = str(e)
+                        if is_rate_limit_error(e):
+                            return f"죄송합니다. Gemini API 할당량이 초과되어 답변을 생성할 수 없습니다. 잠시 후 다시 시도해주세요."
+                        # 다른 에러는 즉시 재발생
+                        raise
+                    
+                    # response.text가 None인 경우 처리
+                    if response.text is None:
+                        # finish_reason 확인
+                        if hasattr(response, 'candidates') and response.candidates:
+                            candidate = response.candidates[0]
+                            finish_reason = getattr(candidate, 'finish_reason', None)
+                            print(f"⚠️ Gemini 응답이 None입니다. finish_reason: {finish_reason}")
+                            
+                            if finish_reason == 'MAX_TOKENS':
+                                print("⚠️ 최대 토큰 수에 도달했습니다. max_output_tokens를 늘려야 합니다.")
+                                return "죄송합니다. 응답이 너무 길어서 생성하지 못했습니다. 질문을 더 구체적으로 해주세요."
                         
-                        # 429 에러 처리
-                        if "429" in error_msg or "RESOURCE_EXHAUSTED" in error_msg or "quota" in error_msg.lower():
-                            if attempt < max_retries - 1:
-                                # 에러 메시지에서 retry delay 추출 시도
-                                retry_after = None
-                                retry_match = re.search(r'retry in ([\d.]+)s', error_msg, re.IGNORECASE)
-                                if retry_match:
-                                    retry_after = float(retry_match.group(1))
-                                else:
-                                    # Exponential backoff
-                                    retry_after = retry_delay * (2 ** attempt) + random.uniform(0, 1)
-                                
-                                print(f"⚠️ Gemini 할당량 초과 (429). {retry_after:.1f}초 후 재시도... ({attempt + 1}/{max_retries})")
-                                time.sleep(retry_after)
-                            else:
-                                return f"죄송합니다. Gemini API 할당량이 초과되어 답변을 생성할 수 없습니다. 잠시 후 다시 시도해주세요."
+                        if attempt < max_retries - 1:
+                            print(f"  재시도합니다... ({attempt + 1}/{max_retries})")
+                            time.sleep(2)
+                            continue
                         else:
-                            # 다른 에러는 즉시 재발생
-                            raise
+                            return "죄송합니다. Gemini가 응답을 생성하지 못했습니다. 다시 시도해주세요."
+                    
+                    return f"{ANSWER_PREFIXES['gemini']}{response.text}"
             else:
                 # OpenAI 모델 사용 (기본값)
-                response = self.openai.chat.completions.create(
-                    model="gpt-4o-mini", # 가성비 좋은 모델 사용
-                    messages=[
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": question}
-                    ],
-                    temperature=0, # 사실 기반 답변을 위해 0 설정
-                    max_tokens=1000,  # 답변 길이 확장 (200 → 500, 긴 답변도 완전히 제공)
+                limiter = get_rate_limiter("openai-llm")
+                request_tokens = estimate_tokens(system_prompt) + estimate_tokens(question) + 1000
+                response = limiter.call(
+                    lambda: self.openai.chat.completions.create(
+                        model="gpt-4o-mini", # 가성비 좋은 모델 사용
+                        messages=[
+                            {"role": "system", "content": system_prompt},
+                            {"role": "user", "content": question}
+                        ],
+                        temperature=0, # 사실 기반 답변을 위해 0 설정
+                        max_tokens=1000,  # 답변 길이 확장 (200 → 500, 긴 답변도 완전히 제공)
+                    ),
+                    tokens=request_tokens,
                 )
-                return f"GPT-4o-mini: {response.choices[0].message.content}"
+                return f"{ANSWER_PREFIXES['openai']}{response.choices[0].message.content}"
         except Exception as e:
             return f"죄송합니다. 답변 생성 중 오류가 발생했습니다: {e}"
 
+    def _generate_answer_stream(self, system_prompt: str, question: str, model: str):
+        """
+        선택된 LLM으로 답변을 스트리밍 생성 (실패 시 안내 메시지를 yield)
+        첫 텍스트 조각을 받은 뒤에만 yield 하므로, 429 재시도/빈 응답 재시도는 사용자에게 아무것도 보내기 전에 끝남
+        답변 전송을 시작한 뒤 발생한 에러는 그대로 재발생 (불완전한 답변이 캐시되지 않도록)
+        """
+        started = False
+        try:
+            if model == "gemini":
+                if not self.genai_client:
+                    yield "GOOGLE_API_KEY가 설정되지 않아 Gemini를 사용할 수 없습니다."
+                    return
+
+                prompt = f"{system_prompt}\n\n질문: {question}"
+                limiter = get_rate_limiter("gemini-llm")
+                request_tokens = estimate_tokens(prompt) + 2000
+
+                def open_stream():
+                    return self._open_stream(
+                        self.genai_client.models.generate_content_stream(
+                            model='gemini-3-pro-preview',
+                            contents=prompt,
+                            config={
+                                'temperature': 0,
+                                'max_output_tokens': 2000,
+                            }
+                        ),
+                        get_text=lambda chunk: chunk.text,
+                    )
+
+                # 빈 응답 재시도 (429 에러는 레이트 리미터가 대기 후 재시도)
+                max_retries = 3
+                for attempt in range(max_retries):
+                    try:
+                        first_text, stream = limiter.call(open_stream, tokens=request_tokens)
+                    except Exception as e:
+                        if is_rate_limit_error(e):
+                            yield "죄송합니다. Gemini API 할당량이 초과되어 답변을 생성할 수 없습니다. 잠시 후 다시 시도해주세요."
+                            return
+                        raise
+
+                    if first_text is None:
+                        if attempt < max_retries - 1:
+                            print(f"⚠️ Gemini 응답이 비어 있습니다. 재시도합니다... ({attempt + 1}/{max_retries})")
+                            time.sleep(2)
+                            continue
+                        yield "죄송합니다. Gemini가 응답을 생성하지 못했습니다. 다시 시도해주세요."
+                        return
+
+                    started = True
+                    yield ANSWER_PREFIXES["gemini"]
+                    yield first_text
+                    for chunk in stream:
+                        if chunk.text:
+                            yield chunk.text
+                    return
+            else:
+                limiter = get_rate_limiter("openai-llm")
+                request_tokens = estimate_tokens(system_prompt) + estimate_tokens(question) + 1000
+
+                def open_stream():
+                    return self._open_stream(
+                        self.openai.chat.completions.create(
+                            model="gpt-4o-mini",
+                            messages=[
+                                {"role": "system", "content": system_prompt},
+                                {"role": "user", "content": question}
+                            ],
+                            temperature=0,
+                            max_tokens=1000,
+                            stream=True,
+                        ),
+                        get_text=lambda chunk: chunk.choices[0].delta.content if chunk.choices else None,
+                    )
+
+                first_text, stream = limiter.call(open_stream, tokens=request_tokens)
+                if first_text is None:
+                    yield "죄송합니다. 답변을 생성하지 못했습니다. 다시 시도해주세요."
+                    return
+
+                started = True
+                yield ANSWER_PREFIXES["openai"]
+                yield first_text
+                for chunk in stream:
+                    text = chunk.choices[0].delta.content if chunk.choices else None
+                    if text:
+                        yield text
+        except Exception as e:
+            if started:
+                raise
+            yield f"죄송합니다. 답변 생성 중 오류가 발생했습니다: {e}"
+
+    @staticmethod
+    def _open_stream(stream, get_text):
+        """
+        스트림에서 첫 텍스트 조각이 나올 때까지 읽음 (요청 에러가 첫 토큰 전송 전에 발생하도록)
+        :return: (첫 텍스트 또는 None, 나머지 스트림)
+        """
+        iterator = iter(stream)
+        for chunk in iterator:
+            text = get_text(chunk)
+            if text:
+                return text, iterator
+        return None, iterator
+
     def clear_database(self):
         """벡터 DB를 초기화합니다."""
         print("🗑️ 벡터 DB 초기화 요청")
         self.vector_store.clear()
+        self.answer_cache.clear()
+
+    def get_cache_stats(self) -> dict:
+        """답변 캐시 / 임베딩 캐시 / 질문 임베딩 캐시 / 추출 캐시 적중률"""
+        embedding_cache = self.vector_store.embedding_cache
+        return {
+            "answer_cache": self.answer_cache.stats(),
+            "embedding_cache": embedding_cache.stats() if embedding_cache else None,
+            "query_embedding_cache": self.vector_store.query_cache.stats() if self.vector_store.query_cache else None,
+            "extraction_cache": self.extraction_cache.stats() if self.extraction_cache else None,
+        }
 
     # def save_tables_to_excel(self, all_content, output_path="extracted_tables.xlsx"):
     #     """
@@ -343,6 +663,34 @@ class RAGService:
 
     #     print(f"✅ 표 데이터 엑셀 저장 완료: {output_path}")
 
+    @staticmethod
+    def _dump_chunk(chunk) -> str:
+        """추출 캐시 저장용 청크 직렬화 (JSON 한 줄, doc_id는 제외)"""
+        metadata = {key: value for key, value in chunk.metadata.items() if key != "doc_id"}
+        return json.dumps({"page_content": chunk.page_content, "metadata": metadata}, ensure_ascii=False) + "\n"
+
+    @staticmethod
+    def _load_chunks(text: str):
+        """_dump_chunk로 저장된 청크 목록을 Document로 복원"""
+        from langchain_core.documents import Document
+        for line in text.splitlines():
+            if line:
+                item = json.loads(line)
+                yield Document(page_content=item["page_content"], metadata=item["metadata"])
+
+    def open_rag_document_md(self, pdf_path: str):
+        """
+        최종 변환된 문서를 조각 단위로 기록할 .md 파일 열기 (data/md/<PDF 이름>.md, 실패 시 None)
+        """
+        output_dir = "data/md"
+        Path(output_dir).mkdir(parents=True, exist_ok=True)
+        output_path = Path(output_dir) / (Path(pdf_path).stem + ".md")
+        try:
+            return open(output_path, 'w', encoding='utf-8')
+        except Exception as e:
+            print(f"❌ 파일 저장 실패: {e}")
+            return None
+
     def save_rag_document_as_md(self, pdf_path: str, final_rag_document: str):
         """
         최종 변환된 문서를 .md 파일로 저장
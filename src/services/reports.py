@@ -0,0 +1,52 @@
+"""
+성능 측정 결과(JSON) 저장 / 비교 공통 함수
+- 오프라인 벤치마크(src.benchmark)와 import 시간 보고서(src.services.warmup)가 함께 사용
+- 기본 저장 경로: data/<종류>/<시각>_<commit>.json
+"""
+import json
+import subprocess
+from datetime import datetime
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent.parent
+
+
+def git_commit():
+    """현재 저장소의 짧은 커밋 해시 (git이 없거나 실패하면 None)"""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=project_root,
+            capture_output=True, text=True, timeout=5,
+        ).stdout.strip() or None
+    except Exception:
+        return None
+
+
+def delta(current, previous) -> str:
+    """이전 값 대비 변화율 문자열 (예: " (+12.5%)", 비교할 값이 없으면 빈 문자열)"""
+    if not previous or current is None:
+        return ""
+    return f" ({(current - previous) / previous * 100:+.1f}%)"
+
+
+def save_report(report: dict, kind: str, output: str = None) -> Path:
+    """
+    결과를 JSON으로 저장하고 저장 경로 반환
+
+    Args:
+        report: 저장할 결과 (report["meta"]["git_commit"]을 파일 이름에 사용)
+        kind: 기본 저장 디렉토리 이름 (data/<kind>/)
+        output: 저장 경로 (None이면 data/<kind>/<시각>_<commit>.json)
+    """
+    path = Path(output) if output else (
+        project_root / "data" / kind
+        / f"{datetime.now():%Y%m%d_%H%M%S}_{report.get('meta', {}).get('git_commit') or 'unknown'}.json"
+    )
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+    return path
+
+
+def load_report(path: str = None):
+    """비교할 이전 결과 JSON 읽기 (경로가 없으면 None)"""
+    return json.loads(Path(path).read_text(encoding="utf-8")) if path else None
@@ -0,0 +1,361 @@
+"""
+요청 단위 추적(tracing)과 느린 요청 프로파일링
+/api/query, /api/analyze 등이 느릴 때 시간이 Chroma 검색 / 질문 임베딩 / LLM 중 어디에 쓰였는지 확인하기 위한 모듈입니다. (외부 라이브러리 없음)
+
+- 트레이스: Flask 요청 1건 또는 공고 분석 작업 1건 (start_trace ~ Trace.finish)
+- 스팬: 트레이스 안의 구간 (with span("vector_store.search", k=6) as s: ... s.set(results=len(docs)))
+  현재 스팬은 contextvars로 전달되므로 함수 인자로 넘길 필요가 없고, 트레이스 밖에서는 아무것도 기록하지 않음 (비용 거의 없음)
+- 다른 스레드로 넘기는 작업은 contextvars.copy_context().run으로 실행하면 같은 트레이스에 이어서 기록됨
+- 끝난 트레이스는 최근 TRACE_BUFFER_SIZE개를 메모리에 보관 (GET /api/traces)하고, TRACE_EXPORT_PATH가 있으면 JSON Lines로 추가 기록
+- 트레이스가 임계 시간을 넘기면 그때부터 끝날 때까지 트레이스에 참여한 스레드의 스택을 주기적으로 샘플링하여
+  flamegraph.pl / speedscope에서 열 수 있는 collapsed stack 형식(.folded)으로 PROFILE_DIR에 저장
+"""
+import contextvars
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+from pathlib import Path
+from typing import List, Optional
+
+from src.config.config import TRACE_BUFFER_SIZE, TRACE_EXPORT_PATH, PROFILE_SLOW_REQUEST_MS, PROFILE_INTERVAL_MS, PROFILE_DIR
+
+# 트레이스 1건에 기록할 최대 스팬 수 (긴 분석 작업에서 메모리가 늘어나지 않도록)
+MAX_SPANS_PER_TRACE = 500
+# 느린 요청 1건을 샘플링할 최대 시간 (초)
+MAX_PROFILE_SECONDS = 300
+
+_current_span = contextvars.ContextVar("current_span", default=None)
+
+
+def _new_id() -> str:
+    return os.urandom(8).hex()
+
+
+class Span:
+    __slots__ = ("trace", "name", "span_id", "parent_id", "started", "duration_ms", "attributes", "error", "thread")
+
+    def __init__(self, trace: "Trace", name: str, parent_id: Optional[str], attributes: dict):
+        self.trace = trace
+        self.name = name
+        self.span_id = _new_id()
+        self.parent_id = parent_id
+        self.started = time.perf_counter()
+        self.duration_ms = None
+        self.attributes = attributes
+        self.error = None
+        self.thread = threading.current_thread().name
+
+    def set(self, **attributes):
+        """스팬 속성 추가 (결과 개수, 글자 수 등)"""
+        self.attributes.update(attributes)
+
+    def to_dict(self) -> dict:
+        return {
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "offset_ms": round((self.started - self.trace.root.started) * 1000, 3),
+            "duration_ms": self.duration_ms,
+            "thread": self.thread,
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+class _NoopSpan:
+    """트레이스 밖에서 사용하는 스팬 (기록하지 않음)"""
+
+    def set(self, **attributes):
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class span:
+    def __init__(self, name: str, **attributes):
+        """
+        현재 트레이스에 스팬 기록 (현재 스팬의 하위 스팬, 트레이스 밖이면 아무것도 하지 않음)
+
+        Args:
+            name: 스팬 이름 (예: "vector_store.search")
+            attributes: 스팬 속성 (예: k=6, doc_id="2025000486")
+        """
+        self.name = name
+        self.attributes = attributes
+        self.span = None
+        self.token = None
+
+    def __enter__(self):
+        parent = _current_span.get()
+        if parent is None:
+            return NOOP_SPAN
+        trace = parent.trace
+        trace.register_thread()
+        self.span = Span(trace, self.name, parent.span_id, self.attributes)
+        self.token = _current_span.set(self.span)
+        return self.span
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.span is None:
+            return False
+        current = self.span
+        current.duration_ms = round((time.perf_counter() - current.started) * 1000, 3)
+        if exc_type is not None and exc_type is not GeneratorExit:
+            current.error = f"{exc_type.__name__}: {exc}"
+        try:
+            _current_span.reset(self.token)
+        except ValueError:
+            # 제너레이터 안의 스팬이 다른 컨텍스트에서 정리된 경우 (스트리밍 중 연결 종료 등)
+            pass
+        current.trace.add(current)
+        return False
+
+
+def traced(name: str = None):
+    """함수 호출을 스팬으로 기록하는 데코레이터 (이름을 생략하면 함수 이름)"""
+    def decorator(func):
+        span_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            # 트레이스 밖에서는 스팬 객체도 만들지 않음
+            if _current_span.get() is None:
+                return func(*args, **kwargs)
+            with span(span_name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def current_span():
+    """현재 스팬 (트레이스 밖이면 NOOP_SPAN) - 함수 안에서 속성만 추가할 때 사용"""
+    return _current_span.get() or NOOP_SPAN
+
+
+class _SlowProfiler:
+    def __init__(self):
+        """
+        느린 트레이스 샘플링 프로파일러 (프로세스 전체에서 백그라운드 스레드 1개)
+        - 진행 중인 트레이스의 임계 시각까지는 대기만 하므로 빠른 요청에는 비용이 없음 (요청마다 스레드/타이머를 만들지 않음)
+        - 임계 시각을 넘긴 트레이스는 끝날 때까지 참여한 스레드의 스택을 PROFILE_INTERVAL_MS(기본 10ms)마다 sys._current_frames()로 수집
+        """
+        self._watched = {}  # Trace -> 샘플링을 시작할 시각 (time.monotonic)
+        self._stacks = {}  # 샘플링 중인 Trace -> Counter("스레드;함수;함수 ..." -> 샘플 수)
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+
+    def watch(self, trace: "Trace", threshold_seconds: float):
+        with self._lock:
+            self._watched[trace] = time.monotonic() + threshold_seconds
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="slow-profiler", daemon=True)
+                self._thread.start()
+        self._wake.set()
+
+    def unwatch(self, trace: "Trace") -> Optional[Counter]:
+        """감시 종료. 샘플링한 스택이 있으면 반환"""
+        with self._lock:
+            self._watched.pop(trace, None)
+            return self._stacks.pop(trace, None)
+
+    def _run(self):
+        interval = (float(PROFILE_INTERVAL_MS) if PROFILE_INTERVAL_MS else 10) / 1000
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                next_start = None
+                for trace, start_at in self._watched.items():
+                    if trace in self._stacks:
+                        continue
+                    if start_at <= now:
+                        self._stacks[trace] = Counter()
+                        print(f"🐢 느린 요청 프로파일링 시작: {trace.name} (trace_id: {trace.trace_id})")
+                    else:
+                        next_start = start_at if next_start is None else min(next_start, start_at)
+
+                sampling = [(trace, stacks) for trace, stacks in self._stacks.items() if now - self._watched[trace] < MAX_PROFILE_SECONDS]
+                if sampling:
+                    frames = sys._current_frames()
+                    for trace, stacks in sampling:
+                        for ident, thread_name in trace.threads_snapshot():
+                            frame = frames.get(ident)
+                            if frame is not None:
+                                stacks[self._collapse(thread_name, frame)] += 1
+                    del frames
+
+            if sampling:
+                timeout = interval
+            else:
+                timeout = max(0.0, next_start - now) if next_start is not None else None
+            self._wake.wait(timeout)
+            self._wake.clear()
+
+    @staticmethod
+    def _collapse(thread_name: str, frame) -> str:
+        names = []
+        while frame is not None:
+            code = frame.f_code
+            names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+            frame = frame.f_back
+        names.append(thread_name)
+        return ";".join(reversed(names)).replace("\n", " ")
+
+
+_profiler = _SlowProfiler()
+
+
+def _write_profile(trace: "Trace", stacks: Counter) -> str:
+    """샘플링한 스택을 collapsed stack 형식(.folded, "스레드;함수;함수 샘플수")으로 저장하고 경로 반환"""
+    profile_dir = Path(PROFILE_DIR or "data/profiles")
+    profile_dir.mkdir(parents=True, exist_ok=True)
+    safe_name = "".join(ch if ch.isalnum() else "_" for ch in trace.name).strip("_")[:60]
+    path = profile_dir / f"{time.strftime('%Y%m%d-%H%M%S')}_{safe_name}_{trace.trace_id}.folded"
+    with open(path, "w", encoding="utf-8") as f:
+        for stack, count in stacks.most_common():
+            f.write(f"{stack} {count}\n")
+    print(f"🐢 느린 요청 프로파일 저장: {path} (샘플 {sum(stacks.values())}개)")
+    return str(path)
+
+
+class Trace:
+    def __init__(self, name: str, attributes: dict, slow_ms: float = None):
+        """
+        요청/작업 1건의 트레이스 (start_trace로 생성)
+
+        Args:
+            name: 트레이스 이름 (예: "POST /api/query", "ingest_job")
+            attributes: 루트 스팬 속성
+            slow_ms: 이 시간(ms)을 넘기면 샘플링 프로파일 저장 (None이면 PROFILE_SLOW_REQUEST_MS, 기본 5000, 0이면 끔)
+        """
+        self.trace_id = _new_id()
+        self.name = name
+        self.started_at = time.time()
+        self.spans: List[Span] = []
+        self.dropped_spans = 0
+        self.profile_path = None
+        self.finished = False
+        self._threads = {}  # 스레드 ident -> 스레드 이름 (프로파일링 대상)
+        self._lock = threading.Lock()
+        self.root = Span(self, name, None, attributes)
+        self.register_thread()
+
+        if slow_ms is None:
+            slow_ms = float(PROFILE_SLOW_REQUEST_MS) if PROFILE_SLOW_REQUEST_MS else 5000
+        self.profiled = slow_ms > 0
+        if self.profiled:
+            _profiler.watch(self, slow_ms / 1000)
+
+    def register_thread(self):
+        ident = threading.get_ident()
+        if ident not in self._threads:
+            with self._lock:
+                self._threads[ident] = threading.current_thread().name
+
+    def threads_snapshot(self):
+        with self._lock:
+            return list(self._threads.items())
+
+    def add(self, finished_span: Span):
+        with self._lock:
+            if len(self.spans) < MAX_SPANS_PER_TRACE:
+                self.spans.append(finished_span)
+            else:
+                self.dropped_spans += 1
+
+    def finish(self, error: str = None, **attributes):
+        """트레이스 종료 (여러 번 호출해도 한 번만 기록). 현재 스레드의 트레이스 연결도 해제"""
+        with self._lock:
+            if self.finished:
+                return
+            self.finished = True
+        root = self.root
+        root.duration_ms = round((time.perf_counter() - root.started) * 1000, 3)
+        root.attributes.update(attributes)
+        root.error = error
+        if self.profiled:
+            stacks = _profiler.unwatch(self)
+            if stacks:
+                self.profile_path = _write_profile(self, stacks)
+        current = _current_span.get()
+        if current is not None and current.trace is self:
+            _current_span.set(None)
+        get_trace_recorder().record(self)
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            spans = sorted(self.spans, key=lambda item: item.started)
+        return {
+            "trace_id": self.trace_id,
+            "name": self.name,
+            "started_at": self.started_at,
+            "duration_ms": self.root.duration_ms,
+            "attributes": self.root.attributes,
+            "error": self.root.error,
+            "profile": self.profile_path,
+            "dropped_spans": self.dropped_spans,
+            "spans": [item.to_dict() for item in spans],
+        }
+
+
+def start_trace(name: str, slow_ms: float = None, **attributes) -> Trace:
+    """
+    새 트레이스를 시작하고 현재 스레드(컨텍스트)의 현재 스팬으로 설정
+    끝나면 반드시 Trace.finish() 호출 (Flask는 응답 전송이 끝날 때, 작업 큐는 작업이 끝날 때)
+    """
+    trace = Trace(name, attributes, slow_ms)
+    _current_span.set(trace.root)
+    return trace
+
+
+class TraceRecorder:
+    def __init__(self, max_traces: int = 200, export_path: str = None):
+        """
+        끝난 트레이스 보관 (최근 max_traces개) 및 JSON Lines 파일 내보내기
+
+        Args:
+            max_traces: 메모리에 보관할 최근 트레이스 수
+            export_path: 트레이스를 한 줄에 하나씩 추가 기록할 파일 경로 (None이면 메모리에만 보관)
+        """
+        self.traces = deque(maxlen=max_traces)
+        self.export_path = Path(export_path) if export_path else None
+        self._lock = threading.Lock()
+
+    def record(self, trace: Trace):
+        data = trace.to_dict()
+        line = json.dumps(data, ensure_ascii=False, default=str)
+        with self._lock:
+            self.traces.append(data)
+            if self.export_path:
+                try:
+                    self.export_path.parent.mkdir(parents=True, exist_ok=True)
+                    with open(self.export_path, "a", encoding="utf-8") as f:
+                        f.write(line + "\n")
+                except OSError as e:
+                    print(f"⚠️ 트레이스 내보내기 실패: {e}")
+
+    def recent(self, limit: int = 50, min_ms: float = 0) -> List[dict]:
+        """최근 트레이스 (최신순, min_ms 이상 걸린 것만)"""
+        with self._lock:
+            traces = list(self.traces)
+        traces = [data for data in reversed(traces) if (data["duration_ms"] or 0) >= min_ms]
+        return traces[:limit]
+
+
+_recorder = None
+_recorder_lock = threading.Lock()
+
+
+def get_trace_recorder() -> TraceRecorder:
+    """프로세스 전체에서 공유하는 TraceRecorder"""
+    global _recorder
+    with _recorder_lock:
+        if _recorder is None:
+            max_traces = int(TRACE_BUFFER_SIZE) if TRACE_BUFFER_SIZE else 200
+            _recorder = TraceRecorder(max_traces=max_traces, export_path=TRACE_EXPORT_PATH)
+        return _recorder
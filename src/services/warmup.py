@@ -0,0 +1,267 @@
+"""
+시작 시간 단축 / 워커 예열
+- measure_imports: 모듈별 import 시간과 메모리(RSS) 증가량 측정
+- Warmup.preload: 무거운 모듈(LLM SDK, langchain, chromadb, PDF 파서)을 미리 import한 뒤 gc.freeze()
+  (gunicorn --preload에서 마스터가 실행하면 fork된 워커가 copy-on-write로 공유)
+- Warmup.start: 백그라운드 스레드에서 서비스(RAG, 크롤링, PDF 다운로드) 초기화 → 끝나면 ready
+  (Chroma 클라이언트 / SQLite 캐시 연결은 fork 후에 쓰면 안전하지 않으므로 워커마다 fork 이후에 생성)
+
+사용법 (import 시간 보고서):
+    python -m src.services.warmup
+    python -m src.services.warmup --output after.json --compare before.json   # 이전 결과와 비교
+    python -m src.services.warmup --init   # 서비스 초기화 시간까지 측정 (Chroma 경로는 임시 디렉토리 사용)
+"""
+import gc
+import importlib
+import sys
+import threading
+import time
+
+from src.services.metrics import resident_memory_bytes
+from src.services.reports import git_commit, delta, save_report, load_report
+
+# 미리 import할 모듈 (RAGService 초기화 순서 - 설치되지 않은 모듈은 건너뜀)
+PRELOAD_MODULES = [
+    "google.genai",
+    "openai",
+    "bs4",
+    "html2text",
+    "pdfplumber",
+    "langchain_core.documents",
+    "langchain_openai",
+    "chromadb",
+    "langchain_chroma",
+    "src.services.rag_service",
+    "src.services.rag.pdf_extractor",
+    "src.services.rag.text_chunker",
+    "src.services.rag.vector_store",
+    "src.services.rag.extractor_registry",
+]
+
+# 가벼운 경로('/', /api/calendar-data, /metrics)에서 로드되면 안 되는 모듈 (RAG 스택)
+RAG_STACK_PREFIXES = (
+    "google.genai", "openai", "langchain", "chromadb", "pdfplumber", "html2text", "tiktoken",
+    "src.services.rag_service", "src.services.rag.",
+)
+
+# 가벼운 경로가 사용하는 모듈 (import 보고서에서 RAG 스택보다 먼저 측정)
+LIGHT_MODULES = [
+    "src.app",
+    "src.services.calendar_index",
+    "src.client.api_client",
+    "src.services.metrics",
+    "src.services.tracing",
+]
+
+
+def loaded_rag_modules() -> list:
+    """현재 프로세스에 로드된 RAG 스택 모듈 목록"""
+    return sorted(name for name in sys.modules if name.startswith(RAG_STACK_PREFIXES))
+
+
+def measure_imports(modules: list) -> list:
+    """
+    모듈별 import 시간 / RSS 증가량 측정 (이미 로드된 모듈은 0에 가깝게 나옴 - 앞의 모듈이 같이 불러온 경우 포함)
+
+    Args:
+        modules: import할 모듈 이름 목록 (순서대로 측정)
+
+    Returns:
+        [{"module", "seconds", "rss_mb", "error"}, ...]
+    """
+    results = []
+    for name in modules:
+        rss_before = resident_memory_bytes()
+        started = time.perf_counter()
+        error = None
+        try:
+            importlib.import_module(name)
+        except Exception as e:  # 미설치(ImportError) 또는 import 중 오류
+            error = f"{type(e).__name__}: {e}"
+        results.append({
+            "module": name,
+            "seconds": round(time.perf_counter() - started, 4),
+            "rss_mb": round((resident_memory_bytes() - rss_before) / (1024 * 1024), 1),
+            "error": error,
+        })
+    return results
+
+
+class Warmup:
+    def __init__(self):
+        """
+        워커 예열 상태 (idle → preloading → preloaded → initializing → ready / error)
+        /api/ready가 이 상태로 준비 여부를 응답합니다.
+        """
+        self.status = "idle"
+        self.error = None
+        self.imports = []
+        self.services = {}
+        self.preload_seconds = None
+        self.started_at = None
+        self.ready_at = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    @property
+    def ready(self) -> bool:
+        return self.status == "ready"
+
+    def preload(self, modules: list = None) -> list:
+        """
+        무거운 모듈을 미리 import (gunicorn --preload에서는 fork 전에 마스터 프로세스가 실행)
+        - tiktoken 인코더도 미리 로드 (첫 질문에서 인코딩 파일을 읽지 않도록)
+        - gc.freeze(): 지금까지 만든 객체를 GC 대상에서 제외 → 워커에서 GC가 돌 때 공유 메모리 페이지를 건드려 복사되는 것을 방지
+        """
+        self.status = "preloading"
+        started = time.perf_counter()
+        self.imports = measure_imports(modules or PRELOAD_MODULES)
+        try:
+            from src.services.rag.context_builder import count_tokens
+            count_tokens("warmup")
+        except Exception as e:
+            print(f"⚠️ 토큰 인코더 예열 실패: {e}")
+        gc.collect()
+        gc.freeze()
+        self.preload_seconds = round(time.perf_counter() - started, 3)
+        self.status = "preloaded"
+        skipped = [item["module"] for item in self.imports if item["error"]]
+        print(f"✅ 모듈 예열 완료 ({self.preload_seconds}s, 모듈 {len(self.imports) - len(skipped)}개"
+              + (f", 건너뜀: {', '.join(skipped)}" if skipped else "") + ")")
+        return self.imports
+
+    def start(self, initializers: dict) -> bool:
+        """
+        백그라운드 스레드에서 서비스 초기화 (요청 처리는 바로 시작하고, 초기화가 끝나면 ready)
+
+        Args:
+            initializers: {서비스 이름: 초기화 함수} (순서대로 실행)
+
+        Returns:
+            이번 호출에서 스레드를 시작했으면 True (이미 시작했으면 False)
+        """
+        with self._lock:
+            if self._thread is not None:
+                return False
+            self.status = "initializing"
+            self.started_at = time.time()
+            self._thread = threading.Thread(target=self._run, args=(initializers,), name="warmup", daemon=True)
+            self._thread.start()
+            return True
+
+    def _run(self, initializers: dict):
+        for name, initializer in initializers.items():
+            started = time.perf_counter()
+            try:
+                initializer()
+            except Exception as e:
+                self.services[name] = round(time.perf_counter() - started, 3)
+                self.error = f"{name}: {e}"
+                self.status = "error"
+                print(f"❌ 워커 예열 실패 ({self.error})")
+                return
+            self.services[name] = round(time.perf_counter() - started, 3)
+        self.ready_at = time.time()
+        self.status = "ready"
+        print(f"✅ 워커 예열 완료 ({round(self.ready_at - self.started_at, 2)}s: {self.services})")
+
+    def wait(self, timeout: float = None) -> bool:
+        """초기화 스레드가 끝날 때까지 대기 (ready이면 True)"""
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return self.ready
+
+    def to_dict(self) -> dict:
+        return {
+            "status": self.status,
+            "ready": self.ready,
+            "error": self.error,
+            "preload_seconds": self.preload_seconds,
+            "preloaded_modules": len([item for item in self.imports if not item["error"]]),
+            "services": dict(self.services),
+            "init_seconds": round(self.ready_at - self.started_at, 3) if self.ready_at else None,
+            "rss_mb": round(resident_memory_bytes() / (1024 * 1024), 1),
+        }
+
+
+def import_report(init: bool = False) -> dict:
+    """
+    import 시간 보고서 (가벼운 경로 → RAG 스택 순서로 측정, 새 프로세스에서 실행해야 정확함)
+    - light_routes_clean: 가벼운 모듈만 import했을 때 RAG 스택이 로드되지 않았는지
+
+    Args:
+        init: True면 서비스 초기화(RAGService 등) 시간도 측정
+    """
+    import platform
+    from datetime import datetime
+
+    rss_start = resident_memory_bytes()
+    light = measure_imports(LIGHT_MODULES)
+    leaked = loaded_rag_modules()
+    heavy = measure_imports(PRELOAD_MODULES)
+    report = {
+        "meta": {
+            "git_commit": git_commit(),
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+        },
+        "light_routes_clean": not leaked,
+        "leaked_modules": leaked,
+        "light": light,
+        "heavy": heavy,
+        "light_seconds": round(sum(item["seconds"] for item in light), 4),
+        "heavy_seconds": round(sum(item["seconds"] for item in heavy), 4),
+        "rss_mb": round((resident_memory_bytes() - rss_start) / (1024 * 1024), 1),
+    }
+    if init:
+        import tempfile
+        from src.services.rag_service import RAGService
+        started = time.perf_counter()
+        with tempfile.TemporaryDirectory() as persist_directory:
+            RAGService(persist_directory=persist_directory)
+            report["rag_init_seconds"] = round(time.perf_counter() - started, 4)
+    return report
+
+
+def print_report(report: dict, baseline: dict = None):
+    """보고서 요약 출력 (baseline이 있으면 변화율 함께 출력)"""
+    base = {item["module"]: item for item in (baseline or {}).get("light", []) + (baseline or {}).get("heavy", [])}
+    print(f"📊 import 시간 보고서 (commit {report['meta']['git_commit']}, RSS +{report['rss_mb']}MB)")
+    for section in ("light", "heavy"):
+        total = report[f"{section}_seconds"]
+        print(f"  📦 {section}: {total * 1000:.1f}ms{delta(total, (baseline or {}).get(f'{section}_seconds'))}")
+        for item in report[section]:
+            if item["error"]:
+                print(f"     - {item['module']:<36} 건너뜀 ({item['error']})")
+                continue
+            print(f"     - {item['module']:<36} {item['seconds'] * 1000:9.1f}ms  +{item['rss_mb']}MB"
+                  f"{delta(item['seconds'], base.get(item['module'], {}).get('seconds'))}")
+    if "rag_init_seconds" in report:
+        print(f"  🚀 RAGService 초기화: {report['rag_init_seconds'] * 1000:.1f}ms"
+              f"{delta(report['rag_init_seconds'], (baseline or {}).get('rag_init_seconds'))}")
+    if report["light_routes_clean"]:
+        print("  ✅ 가벼운 경로에서 RAG 스택을 불러오지 않음")
+    else:
+        print(f"  ❌ 가벼운 경로에서 RAG 스택 로드됨: {', '.join(report['leaked_modules'])}")
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="모듈별 import 시간 / 메모리 보고서")
+    parser.add_argument("--output", help="결과 JSON 경로 (기본: data/startup/<시각>_<commit>.json)")
+    parser.add_argument("--compare", help="비교할 이전 결과 JSON 경로")
+    parser.add_argument("--init", action="store_true", help="RAGService 초기화 시간도 측정")
+    args = parser.parse_args()
+
+    report = import_report(init=args.init)
+    output = save_report(report, "startup", args.output)
+    baseline = load_report(args.compare)
+    print_report(report, baseline)
+    print(f"✅ 결과 저장: {output}")
+    # 가벼운 경로에서 RAG 스택이 로드되면 실패 코드로 종료 (CI에서 회귀 감지용)
+    sys.exit(0 if report["light_routes_clean"] else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+"""
+컨텍스트 구성 표 축소 테스트
+ContextBuilder가 질문과 관련된 열만 남길 때 셀 안의 이스케이프된 '|'(matrix_to_markdown 출력)로 열이 밀리지 않는지 확인합니다.
+
+실행: python -m pytest tests/test_context_builder.py
+"""
+from src.services.rag.context_builder import ContextBuilder
+from src.services.rag.lexical_index import tokenize
+from src.services.rag.pdf_extractor import PDFExtractor
+
+
+def test_cells_keep_escaped_pipes():
+    assert ContextBuilder._cells("| a\\|b | c |") == ["a\\|b", "c"]
+    assert ContextBuilder._cells("| a | b\\| |") == ["a", "b\\|"]
+    assert ContextBuilder._cells("a | b") == ["a", "b"]
+
+
+def test_trim_columns_with_escaped_pipes():
+    header = ["구분", "비고"] + [f"항목{i}" for i in range(8)] + ["분양가"]
+    body = [[f"행{row}", "A|B|C"] + [str(row * 10 + i) for i in range(8)] + [f"{row}억"] for row in range(3)]
+    table = PDFExtractor().matrix_to_markdown([header] + body).strip()
+
+    builder = ContextBuilder(max_table_columns=4)
+    trimmed = builder._trim_tables(table, set(tokenize("분양가")))
+    rows = [builder._cells(line) for line in trimmed.split("\n") if not line.startswith("|---")]
+
+    assert rows[0] == ["구분", "분양가"]
+    assert rows[1:] == [[f"행{row}", f"{row}억"] for row in range(3)]
@@ -0,0 +1,253 @@
+"""
+PDF 스트리밍 다운로드 테스트 (ApplyhomeDownloadClient.download_to_file)
+로컬 HTTP 서버로 연결 끊김 후 이어받기(Range / If-Range), Range 요청에 대한 200 응답, Content-Range 확인,
+크기 초과 중단, .part 파일 정리를 확인합니다.
+
+실행: python -m pytest tests/test_download_client.py
+"""
+import hashlib
+import os
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from src.client.download_client import ApplyhomeDownloadClient
+
+CHUNK_SIZE = 16 * 1024
+PDF_SIZE = 300_000
+# 끊기기 전에 받은 부분이 청크 크기의 배수여야 이어받기 위치를 정확히 비교할 수 있음 (마지막 불완전 청크는 예외로 버려짐)
+DROP_AFTER = 6 * CHUNK_SIZE
+
+
+class FakePdfServer:
+    def __init__(self):
+        """
+        Range / If-Range를 지원하는 PDF 서버 흉내
+        - drop: 남은 횟수만큼 응답 본문을 DROP_AFTER 바이트만 보내고 연결을 끊음
+        - ignore_range: Range 요청에도 전체(200)를 보냄
+        - content_range_start: 206 응답의 Content-Range 시작 위치를 이 값으로 보냄 (요청과 다른 위치 흉내)
+        - send_length: False면 Content-Length 없이 보내고 연결을 닫아 끝을 알림
+        """
+        self.data = os.urandom(PDF_SIZE)
+        self.etag = '"v1"'
+        self.last_modified = "Wed, 01 Jan 2025 00:00:00 GMT"
+        self.drop = 0
+        self.ignore_range = False
+        self.always_416 = False
+        self.content_range_start = None
+        self.send_length = True
+        self.requests = []  # (Range, If-Range) 헤더 기록
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                server.handle(self)
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_port}/notice.pdf"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def handle(self, handler):
+        range_header = handler.headers.get("Range")
+        if_range = handler.headers.get("If-Range")
+        self.requests.append((range_header, if_range))
+
+        start, status = 0, 200
+        validator = self.etag or self.last_modified
+        if range_header and not self.ignore_range and (if_range is None or if_range == validator):
+            start = int(range_header.split("=")[1].rstrip("-"))
+            if self.always_416 or start >= len(self.data):
+                handler.send_response(416)
+                handler.send_header("Content-Length", "0")
+                handler.end_headers()
+                return
+            status = 206
+
+        body = self.data[start:]
+        handler.send_response(status)
+        if status == 206:
+            range_start = start if self.content_range_start is None else self.content_range_start
+            handler.send_header("Content-Range", f"bytes {range_start}-{len(self.data) - 1}/{len(self.data)}")
+        if self.etag:
+            handler.send_header("ETag", self.etag)
+        if self.last_modified:
+            handler.send_header("Last-Modified", self.last_modified)
+        if self.send_length:
+            handler.send_header("Content-Length", str(len(body)))
+        else:
+            handler.send_header("Connection", "close")
+            handler.close_connection = True
+        handler.end_headers()
+
+        if self.drop > 0:
+            self.drop -= 1
+            handler.wfile.write(body[:DROP_AFTER])
+            handler.wfile.flush()
+            handler.connection.shutdown(socket.SHUT_RDWR)
+            handler.close_connection = True
+            return
+        handler.wfile.write(body)
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@pytest.fixture
+def server():
+    fake = FakePdfServer()
+    yield fake
+    fake.close()
+
+
+@pytest.fixture
+def client():
+    download_client = ApplyhomeDownloadClient(timeout=(5, 5), chunk_size=CHUNK_SIZE)
+    # 공유 세션(재시도 어댑터)을 건드리지 않도록 테스트마다 새 세션 사용
+    download_client.session = requests.Session()
+    return download_client
+
+
+def assert_downloaded(result, dest, data):
+    assert result is not None
+    assert result["status"] == 200
+    assert result["size"] == len(data)
+    assert result["sha256"] == hashlib.sha256(data).hexdigest()
+    with open(dest, "rb") as f:
+        assert f.read() == data
+    assert not os.path.exists(f"{dest}.part")
+
+
+def test_resume_with_strong_etag(server, client, tmp_path):
+    dest = str(tmp_path / "notice.pdf")
+    server.drop = 1
+
+    result = client.download_to_file(server.url, dest)
+
+    assert_downloaded(result, dest, server.data)
+    assert server.requests == [(None, None), (f"bytes={DROP_AFTER}-", '"v1"')]
+    assert result["etag"] == '"v1"'
+
+
+def test_resume_with_last_modified_when_etag_is_weak(server, client, tmp_path):
+    dest = str(tmp_path / "notice.pdf")
+    server.etag = 'W/"v1"'
+    server.drop = 1
+
+    result = client.download_to_file(server.url, dest)
+
+    assert_downloaded(result, dest, server.data)
+    assert server.requests[1] == (f"bytes={DROP_AFTER}-", server.last_modified)
+
+
+def test_restart_without_validator(server, client, tmp_path):
+    dest = str(tmp_path / "notice.pdf")
+    server.etag = None
+    server.last_modified = None
+    server.drop = 1
+
+    result = client.download_to_file(server.url, dest)
+
+    assert_downloaded(result, dest, server.data)
+    assert server.requests == [(None, None), (None, None)]
+
+
+def test_full_response_to_range_request_replaces_part(server, client, tmp_path):
+    dest = str(tmp_path / "notice.pdf")
+    server.drop = 1
+    server.ignore_range = True
+
+    result = client.download_to_file(server.url, dest)
+
+    # 이어 붙이지 않고 200 본문으로 처음부터 다시 씀
+    assert_downloaded(result, dest, server.data)
+    assert server.requests[1] == (f"bytes={DROP_AFTER}-", '"v1"')
+
+
+def test_file_changed_during_resume(server, client, tmp_path):
+    dest = str(tmp_path / "notice.pdf")
+    server.drop = 1
+    original_handle = server.handle
+
+    def change_after_first_request(handler):
+        if server.requests:
+            server.etag = '"v2"'
+            server.data = os.urandom(250_000)
+        original_handle(handler)
+
+    server.handle = change_after_first_request
+    result = client.download_to_file(server.url, dest)
+
+    assert_downloaded(result, dest, server.data)
+    assert result["etag"] == '"v2"'
+
+
+def test_mismatched_content_range_restarts(server, client, tmp_path):
+    dest = str(tmp_path / "notice.pdf")
+    server.drop = 1
+    server.content_range_start = 0
+
+    result = client.download_to_file(server.url, dest)
+
+    assert_downloaded(result, dest, server.data)
+    assert server.requests[-1] == (None, None)
+
+
+def test_416_discards_part_and_restarts(server, client, tmp_path):
+    dest = str(tmp_path / "notice.pdf")
+    server.drop = 1
+    server.always_416 = True
+
+    result = client.download_to_file(server.url, dest)
+
+    assert_downloaded(result, dest, server.data)
+    assert [header for header, _ in server.requests] == [None, f"bytes={DROP_AFTER}-", None]
+
+
+def test_leftover_part_from_previous_call_is_not_resumed(server, client, tmp_path):
+    dest = str(tmp_path / "notice.pdf")
+    with open(f"{dest}.part", "wb") as f:
+        f.write(server.data)  # 이전 프로세스가 rename 전에 종료된 경우
+
+    result = client.download_to_file(server.url, dest)
+
+    assert_downloaded(result, dest, server.data)
+    assert server.requests == [(None, None)]
+
+
+@pytest.mark.parametrize("send_length", [True, False])
+def test_oversize_download_is_aborted(server, client, tmp_path, send_length):
+    dest = str(tmp_path / "notice.pdf")
+    server.send_length = send_length
+    client.max_bytes = PDF_SIZE // 2
+
+    assert client.download_to_file(server.url, dest) is None
+    assert not os.path.exists(dest)
+    assert not os.path.exists(f"{dest}.part")
+
+
+def test_not_modified(server, client, tmp_path):
+    dest = str(tmp_path / "notice.pdf")
+    original_handle = server.handle
+
+    def not_modified(handler):
+        server.requests.append((handler.headers.get("If-None-Match"), None))
+        handler.send_response(304)
+        handler.end_headers()
+
+    server.handle = not_modified
+    result = client.download_to_file(server.url, dest, etag='"v1"')
+    server.handle = original_handle
+
+    assert result["status"] == 304
+    assert server.requests == [('"v1"', None)]
+    assert not os.path.exists(dest)
@@ -0,0 +1,33 @@
+"""
+레이트 리미터 429 backoff 테스트
+힌트(retry after)가 없는 429의 대기 시간이 연속 429 횟수에 따라 늘어나고, 요청이 성공하면 처음부터 다시 시작하는지 확인합니다.
+
+실행: python -m pytest tests/test_rate_limiter.py
+"""
+from src.services.rag.rate_limiter import RateLimiter
+
+
+def test_backoff_grows_with_consecutive_rate_limits():
+    limiter = RateLimiter("test", rpm=60, tpm=1000)
+    waits = [limiter.report_rate_limited() for _ in range(6)]
+
+    # 2 * 2^n초 (최대 60초) + 0~1초 지터
+    for count, wait in enumerate(waits, start=1):
+        expected = min(60.0, 2 * 2 ** min(count, 5))
+        assert expected <= wait <= expected + 1
+    assert limiter.rate_limited_count == 6
+
+
+def test_backoff_resets_after_success():
+    limiter = RateLimiter("test", rpm=60, tpm=1000)
+    for _ in range(5):
+        limiter.report_rate_limited()
+    limiter.report_success()
+
+    assert limiter.rate_limited_count == 0
+    assert limiter.report_rate_limited() <= 4 + 1
+
+
+def test_retry_after_hint_is_used():
+    limiter = RateLimiter("test", rpm=60, tpm=1000)
+    assert limiter.report_rate_limited(retry_after=1.5) == 1.5
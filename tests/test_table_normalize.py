@@ -0,0 +1,117 @@
+"""
+표 정규화 동등성 테스트
+PDFExtractor.normalize_html_table / normalize_table_rows(행별 리스트 기반)가
+이전 구현((행, 열) 딕셔너리 기반)과 같은 2차원 리스트를 만드는지 확인합니다.
+
+- extracted_view.html의 모든 표
+- seed를 고정한 무작위 rowspan/colspan 표 (0 ~ 5 범위, 빈 행, th/td 혼합, 중첩 표 포함)
+
+실행: python -m pytest tests/test_table_normalize.py
+"""
+import random
+from pathlib import Path
+
+import pytest
+from bs4 import BeautifulSoup
+
+from src.services.rag.pdf_extractor import PDFExtractor
+
+project_root = Path(__file__).parent.parent
+
+
+def legacy_normalize_rows(rows):
+    """이전 구현 (칸마다 (행, 열) 키로 딕셔너리에 채운 뒤 최대 범위로 2차원 리스트 생성)"""
+    grid = {}
+    for curr_row, cells in enumerate(rows):
+        curr_col = 0
+        for rowspan, colspan, content in cells:
+            while (curr_row, curr_col) in grid:
+                curr_col += 1
+            for r in range(curr_row, curr_row + rowspan):
+                for c in range(curr_col, curr_col + colspan):
+                    grid[(r, c)] = content
+            curr_col += colspan
+    if not grid:
+        return []
+    max_row = max(r for r, _ in grid) + 1
+    max_col = max(c for _, c in grid) + 1
+    return [[grid.get((r, c), "") for c in range(max_col)] for r in range(max_row)]
+
+
+def legacy_normalize_html_table(table_html):
+    """이전 구현의 HTML 표 파싱 (행마다 바로 아래의 td/th만, rowspan/colspan은 int로 변환)"""
+    if not table_html:
+        return []
+    rows = [
+        [
+            (int(cell.get("rowspan", 1)), int(cell.get("colspan", 1)), " ".join(cell.get_text().split()))
+            for cell in row.find_all(["td", "th"], recursive=False)
+        ]
+        for row in table_html.find_all("tr")
+    ]
+    return legacy_normalize_rows(rows)
+
+
+def random_table_html(rng: random.Random) -> str:
+    rows = []
+    for _ in range(rng.randint(0, 12)):
+        cells = []
+        for _ in range(rng.randint(0, 8)):
+            tag = rng.choice(["td", "th"])
+            attrs = ""
+            if rng.random() < 0.3:
+                attrs += f" rowspan='{rng.randint(0, 5)}'"
+            if rng.random() < 0.3:
+                attrs += f" colspan='{rng.randint(0, 5)}'"
+            text = rng.choice(["", " a ", "b\n c", "12,000", "<b>x</b> y", "84A|84B"])
+            cells.append(f"<{tag}{attrs}>{text}</{tag}>")
+        rows.append("<tr>" + "".join(cells) + "</tr>")
+    if rng.random() < 0.1:
+        rows.append("<tr><td><table><tr><td rowspan=2>in</td></tr></table></td></tr>")
+    return "<table>" + "".join(rows) + "</table>"
+
+
+def random_rows(rng: random.Random) -> list:
+    return [
+        [(rng.randint(0, 5), rng.randint(0, 5), f"{r}-{c}") for c in range(rng.randint(0, 8))]
+        for r in range(rng.randint(0, 15))
+    ]
+
+
+@pytest.fixture(scope="module")
+def extractor():
+    return PDFExtractor()
+
+
+def test_extracted_view_tables(extractor):
+    html_path = project_root / "extracted_view.html"
+    if not html_path.exists():
+        pytest.skip("extracted_view.html 없음")
+    soup = BeautifulSoup(html_path.read_text(encoding="utf-8"), "html.parser")
+    tables = soup.find_all("table")
+    assert tables
+    for table in tables:
+        assert extractor.normalize_html_table(table) == legacy_normalize_html_table(table), table.get("id")
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_random_html_tables(extractor, seed):
+    rng = random.Random(seed)
+    for _ in range(100):
+        table_html = random_table_html(rng)
+        table = BeautifulSoup(table_html, "html.parser").find("table")
+        assert extractor.normalize_html_table(table) == legacy_normalize_html_table(table), table_html
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_random_rows(extractor, seed):
+    rng = random.Random(seed)
+    for _ in range(200):
+        rows = random_rows(rng)
+        assert extractor.normalize_table_rows(rows) == legacy_normalize_rows(rows), rows
+
+
+def test_empty_table(extractor):
+    assert extractor.normalize_html_table(None) == []
+    assert extractor.normalize_table_rows([]) == []
+    assert extractor.normalize_table_rows([[(0, 3, "x")], []]) == []